@@ -0,0 +1,178 @@
+"""
+bench_atlas.py
+
+Cold-start browsing of one category: per-file PNGs vs sprite atlases.
+
+Builds a synthetic PNG root (or uses --json/--png-root), packs it with
+build_atlases, then times loading every icon of the category both ways.
+"Load" is open + read for both layouts; when a display is available it
+also includes turning the bytes into PhotoImages (atlas: one page decode
+plus one copy per icon). The one-off cost of checking the atlas against
+the PNGs (scan_png_root + load_atlas_index) is reported on its own line.
+
+    python benchmarks/bench_atlas.py [--count 2000] [--drop-caches]
+
+--drop-caches writes to /proc/sys/vm/drop_caches before each run (Linux,
+root only) so the numbers are real cold-cache reads; without it the OS
+cache is warm after the first pass and the gap is mostly open() cost.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import wz_png  # noqa: E402
+from wz_icon_catalog import (  # noqa: E402
+    atlas_dir_for,
+    build_atlases,
+    iter_icon_db,
+    load_atlas_index,
+    scan_png_root,
+)
+
+
+def make_png_root(root, count, size, seed=0):
+    """Write count size x size icons into root; return the icon_db.json path."""
+    rng = random.Random(seed)
+    group = {}
+    os.makedirs(os.path.join(root, "Item", "Consume"), exist_ok=True)
+    for n in range(count):
+        item_id = f"0{2000000 + n}"
+        rel_path = f"Item/Consume/{item_id}.png"
+        # Noisy top half, flat bottom half: roughly icon-sized files
+        half = size * size * 2
+        pixels = bytearray(rng.randbytes(half)) + bytearray(half)
+        wz_png.save_png(
+            os.path.join(root, rel_path), wz_png.PngImage(size, size, pixels)
+        )
+        group[item_id] = rel_path
+    json_path = os.path.join(root, "icon_db.json")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump({"Item": {"Consume": group}}, f)
+    return json_path
+
+
+def drop_caches():
+    os.sync()
+    with open("/proc/sys/vm/drop_caches", "w") as f:
+        f.write("3\n")
+
+
+def load_per_file(png_root, rel_paths, tk_root):
+    images = []
+    for rel_path in rel_paths:
+        with open(os.path.join(png_root, rel_path), "rb") as f:
+            data = f.read()
+        if tk_root is not None:
+            images.append(tk.PhotoImage(master=tk_root, data=data))
+    return len(rel_paths)
+
+
+def load_atlas(png_root, rel_paths, tk_root):
+    # The viewer checks the sources once per scan, not per browse (see
+    # check_sources, timed on its own line)
+    pages, entries = load_atlas_index(png_root)
+    atlas_dir = atlas_dir_for(png_root)
+    page_data = {}
+    images = []
+    for rel_path in rel_paths:
+        page_no, x, y, w, h = entries[rel_path]
+        page = page_data.get(page_no)
+        if page is None:
+            with open(os.path.join(atlas_dir, pages[page_no]), "rb") as f:
+                page = f.read()
+            if tk_root is not None:
+                page = tk.PhotoImage(master=tk_root, data=page)
+            page_data[page_no] = page
+        if tk_root is not None:
+            img = tk.PhotoImage(master=tk_root, width=w, height=h)
+            img.tk.call(img, "copy", page, "-from", x, y, x + w, y + h)
+            images.append(img)
+    return len(page_data) + 1
+
+
+def check_sources(png_root):
+    # What the viewer does once per PNG root: scan it, then load the index
+    # checked against the scan's stat data
+    files = scan_png_root(png_root)
+    return len(load_atlas_index(png_root, files)[1])
+
+
+def timed(fn, repeat, cold):
+    times = []
+    opens = 0
+    for _ in range(repeat):
+        if cold:
+            drop_caches()
+        start = time.perf_counter()
+        opens = fn()
+        times.append((time.perf_counter() - start) * 1000.0)
+    return statistics.median(times), opens
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--size", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="existing icon_db.json (with --png-root)")
+    parser.add_argument("--png-root", help="existing PNG root (with --json)")
+    parser.add_argument("--drop-caches", action="store_true")
+    args = parser.parse_args(argv)
+
+    tmp = None
+    if args.json and args.png_root:
+        json_path, png_root = args.json, args.png_root
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        png_root = tmp.name
+        json_path = make_png_root(png_root, args.count, args.size)
+
+    start = time.perf_counter()
+    _index, icons, pages = build_atlases(json_path, png_root)
+    print(f"Packed {icons} icons into {pages} pages in "
+          f"{time.perf_counter() - start:.2f} s")
+
+    # Largest packed group stands in for "browse one category"
+    groups = {}
+    packed = load_atlas_index(png_root, scan_png_root(png_root))[1]
+    for type_name, category, _item_id, rel_path in iter_icon_db(json_path):
+        rel_path = os.path.normpath(rel_path).replace(os.sep, "/")
+        if rel_path in packed:
+            groups.setdefault((type_name, category), []).append(rel_path)
+    (type_name, category), rel_paths = max(groups.items(), key=lambda g: len(g[1]))
+
+    tk_root = None
+    try:
+        tk_root = tk.Tk()
+        tk_root.withdraw()
+    except tk.TclError:
+        print("No display: timing file I/O only (no PhotoImage decode)")
+
+    cold = args.drop_caches
+    print(f"\n{type_name}/{category}: {len(rel_paths)} icons, "
+          f"{'cold' if cold else 'warm'} cache, median of {args.repeat}")
+    print(f"{'layout':>10} {'opens':>8} {'ms':>10}")
+    for name, fn in (("per-file", load_per_file), ("atlas", load_atlas)):
+        ms, opens = timed(lambda: fn(png_root, rel_paths, tk_root), args.repeat, cold)
+        print(f"{name:>10} {opens:>8} {ms:>10.1f}")
+    ms, icons = timed(lambda: check_sources(png_root), args.repeat, cold)
+    print(f"\nOnce per PNG root: scan + atlas source check of {icons} icons "
+          f"{ms:.1f} ms")
+
+    if tk_root is not None:
+        tk_root.destroy()
+    if tmp is not None:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
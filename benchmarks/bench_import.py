@@ -0,0 +1,100 @@
+"""
+bench_import.py
+
+Import time of the catalog module (headless tools) vs the viewer.
+
+Each sample is a fresh interpreter running `python -X importtime -c
+"import <module>"`; the module's cumulative time is read from the
+report. One warm-up run first writes the bytecode cache, so the numbers
+match a normal second launch.
+
+    python benchmarks/bench_import.py [--repeat 10] [--budget-ms 50]
+
+Exits with status 1 when the median catalog import exceeds the budget
+or when importing it pulls in tkinter.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CATALOG = "wz_icon_catalog"
+GUI = "wz_icon_viewer_gui"
+
+
+def import_report(module):
+    """Run one import in a fresh interpreter; return {module: cumulative us}."""
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    report = {}
+    for line in proc.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:"):
+            continue
+        _self, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            report[name.strip()] = int(cumulative)
+    return report
+
+
+def median_ms(module, repeat):
+    """Median cumulative import time of module in ms, plus the last report."""
+    import_report(module)
+    times = []
+    report = {}
+    for _ in range(repeat):
+        report = import_report(module)
+        times.append(report[module] / 1000.0)
+    return statistics.median(times), report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument(
+        "--budget-ms", type=float, default=50.0,
+        help="fail when the median catalog import takes longer",
+    )
+    parser.add_argument(
+        "--skip-gui", action="store_true", help="do not time the viewer import"
+    )
+    args = parser.parse_args(argv)
+
+    catalog_ms, report = median_ms(CATALOG, args.repeat)
+    gui_modules = sorted(name for name in report if name.split(".")[0] in (
+        "tkinter", "_tkinter",
+    ))
+
+    print(f"{'module':>20} {'ms':>10}")
+    print(f"{CATALOG:>20} {catalog_ms:>10.1f}")
+    if not args.skip_gui:
+        try:
+            gui_ms, _report = median_ms(GUI, args.repeat)
+        except subprocess.CalledProcessError:
+            print(f"{GUI:>20} {'n/a':>10}  (tkinter not available)")
+        else:
+            print(f"{GUI:>20} {gui_ms:>10.1f}")
+
+    failed = False
+    if gui_modules:
+        print(f"\nFAIL: importing {CATALOG} loaded {', '.join(gui_modules)}")
+        failed = True
+    if catalog_ms > args.budget_ms:
+        print(f"\nFAIL: {CATALOG} import {catalog_ms:.1f} ms "
+              f"> budget {args.budget_ms:.1f} ms")
+        failed = True
+    if not failed:
+        print(f"\nOK: {CATALOG} import within {args.budget_ms:.1f} ms, no tkinter")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+bench_search_index.py
+
+Times the Search ID filter on a large synthetic category:
+linear scan (the old behaviour) vs TrigramIndex, plus IdFilter when a
+query is typed again (1-2 character queries come from its cache).
+
+    python benchmarks/bench_search_index.py [--count 500000]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wz_icon_catalog import IdFilter, sort_ids  # noqa: E402
+
+QUERIES = ["2", "20", "200", "2000", "20000", "0501", "999999", "1234567", "zzz"]
+
+
+def make_ids(count, seed=0):
+    """Leading-zero 8-digit IDs like the Item/Cash "05010000" entries."""
+    rng = random.Random(seed)
+    ids = {f"0{rng.randrange(1000000, 9999999)}" for _ in range(count)}
+    while len(ids) < count:
+        ids.add(f"0{rng.randrange(1000000, 9999999)}")
+    return sort_ids(ids)
+
+
+def best_of(fn, repeat):
+    """Median wall time of fn() in milliseconds, plus its last result."""
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - start) * 1000.0)
+    return statistics.median(times), result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    ids = make_ids(args.count)
+
+    start = time.perf_counter()
+    id_filter = IdFilter(ids, auto_index=False)
+    index = id_filter.build_index()
+    build_s = time.perf_counter() - start
+    print(f"{len(ids)} IDs, index built in {build_s:.2f} s\n")
+
+    print(f"{'query':>10} {'hits':>8} {'scan ms':>10} {'index ms':>10} "
+          f"{'again ms':>10}")
+    for query in QUERIES:
+        scan_ms, expected = best_of(
+            lambda: [i for i in ids if query in i], max(1, args.repeat // 4)
+        )
+        index_ms, hits = best_of(lambda: index.search(query), args.repeat)
+        assert hits == expected, query
+
+        def typed_again():
+            id_filter.search("#")   # a query that doesn't extend this one
+            return id_filter.search(query)
+
+        typed_again()
+        again_ms, hits = best_of(typed_again, args.repeat)
+        assert hits == expected, query
+        print(f"{query:>10} {len(hits):>8} {scan_ms:>10.3f} {index_ms:>10.3f} "
+              f"{again_ms:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
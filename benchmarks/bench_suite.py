@@ -0,0 +1,301 @@
+"""
+bench_suite.py
+
+Data and UI hot paths on synthetic catalogs of several sizes, with JSON
+results that can be checked against a stored baseline.
+
+Catalogs come from synthetic_catalog.py (nested Item categories plus
+flat Mob/Npc/Skill types). Scenarios, per size:
+
+    load_json       load_icon_db (json.load)
+    load_stream     load_icon_db(stream=True)
+    load_types      iter_icon_db_types, as the viewer loads JSON
+    get_ids         get_ids for every type/category
+    sort            sort_ids on the largest group
+    filter          typing a query into IdFilter, one keystroke at a time
+
+and, when a display is available, on a real (shown) IconViewerApp:
+
+    ui_type_switch  selecting every type in turn (cold sort + list fill)
+    ui_filter       the same typing through refresh_id_list
+    ui_list_fill    VirtualListbox.set_items with the largest group
+    ui_preview      _on_id_selected on not yet cached IDs (per selection)
+
+    python benchmarks/bench_suite.py [--sizes 10k,100k,1m] [--out run.json]
+    python benchmarks/bench_suite.py --baseline run.json [--threshold 0.25]
+
+With --baseline the exit status is 1 when any scenario's median is more
+than --threshold slower than the baseline (differences below --noise-ms
+are ignored).
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_catalog import make_catalog, parse_count  # noqa: E402
+from wz_icon_catalog import (  # noqa: E402
+    IdFilter,
+    get_categories,
+    get_ids,
+    get_types,
+    iter_icon_db_types,
+    load_icon_db,
+    sort_ids,
+)
+
+QUERY = "1234"
+PREVIEW_SELECTIONS = 50
+
+
+def measure(fn, repeat, setup=None):
+    """Median and best wall time of fn() in ms; setup() runs untimed first."""
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000.0)
+    return {"median_ms": statistics.median(times), "min_ms": min(times)}
+
+
+def groups_of(icon_db):
+    """Every (type, category) key of the catalog; category None when flat."""
+    keys = []
+    for type_name in get_types(icon_db):
+        cats = get_categories(icon_db, type_name) if type_name == "Item" else []
+        keys.extend((type_name, cat) for cat in (cats or [None]))
+    return keys
+
+
+def typing(query):
+    """Successive filter texts while typing query, then one backspace."""
+    return [query[:n] for n in range(1, len(query) + 1)] + [query[:-1]]
+
+
+def data_scenarios(json_path, repeat):
+    icon_db = load_icon_db(json_path)
+    groups = groups_of(icon_db)
+    largest = max(groups, key=lambda key: len(get_ids(icon_db, *key)))
+    ids = list(get_ids(icon_db, *largest))
+    ordered = sort_ids(ids)
+
+    def all_ids():
+        for key in groups:
+            get_ids(icon_db, *key)
+
+    def filter_typing():
+        id_filter = IdFilter(ordered)
+        for text in typing(QUERY):
+            id_filter.search(text)
+
+    return {
+        "load_json": measure(lambda: load_icon_db(json_path), repeat),
+        "load_stream": measure(lambda: load_icon_db(json_path, stream=True), repeat),
+        "load_types": measure(lambda: list(iter_icon_db_types(json_path)), repeat),
+        "get_ids": measure(all_ids, repeat),
+        "sort": measure(lambda: sort_ids(ids), repeat),
+        "filter": measure(filter_typing, repeat),
+    }
+
+
+def make_app():
+    """A shown IconViewerApp, or None without tkinter or a display."""
+    try:
+        import tkinter as tk
+        from wz_icon_viewer_gui import IconViewerApp
+    except ImportError:
+        return None
+    try:
+        app = IconViewerApp()
+    except tk.TclError:
+        return None
+    app.update()
+    return app
+
+
+def ui_scenarios(app, json_path, png_root, repeat, seed=0):
+    app._reset_catalog()
+    app.preview_cache.clear()
+    app.icon_db = icon_db = load_icon_db(json_path)
+    app.png_root = png_root
+    app.var_filter.set("")
+    app._refresh_types()
+    app.update()
+
+    groups = groups_of(icon_db)
+    largest = max(groups, key=lambda key: len(get_ids(icon_db, *key)))
+    types = get_types(icon_db)
+
+    def forget_order():
+        app.id_order = {}
+        app.id_filters = {}
+        app.var_filter.set("")
+
+    def type_switch():
+        for type_name in types:
+            app.var_type.set(type_name)
+            app._on_type_changed()
+            app.update_idletasks()
+
+    def show_largest():
+        forget_order()
+        app.var_type.set(largest[0])
+        app._on_type_changed()
+        if largest[1] is not None:
+            app.var_category.set(largest[1])
+            app._on_category_changed()
+        app.update_idletasks()
+        app.id_filters = {}
+
+    def filter_typing():
+        for text in typing(QUERY):
+            app.var_filter.set(text)
+            app.refresh_id_list()
+            app.update_idletasks()
+
+    results = {
+        "ui_type_switch": measure(type_switch, repeat, setup=forget_order),
+        "ui_filter": measure(filter_typing, repeat, setup=show_largest),
+    }
+
+    show_largest()
+    ids = app.list_ids.items
+
+    def list_fill():
+        app.list_ids.set_items(ids)
+        app.update_idletasks()
+
+    results["ui_list_fill"] = measure(list_fill, repeat)
+
+    rng = random.Random(seed)
+    picks = rng.sample(range(len(ids)), min(len(ids), PREVIEW_SELECTIONS * repeat))
+
+    def preview():
+        batch = [picks.pop() for _ in range(min(len(picks), PREVIEW_SELECTIONS))]
+        for index in batch:
+            app.list_ids.selection_set(index)
+            app._on_id_selected()
+        app.update_idletasks()
+
+    timing = measure(preview, repeat, setup=app.preview_cache.clear)
+    results["ui_preview"] = {
+        name: value / PREVIEW_SELECTIONS for name, value in timing.items()
+    }
+    return results
+
+
+def compare(results, baseline, threshold, noise_ms):
+    """Return the scenario keys that regressed against the baseline."""
+    regressions = []
+    print(f"\n{'scenario':>24} {'base ms':>10} {'now ms':>10} {'change':>8}")
+    for key, now in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        base_ms, now_ms = base["median_ms"], now["median_ms"]
+        change = (now_ms - base_ms) / base_ms if base_ms else 0.0
+        flag = ""
+        if now_ms - base_ms > noise_ms and change > threshold:
+            regressions.append(key)
+            flag = "  REGRESSION"
+        print(f"{key:>24} {base_ms:>10.2f} {now_ms:>10.2f} {change:>+8.0%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes", default="10k,100k",
+        help="comma separated catalog sizes (e.g. 10k,100k,1m)",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--work-dir", help="keep generated catalogs here (reused across runs)"
+    )
+    parser.add_argument("--no-ui", action="store_true", help="skip the UI scenarios")
+    parser.add_argument("--out", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="results JSON from an earlier run")
+    parser.add_argument(
+        "--threshold", type=float, default=0.25,
+        help="allowed slowdown against the baseline (0.25 = 25%%)",
+    )
+    parser.add_argument(
+        "--noise-ms", type=float, default=1.0,
+        help="ignore slowdowns smaller than this many ms",
+    )
+    args = parser.parse_args(argv)
+
+    tmp = None
+    work_dir = args.work_dir
+    if work_dir is None:
+        tmp = tempfile.TemporaryDirectory()
+        work_dir = tmp.name
+
+    app = None if args.no_ui else make_app()
+    if app is None and not args.no_ui:
+        print("No display: running the data scenarios only")
+
+    results = {}
+    try:
+        for size_text in args.sizes.split(","):
+            count = parse_count(size_text)
+            label = size_text.strip().lower()
+            start = time.perf_counter()
+            json_path, png_root = make_catalog(
+                os.path.join(work_dir, f"catalog_{count}"), count, args.seed,
+                pngs=app is not None,
+            )
+            print(f"{label}: catalog ready in {time.perf_counter() - start:.1f} s")
+
+            scenarios = data_scenarios(json_path, args.repeat)
+            if app is not None:
+                scenarios.update(
+                    ui_scenarios(app, json_path, png_root, args.repeat, args.seed)
+                )
+            for name, timing in scenarios.items():
+                results[f"{label}/{name}"] = timing
+                print(f"{label + '/' + name:>24} {timing['median_ms']:>10.2f} ms")
+    finally:
+        if app is not None:
+            app.destroy()
+        if tmp is not None:
+            tmp.cleanup()
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "ui": app is not None,
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to: {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold, args.noise_ms)
+        if regressions:
+            print(f"\n{len(regressions)} scenario(s) slower than "
+                  f"{args.threshold:.0%} over baseline")
+            return 1
+        print("\nNo regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+synthetic_catalog.py
+
+Writes a synthetic icon_db.json (plus matching tiny PNGs) shaped like a
+real dump, for the benchmarks:
+
+- Item is nested by category (Cash, Consume, Etc, Install, Pet); Mob,
+  Npc and Skill are flat
+- IDs look like the real ones, leading zeros included ("05010000",
+  "0100100"), and appear in shuffled order like an unsorted dump
+- every PNG is one of a few small pre-encoded icons, so even a 1M entry
+  root is quick to write
+
+    python benchmarks/synthetic_catalog.py OUT_DIR [--count 100000] [--no-pngs]
+
+OUT_DIR receives icon_db.json and a png/ folder to use as the PNG root.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import wz_png  # noqa: E402
+
+# (type, category or None, share of entries, ID prefix, digits after it)
+LAYOUT = (
+    ("Item", "Cash", 0.10, "05", 6),
+    ("Item", "Consume", 0.15, "02", 6),
+    ("Item", "Etc", 0.15, "04", 6),
+    ("Item", "Install", 0.10, "03", 6),
+    ("Item", "Pet", 0.05, "5", 6),
+    ("Mob", None, 0.20, "0", 6),
+    ("Npc", None, 0.15, "9", 6),
+    ("Skill", None, 0.10, "", 7),
+)
+
+ICON_SIZES = (24, 32, 32, 40, 48)
+MANIFEST = "synthetic.json"
+
+
+def make_icons(seed=0):
+    """A few small RGBA icons as PNG bytes: noisy centre, transparent edge."""
+    rng = random.Random(seed)
+    icons = []
+    for size in ICON_SIZES:
+        pixels = bytearray(size * size * 4)
+        for y in range(size // 4, size - size // 4):
+            row = (y * size + size // 4) * 4
+            span = (size - size // 2) * 4
+            pixels[row:row + span] = rng.randbytes(span)
+        icons.append(wz_png.encode_png(wz_png.PngImage(size, size, pixels)))
+    return icons
+
+
+def make_icon_db(count, seed=0):
+    """Return ({type: ...} catalog dict, [rel_path, ...]) with count entries."""
+    rng = random.Random(seed)
+    icon_db = {}
+    rel_paths = []
+    remaining = count
+    for n, (type_name, category, share, prefix, digits) in enumerate(LAYOUT):
+        # The last group takes the rounding remainder
+        size = remaining if n == len(LAYOUT) - 1 else round(count * share)
+        size = min(size, remaining)
+        remaining -= size
+        if size > 10 ** digits:
+            raise ValueError(f"{count} entries do not fit the {type_name} ID range")
+
+        numbers = rng.sample(range(10 ** digits), size)
+        folder = f"{type_name}/{category}" if category else type_name
+        group = {}
+        for number in numbers:
+            item_id = f"{prefix}{number:0{digits}d}"
+            rel_path = f"{folder}/{item_id}.png"
+            group[item_id] = rel_path
+            rel_paths.append(rel_path)
+
+        if category:
+            icon_db.setdefault(type_name, {})[category] = group
+        else:
+            icon_db[type_name] = group
+    return icon_db, rel_paths
+
+
+def make_catalog(out_dir, count, seed=0, pngs=True):
+    """
+    Write out_dir/icon_db.json (and PNGs under out_dir/png unless pngs is
+    False); return (json_path, png_root).
+
+    A previous run with the same count, seed and pngs is reused.
+    """
+    json_path = os.path.join(out_dir, "icon_db.json")
+    png_root = os.path.join(out_dir, "png")
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    manifest = {"count": count, "seed": seed, "pngs": pngs}
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            if json.load(f) == manifest and os.path.exists(json_path):
+                return json_path, png_root
+    except (OSError, ValueError):
+        pass
+
+    icon_db, rel_paths = make_icon_db(count, seed)
+    os.makedirs(png_root, exist_ok=True)
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(icon_db, f, indent=1)
+
+    if pngs:
+        icons = make_icons(seed)
+        made_dirs = set()
+        for n, rel_path in enumerate(rel_paths):
+            full_path = os.path.join(png_root, rel_path)
+            folder = os.path.dirname(full_path)
+            if folder not in made_dirs:
+                os.makedirs(folder, exist_ok=True)
+                made_dirs.add(folder)
+            with open(full_path, "wb") as f:
+                f.write(icons[n % len(icons)])
+
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    return json_path, png_root
+
+
+def parse_count(text):
+    """Accept 10000, 10k or 1m."""
+    text = text.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    if scale != 1:
+        text = text[:-1]
+    return int(float(text) * scale)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("out_dir")
+    parser.add_argument("--count", type=parse_count, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-pngs", action="store_true")
+    args = parser.parse_args(argv)
+
+    json_path, png_root = make_catalog(
+        args.out_dir, args.count, args.seed, pngs=not args.no_pngs
+    )
+    print(f"Catalog: {json_path}")
+    if not args.no_pngs:
+        print(f"PNG root: {png_root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Sprite atlas packing and the staleness check on load."""
+
+import json
+import os
+
+import wz_png
+from wz_icon_catalog import (
+    atlas_dir_for,
+    build_atlases,
+    load_atlas_index,
+    pack_shelves,
+    scan_png_root,
+)
+
+
+def write_png(root, rel_path, width, height, value):
+    path = os.path.join(root, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pixels = bytearray([value, 0, 0, 255] * (width * height))
+    wz_png.save_png(path, wz_png.PngImage(width, height, pixels))
+
+
+def make_root(tmp_path):
+    png_root = str(tmp_path / "png")
+    write_png(png_root, "Item/Cash/1.png", 4, 3, 10)
+    write_png(png_root, "Item/Cash/2.png", 2, 5, 20)
+    write_png(png_root, "Mob/3.png", 300, 1, 30)      # too large to pack
+    json_path = tmp_path / "icon_db.json"
+    json_path.write_text(json.dumps({
+        "Item": {"Cash": {"1": "Item/Cash/1.png", "2": "Item/Cash/2.png"}},
+        "Mob": {"3": "Mob/3.png", "4": "Mob/missing.png"},
+    }), encoding="utf-8")
+    return str(json_path), png_root
+
+
+def test_pack_shelves_does_not_overlap():
+    sizes = [(5, 5), (3, 2), (4, 4), (6, 1), (2, 6)]
+    places = pack_shelves(sizes, page_size=8)
+    boxes = [(page, x, y, x + w, y + h) for (page, x, y), (w, h) in zip(places, sizes)]
+    for page, x0, y0, x1, y1 in boxes:
+        assert x1 <= 8 and y1 <= 8
+    for i, a in enumerate(boxes):
+        for b in boxes[i + 1:]:
+            if a[0] == b[0]:
+                assert a[3] <= b[1] or b[3] <= a[1] or a[4] <= b[2] or b[4] <= a[2]
+
+
+def test_slices_match_the_source_pngs(tmp_path):
+    json_path, png_root = make_root(tmp_path)
+    _index, icons, pages = build_atlases(json_path, png_root, workers=1)
+    assert (icons, pages) == (2, 1)
+    pages, entries = load_atlas_index(png_root, scan_png_root(png_root))
+    assert sorted(entries) == ["Item/Cash/1.png", "Item/Cash/2.png"]
+    for rel_path, value in (("Item/Cash/1.png", 10), ("Item/Cash/2.png", 20)):
+        page_no, x, y, w, h = entries[rel_path]
+        page = wz_png.load_png(os.path.join(atlas_dir_for(png_root), pages[page_no]))
+        source = wz_png.load_png(os.path.join(png_root, rel_path))
+        assert (w, h) == (source.width, source.height)
+        assert page.pixel(x, y) == page.pixel(x + w - 1, y + h - 1) == (value, 0, 0, 255)
+
+
+def test_changed_or_removed_pngs_fall_back_to_files(tmp_path):
+    json_path, png_root = make_root(tmp_path)
+    build_atlases(json_path, png_root, workers=1)
+    write_png(png_root, "Item/Cash/1.png", 6, 6, 99)
+    os.remove(os.path.join(png_root, "Item/Cash/2.png"))
+
+    assert load_atlas_index(png_root, scan_png_root(png_root))[1] == {}
+    unchecked = load_atlas_index(png_root)[1]
+    assert sorted(unchecked) == ["Item/Cash/1.png", "Item/Cash/2.png"]
+
+
+def test_old_index_versions_are_ignored(tmp_path):
+    _json_path, png_root = make_root(tmp_path)
+    os.makedirs(atlas_dir_for(png_root))
+    with open(os.path.join(atlas_dir_for(png_root), "index.json"), "w") as f:
+        json.dump({"version": 1, "pages": [], "entries": {}}, f)
+    assert load_atlas_index(png_root) is None
@@ -0,0 +1,130 @@
+"""Every catalog backend answers get_types/get_categories/get_ids alike."""
+
+import json
+
+import pytest
+
+from wz_icon_catalog import (
+    CompiledIconDb,
+    SqliteIconDb,
+    StreamingIconDb,
+    build_id_order,
+    close_icon_db,
+    compile_icon_db,
+    get_categories,
+    get_ids,
+    get_sorted_ids,
+    get_types,
+    import_icon_db_sqlite,
+    load_icon_db,
+    open_icon_db,
+)
+
+ICON_DB = {
+    "Item": {
+        "Cash": {"05010000": "Item/Cash/05010000.png", "10": "a.png", "9": "b.png"},
+        "Consume": {"2000000": "Item/Consume/2000000.png", "bad": 1.5, "x": None},
+        "Empty": {},
+        "stray": "Item/stray.png",
+        "count": 3,
+    },
+    "Mob": {"100100": "Mob/100100.png", "0100": "Mob/0100.png", "n": [1, 2]},
+    "Npc": {},
+    "Skill": {"Beginner": {"0001000": "Skill/0001000.png", "deep": {"x": "y"}}},
+    "Version": 95,
+    "Notes": "not a type",
+}
+
+
+@pytest.fixture
+def json_path(tmp_path):
+    path = tmp_path / "icon_db.json"
+    path.write_text(json.dumps(ICON_DB), encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture(params=["dict", "stream", "streaming", "compiled", "sqlite"])
+def catalog(request, json_path):
+    kind = request.param
+    if kind == "dict":
+        db = load_icon_db(json_path)
+    elif kind == "stream":
+        db = load_icon_db(json_path, stream=True)
+    elif kind == "streaming":
+        db = StreamingIconDb(json_path)
+    elif kind == "compiled":
+        db = CompiledIconDb(compile_icon_db(json_path))
+    else:
+        db = SqliteIconDb(import_icon_db_sqlite(json_path))
+    yield db
+    close_icon_db(db)
+
+
+def snapshot(db):
+    """Everything the viewer can see of a catalog, as plain data."""
+    view = {}
+    for type_name in get_types(db):
+        groups = {}
+        for cat in get_categories(db, type_name) or [None]:
+            groups[cat] = (
+                dict(get_ids(db, type_name, cat)),
+                list(get_sorted_ids(db, type_name, cat)),
+            )
+        view[type_name] = groups
+    return view
+
+
+EXPECTED = {
+    "Item": {
+        "Cash": (
+            {"05010000": "Item/Cash/05010000.png", "10": "a.png", "9": "b.png"},
+            ["9", "10", "05010000"],
+        ),
+        "Consume": ({"2000000": "Item/Consume/2000000.png"}, ["2000000"]),
+        "Empty": ({}, []),
+    },
+    "Mob": {
+        None: ({"100100": "Mob/100100.png", "0100": "Mob/0100.png"}, ["0100", "100100"])
+    },
+    "Npc": {None: ({}, [])},
+    "Skill": {"Beginner": ({"0001000": "Skill/0001000.png"}, ["0001000"])},
+}
+
+
+def test_backends_agree(catalog):
+    assert snapshot(catalog) == EXPECTED
+
+
+def test_items_match_lookups(catalog):
+    for type_name, groups in EXPECTED.items():
+        for cat, (entries, _order) in groups.items():
+            view = get_ids(catalog, type_name, cat)
+            assert sorted(view.items()) == sorted(entries.items())
+            assert {k: view[k] for k in view} == entries
+
+
+def test_id_order_covers_every_nested_type(catalog):
+    assert build_id_order(catalog, "Skill") == {("Skill", "Beginner"): ("0001000",)}
+    assert build_id_order(catalog, "Mob") == {("Mob", None): ("0100", "100100")}
+
+
+def test_unknown_lookups_are_empty(catalog):
+    assert get_categories(catalog, "Nope") == []
+    assert dict(get_ids(catalog, "Nope")) == {}
+    assert dict(get_ids(catalog, "Item")) == {}
+    assert dict(get_ids(catalog, "Item", "Nope")) == {}
+    assert dict(get_ids(catalog, "Version")) == {}
+
+
+def test_open_icon_db_sniffs_format(json_path):
+    for path, kind in (
+        (json_path, dict),
+        (compile_icon_db(json_path), CompiledIconDb),
+        (import_icon_db_sqlite(json_path), SqliteIconDb),
+    ):
+        db = open_icon_db(path)
+        try:
+            assert isinstance(db, kind)
+            assert snapshot(db) == EXPECTED
+        finally:
+            close_icon_db(db)
@@ -0,0 +1,105 @@
+"""Search ID filtering: TrigramIndex and IdFilter against a plain scan."""
+
+import random
+
+import pytest
+
+import wz_icon_catalog
+from wz_icon_catalog import IdFilter, TrigramIndex, sort_ids
+
+
+@pytest.fixture(scope="module")
+def ids():
+    rng = random.Random(0)
+    ids = {f"0{rng.randrange(100000, 999999)}" for _ in range(3000)}
+    return sort_ids(ids | {"ab", "x"})
+
+
+def scan(ids, query):
+    return [i for i in ids if query in i]
+
+
+QUERIES = ["1", "12", "123", "1234", "12345", "999", "0", "00", "ab", "zzz", "x"]
+
+
+def test_index_matches_scan(ids):
+    index = TrigramIndex(ids)
+    for query in QUERIES:
+        assert index.search(query) == scan(ids, query)
+        assert index.cost(query) >= len(scan(ids, query))
+
+
+@pytest.mark.parametrize("auto_index", [True, False])
+def test_typing_and_backspacing_match_scan(ids, auto_index):
+    id_filter = IdFilter(ids, auto_index=auto_index)
+    typed = ["5", "50", "501", "5012", "501", "50", "5", "", "9", "98", "987", "7"]
+    for query in typed:
+        assert id_filter.search(query) == (scan(ids, query) if query else ids)
+
+
+def test_index_is_only_built_when_asked(ids):
+    id_filter = IdFilter(ids, auto_index=False)
+    assert id_filter.search("123") == scan(ids, "123")
+    assert id_filter._index is None
+    index = id_filter.build_index()
+    assert id_filter.build_index() is index
+    assert id_filter.search("4567") == scan(ids, "4567")
+
+
+def test_short_queries_are_cached_and_bounded(ids, monkeypatch):
+    monkeypatch.setattr(wz_icon_catalog, "SHORT_QUERY_CACHE", 3)
+    id_filter = IdFilter(ids)
+    first = id_filter.search("1")
+    id_filter.search("2")                     # drops "1" from the history
+    assert id_filter.search("1") is first     # no second scan
+    for query in ("2", "3", "4"):
+        id_filter.search(query)
+    again = id_filter.search("1")
+    assert again == first and again is not first
+    assert len(id_filter._short_hits) == 3
+    assert id_filter._index is None           # short queries never build it
+
+
+class SpyIndex(TrigramIndex):
+    def __init__(self, ids):
+        super().__init__(ids)
+        self.searched = []
+
+    def search(self, query):
+        self.searched.append(query)
+        return super().search(query)
+
+
+def test_growing_query_refines_previous_hits():
+    # Every gram of "12345" is common, but few IDs contain "1234"
+    ids = sort_ids(
+        [f"{prefix}{n:03d}" for prefix in ("123", "234", "345") for n in range(100)]
+        + ["012345", "912340"]
+    )
+    id_filter = IdFilter(ids, auto_index=False)
+    index = id_filter._index = SpyIndex(ids)
+    assert id_filter.search("1234") == ["012345", "912340"]
+    assert index.searched == ["1234"]
+    assert id_filter.search("12345") == ["012345"]
+    assert index.searched == ["1234"]         # refined the 2 previous hits
+
+
+def test_index_wins_when_previous_hits_are_many(ids):
+    id_filter = IdFilter(ids, auto_index=False)
+    index = id_filter._index = SpyIndex(ids)
+    hits = id_filter.search("0")              # nearly every ID
+    assert len(hits) > 100
+    assert id_filter.search("0987") == scan(ids, "0987")
+    assert index.searched == ["0987"]
+
+
+def test_backspace_returns_the_cached_hits(ids):
+    id_filter = IdFilter(ids)
+    first = id_filter.search("45")
+    id_filter.search("456")
+    id_filter.search("4567")
+    assert id_filter.search("456") == scan(ids, "456")
+    assert id_filter.search("45") is first
+    # An edit that is not an extension starts a new chain
+    assert id_filter.search("46") == scan(ids, "46")
+    assert [query for query, _hits in id_filter._history] == ["46"]
@@ -0,0 +1,61 @@
+"""Display order of IDs, precomputed once per type/category."""
+
+import queue
+import threading
+import types
+
+import pytest
+
+from wz_icon_catalog import build_id_order, get_sorted_ids, id_sort_key, sort_ids
+
+ICON_DB = {
+    "Item": {
+        "Cash": {"05010000": "a.png", "10": "b.png", "9": "c.png", "x1": "d.png"},
+        "Etc": {},
+    },
+    "Mob": {"0100": "e.png", "100": "f.png", "2": "g.png", "abc": "h.png"},
+}
+
+
+def test_numbers_sort_numerically_before_other_ids():
+    assert sort_ids(["10", "abc", "9", "05010000", "x1", "0100"]) == [
+        "9", "10", "0100", "05010000", "abc", "x1",
+    ]
+    assert id_sort_key("007") < id_sort_key("8") < id_sort_key("a")
+
+
+def test_order_covers_every_group_of_a_type():
+    assert build_id_order(ICON_DB, "Item") == {
+        ("Item", "Cash"): ("9", "10", "05010000", "x1"),
+        ("Item", "Etc"): (),
+    }
+    order = build_id_order(ICON_DB, "Mob")
+    assert order == {("Mob", None): tuple(get_sorted_ids(ICON_DB, "Mob"))}
+    assert order[("Mob", None)][-1] == "abc"
+
+
+def viewer():
+    pytest.importorskip("tkinter")
+    import wz_icon_viewer_gui
+
+    return wz_icon_viewer_gui
+
+
+def test_viewer_sorts_each_group_at_most_once():
+    gui = viewer()
+    IconViewerApp = gui.IconViewerApp
+    app = types.SimpleNamespace(icon_db=ICON_DB, id_order={}, timer=gui.StageTimer())
+    first = IconViewerApp._sorted_ids(app, "Item", "Cash")
+    assert list(first) == ["9", "10", "05010000", "x1"]
+    app.icon_db = {}     # a second lookup must not sort (or even look) again
+    assert IconViewerApp._sorted_ids(app, "Item", "Cash") is first
+
+
+def test_loader_ships_the_order_with_each_type(tmp_path):
+    path = tmp_path / "icon_db.json"
+    path.write_text('{"Mob": {"100": "a.png", "20": "b.png"}}', encoding="utf-8")
+    out = queue.Queue()
+    viewer().IconViewerApp._load_worker(str(path), out, threading.Event())
+    msgs = [out.get_nowait() for _ in range(out.qsize())]
+    orders = [msg[3] for msg in msgs if msg[0] == "type"]
+    assert orders == [{("Mob", None): ("20", "100")}]
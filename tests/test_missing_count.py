@@ -0,0 +1,64 @@
+"""Background missing-PNG counts across rescans (no display needed)."""
+
+import types
+
+import pytest
+
+pytest.importorskip("tkinter")
+
+from wz_icon_catalog import snapshot_key  # noqa: E402
+from wz_icon_viewer_gui import IconViewerApp  # noqa: E402
+
+
+class Var:
+    def set(self, value):
+        self.value = value
+
+
+def fake_app(files):
+    app = types.SimpleNamespace(
+        png_root="png", png_files=files, png_pack=None, icon_db=object(),
+        current_entries={"1": "Mob/1.png", "2": "Mob/2.png"},
+        missing_counts={}, _missing_jobs=set(), _scan_serial=1,
+        _last_refresh_key=("Mob", "", ""), var_status=Var(), jobs=[], titles=0,
+    )
+
+    def run_in_background(work, on_done, name="background task"):
+        app.jobs.append((name, work, on_done))
+
+    def update_title():
+        app.titles += 1
+
+    app._run_in_background = run_in_background
+    app._update_list_title = update_title
+    return app
+
+
+def finish(app, name):
+    job = next(j for j in app.jobs if j[0] == name)
+    app.jobs.remove(job)
+    job[2](job[1](), None)
+
+
+def test_rescan_during_a_count_starts_a_fresh_one():
+    app = fake_app({snapshot_key("Mob/1.png"): (1, 1)})
+    assert IconViewerApp._missing_count(app, "Mob", "") is None
+    assert [j[0] for j in app.jobs] == ["count missing pngs"]
+
+    # F5 while that count is still running
+    IconViewerApp._on_png_root_scanned(app, 1, {}, None, 0.1)
+    assert IconViewerApp._missing_count(app, "Mob", "") is None
+    assert [j[0] for j in app.jobs].count("count missing pngs") == 2
+
+    finish(app, "count missing pngs")          # the stale one
+    assert app.missing_counts == {} and ("Mob", "") in app._missing_jobs
+    finish(app, "count missing pngs")
+    assert app.missing_counts == {("Mob", ""): 2}
+    assert IconViewerApp._missing_count(app, "Mob", "") == 2
+
+
+def test_count_skips_snapshot_hits():
+    app = fake_app({snapshot_key("Mob/1.png"): (1, 1)})
+    IconViewerApp._missing_count(app, "Mob", "")
+    finish(app, "count missing pngs")
+    assert app.missing_counts == {("Mob", ""): 1} and app.titles == 1
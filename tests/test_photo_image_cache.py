@@ -0,0 +1,81 @@
+"""PhotoImageCache LRU eviction and Tk image cleanup (no display needed)."""
+
+import pytest
+
+tk = pytest.importorskip("tkinter")
+
+from wz_icon_viewer_gui import PhotoImageCache  # noqa: E402
+
+
+class FakeTk:
+    def __init__(self):
+        self.deleted = []
+
+    def call(self, *args):
+        assert args[:2] == ("image", "delete")
+        if args[2] == "gone":
+            raise tk.TclError('image "gone" doesn\'t exist')
+        self.deleted.append(args[2])
+
+
+class FakeImage:
+    """Stands in for a PhotoImage: w x h pixels, 4 bytes each."""
+
+    def __init__(self, interp, name, w, h=1):
+        self.tk = interp
+        self.name = name
+        self._w, self._h = w, h
+
+    def width(self):
+        return self._w
+
+    def height(self):
+        return self._h
+
+
+@pytest.fixture
+def interp():
+    return FakeTk()
+
+
+def test_least_recently_used_is_evicted_and_deleted(interp):
+    cache = PhotoImageCache(budget_bytes=100)
+    a, b, c = (FakeImage(interp, name, 10) for name in "abc")   # 40 bytes each
+    cache.put("a", a)
+    cache.put("b", b)
+    assert cache.get("a") is a           # b is now the oldest
+    cache.put("c", c)
+    assert "b" not in cache and len(cache) == 2
+    assert interp.deleted == ["b"]
+    assert cache.bytes_used == 80
+
+
+def test_new_image_is_kept_even_over_budget(interp):
+    cache = PhotoImageCache(budget_bytes=100)
+    cache.put("a", FakeImage(interp, "a", 10))
+    cache.put("big", FakeImage(interp, "big", 100, 2))
+    assert list(cache._images) == ["big"] and interp.deleted == ["a"]
+    assert cache.bytes_used == 800
+
+
+def test_replacing_a_key_deletes_the_old_image(interp):
+    cache = PhotoImageCache()
+    old = FakeImage(interp, "old", 4)
+    cache.put("k", old)
+    cache.put("k", old)                  # same image again: keep it
+    assert interp.deleted == [] and cache.bytes_used == 16
+    cache.put("k", FakeImage(interp, "new", 8))
+    assert interp.deleted == ["old"] and cache.bytes_used == 32
+
+
+def test_hits_misses_and_clear(interp):
+    cache = PhotoImageCache()
+    cache.put("a", FakeImage(interp, "a", 1))
+    cache.put("b", FakeImage(interp, "gone", 1))   # already deleted in Tk
+    cache.get("a")
+    cache.get("nope")
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert "1 hits / 1 misses, 2 images" in cache.stats_text()
+    cache.clear()
+    assert len(cache) == 0 and cache.bytes_used == 0
+    assert interp.deleted == ["a"]
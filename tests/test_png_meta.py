@@ -0,0 +1,78 @@
+"""PNG metadata sidecar: build, load and staleness checks."""
+
+import json
+import os
+
+import pytest
+
+import wz_png
+from wz_icon_catalog import (
+    build_png_meta_index,
+    load_png_meta_index,
+    main,
+    meta_path_for,
+    scan_png_root,
+)
+
+
+def write_png(path, width, height):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    wz_png.save_png(path, wz_png.PngImage(width, height, bytearray(width * height * 4)))
+
+
+@pytest.fixture
+def root(tmp_path):
+    png_root = tmp_path / "png"
+    write_png(str(png_root / "Item" / "Cash" / "1.png"), 3, 2)
+    write_png(str(png_root / "Mob" / "2.png"), 5, 4)
+    json_path = tmp_path / "icon_db.json"
+    json_path.write_text(json.dumps({
+        "Item": {"Cash": {"1": "Item/Cash/1.png", "9": "Item/Cash/missing.png"}},
+        "Mob": {"2": "Mob/2.png"},
+    }), encoding="utf-8")
+    return str(json_path), str(png_root)
+
+
+def test_build_and_load(root):
+    json_path, png_root = root
+    out_path, found, missing = build_png_meta_index(json_path, png_root, workers=1)
+    assert out_path == meta_path_for(png_root)
+    assert (found, missing) == (2, 1)
+    meta = load_png_meta_index(png_root)
+    assert sorted(meta) == ["Item/Cash/1.png", "Mob/2.png"]
+    assert meta["Mob/2.png"][:4] == [5, 4, 8, wz_png.COLOR_RGBA]
+
+
+def test_rows_go_stale_when_the_png_changes(root):
+    json_path, png_root = root
+    build_png_meta_index(json_path, png_root, workers=1)
+    meta = load_png_meta_index(png_root, scan_png_root(png_root))
+    assert sorted(meta) == ["Item/Cash/1.png", "Mob/2.png"]
+
+    full_path = os.path.join(png_root, "Mob", "2.png")
+    st = os.stat(full_path)
+    write_png(full_path, 5, 4)
+    # Same size, rewritten within the same second: only mtime_ns differs
+    os.utime(full_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1000))
+    meta = load_png_meta_index(png_root, scan_png_root(png_root))
+    assert sorted(meta) == ["Item/Cash/1.png"]
+
+    os.remove(os.path.join(png_root, "Item", "Cash", "1.png"))
+    assert load_png_meta_index(png_root, scan_png_root(png_root)) == {}
+    assert len(load_png_meta_index(png_root)) == 2   # unchecked
+
+
+def test_unknown_version_is_ignored(root):
+    _json_path, png_root = root
+    with open(meta_path_for(png_root), "w", encoding="utf-8") as f:
+        json.dump({"version": 999, "entries": {"Mob/2.png": [1] * 6}}, f)
+    assert load_png_meta_index(png_root) == {}
+
+
+def test_cli_writes_into_png_root(root, capsys):
+    json_path, png_root = root
+    assert main(["meta", json_path, png_root, "-j", "1"]) == 0
+    assert os.path.exists(meta_path_for(png_root))
+    assert "1 paths were missing" in capsys.readouterr().out
+    with pytest.raises(SystemExit):
+        main(["meta", json_path, png_root, "-o", "elsewhere.json"])
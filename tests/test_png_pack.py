@@ -0,0 +1,110 @@
+"""Single-file PNG pack archive."""
+
+import json
+import os
+import threading
+
+import pytest
+
+from wz_icon_catalog import (
+    PngPack,
+    load_thumbnail,
+    pack_path_for,
+    pack_png_root,
+    png_source_stat,
+    read_png_source,
+)
+
+
+@pytest.fixture
+def packed(tmp_path):
+    png_root = tmp_path / "png"
+    files = {f"Mob/{n}.png": os.urandom(50 + n) for n in range(200)}
+    for rel_path, data in files.items():
+        path = png_root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    icon_db = {"Mob": {rel_path[4:-4]: rel_path for rel_path in files}}
+    icon_db["Mob"]["gone"] = "Mob/gone.png"
+    icon_db["Npc"] = {"1": "Npc/./../Npc/1.png"}
+    (png_root / "Npc").mkdir()
+    (png_root / "Npc" / "1.png").write_bytes(b"npc")
+    files["Npc/1.png"] = b"npc"
+    json_path = tmp_path / "icon_db.json"
+    json_path.write_text(json.dumps(icon_db), encoding="utf-8")
+    return str(json_path), str(png_root), files
+
+
+def test_round_trip(packed):
+    json_path, png_root, files = packed
+    out_path, count, missing = pack_png_root(json_path, png_root)
+    assert out_path == pack_path_for(png_root)
+    assert (count, missing) == (len(files), 1)
+
+    pack = PngPack(out_path)
+    try:
+        assert len(pack) == len(files)
+        for rel_path, data in files.items():
+            assert rel_path in pack
+            assert bytes(pack.get(rel_path)) == data
+        assert pack.get("Mob/gone.png") is None
+        assert "Mob/gone.png" not in pack
+    finally:
+        pack.close()
+
+
+def test_sources_prefer_the_pack(packed):
+    json_path, png_root, _files = packed
+    pack = PngPack(pack_png_root(json_path, png_root)[0])
+    try:
+        os.remove(os.path.join(png_root, "Mob", "7.png"))
+        assert png_source_stat(png_root, "Mob/7.png", pack) == (57, pack.mtime_ns)
+        assert len(read_png_source(png_root, "Mob/7.png", pack)) == 57
+        with pytest.raises(OSError):
+            read_png_source(png_root, "Mob/7.png")
+        assert load_thumbnail(None, png_root, "Mob/7.png", 64, pack) != b""
+    finally:
+        pack.close()
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not_a_pack.wzpack"
+    path.write_bytes(b"PK\x03\x04" + bytes(64))
+    with pytest.raises(ValueError):
+        PngPack(str(path))
+
+
+def test_close_waits_for_a_lookup_in_progress(packed, monkeypatch):
+    import wz_icon_catalog
+
+    json_path, png_root, files = packed
+    pack = PngPack(pack_png_root(json_path, png_root)[0])
+    inside = threading.Event()
+    resume = threading.Event()
+    entry = wz_icon_catalog._PACK_ENTRY
+
+    class PausingEntry:
+        size = entry.size
+
+        @staticmethod
+        def unpack_from(buf, offset):
+            # Park the reader in the middle of its binary search
+            if not inside.is_set():
+                inside.set()
+                resume.wait(5)
+            return entry.unpack_from(buf, offset)
+
+    monkeypatch.setattr(wz_icon_catalog, "_PACK_ENTRY", PausingEntry)
+    result = []
+    reader = threading.Thread(target=lambda: result.append(bytes(pack.get("Mob/3.png"))))
+    reader.start()
+    assert inside.wait(5)
+    closer = threading.Thread(target=pack.close)
+    closer.start()
+    closer.join(0.2)
+    assert closer.is_alive()          # blocked until the lookup is done
+    resume.set()
+    reader.join(5)
+    closer.join(5)
+    assert result == [files["Mob/3.png"]]
+    assert pack.get("Mob/3.png") is None
@@ -0,0 +1,47 @@
+"""scan_png_root existence snapshots."""
+
+import os
+
+import pytest
+
+from wz_icon_catalog import scan_png_root, snapshot_key
+
+
+def touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb"):
+        pass
+
+
+def test_lists_pngs_in_every_folder(tmp_path):
+    root = str(tmp_path)
+    pngs = ("Item/Cash/1.png", "Item/Cash/2.PNG", "Mob/3.png", "top.png")
+    for rel_path in pngs:
+        touch(os.path.join(root, rel_path))
+    touch(os.path.join(root, "Mob", "notes.txt"))
+    with open(os.path.join(root, "Mob", "3.png"), "wb") as f:
+        f.write(b"1234")
+    files = scan_png_root(root)
+    assert set(files) == {snapshot_key(rel_path) for rel_path in pngs}
+    assert snapshot_key("Item/./Cash/../Cash/1.png") in files
+    st = os.stat(os.path.join(root, "Mob", "3.png"))
+    assert files[snapshot_key("Mob/3.png")] == (4, st.st_mtime_ns)
+
+
+def test_missing_root_is_empty(tmp_path):
+    assert scan_png_root(str(tmp_path / "nope")) == {}
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="needs symlinks")
+def test_symlink_loops_terminate(tmp_path):
+    root = tmp_path / "png"
+    touch(str(root / "Mob" / "1.png"))
+    try:
+        os.symlink(str(root), str(root / "Mob" / "loop"), target_is_directory=True)
+        os.symlink(str(root / "Mob"), str(root / "alias"), target_is_directory=True)
+    except OSError:
+        pytest.skip("symlinks not permitted here")
+    files = scan_png_root(str(root))
+    # Each real folder is listed once, under whichever path reached it first
+    assert len(files) == 1
+    assert files.keys() & {snapshot_key("Mob/1.png"), snapshot_key("alias/1.png")}
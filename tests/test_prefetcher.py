@@ -0,0 +1,133 @@
+"""PngPrefetcher background reads (no display needed)."""
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("tkinter")
+
+from wz_icon_viewer_gui import PngPrefetcher  # noqa: E402
+
+
+def wait_for(prefetcher, path, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        data = prefetcher.take(path)
+        if data is not None:
+            return data
+        time.sleep(0.005)
+    raise AssertionError(f"{path} was never read")
+
+
+def test_reads_requested_files(tmp_path):
+    path = tmp_path / "a.png"
+    path.write_bytes(b"png bytes")
+    prefetcher = PngPrefetcher()
+    prefetcher.request([str(path), str(tmp_path / "missing.png")])
+    assert wait_for(prefetcher, str(path)) == b"png bytes"
+    assert wait_for(prefetcher, str(tmp_path / "missing.png")) == b""
+
+
+def test_failing_load_does_not_kill_the_thread():
+    def load(path):
+        if path == "bad":
+            raise RuntimeError("database is locked")
+        return path.encode()
+
+    prefetcher = PngPrefetcher(load=load)
+    prefetcher.request(["bad"])
+    assert wait_for(prefetcher, "bad") == b""
+    prefetcher.request(["good"])
+    assert wait_for(prefetcher, "good") == b"good"
+    assert prefetcher._thread.is_alive()
+
+
+def test_cancel_drops_read_ahead():
+    prefetcher = PngPrefetcher(load=lambda path: b"x")
+    prefetcher.request(["a"])
+    wait_for(prefetcher, "a")
+    prefetcher.request(["b"])
+    time.sleep(0.05)
+    prefetcher.cancel()
+    assert prefetcher.take("b") is None
+    assert prefetcher.held_bytes() == 0
+
+
+class GatedLoad:
+    """load() that blocks on each path until release(path)."""
+
+    def __init__(self):
+        self.started = []
+        self._gates = {}
+        self._lock = threading.Lock()
+
+    def _gate(self, path):
+        with self._lock:
+            return self._gates.setdefault(path, threading.Event())
+
+    def __call__(self, path):
+        self.started.append(path)
+        self._gate(path).wait(5)
+        return path.encode()
+
+    def release(self, path):
+        self._gate(path).set()
+
+    def wait_started(self, path, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while path not in self.started:
+            assert time.monotonic() < deadline, f"{path} never started"
+            time.sleep(0.005)
+
+
+def test_request_replaces_the_pending_list():
+    load = GatedLoad()
+    prefetcher = PngPrefetcher(load=load)
+    prefetcher.request(["a", "b", "c"])
+    load.wait_started("a")
+    prefetcher.request(["d"])            # the selection moved on
+    load.release("a")
+    load.release("d")
+    assert wait_for(prefetcher, "d") == b"d"
+    assert wait_for(prefetcher, "a") == b"a"    # already in flight: kept
+    assert load.started == ["a", "d"]
+
+
+def test_held_paths_are_not_read_again():
+    load = GatedLoad()
+    load.release("a")
+    load.release("b")
+    prefetcher = PngPrefetcher(load=load)
+    prefetcher.request(["a"])
+    deadline = time.monotonic() + 5
+    while prefetcher.held_bytes() == 0:
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+    prefetcher.request(["a", "b"])
+    assert wait_for(prefetcher, "b") == b"b"
+    assert load.started == ["a", "b"]
+
+
+def test_read_in_flight_at_cancel_is_discarded():
+    load = GatedLoad()
+    prefetcher = PngPrefetcher(load=load)
+    prefetcher.request(["a"])
+    load.wait_started("a")
+    prefetcher.cancel()
+    load.release("a")
+    load.release("b")
+    prefetcher.request(["b"])
+    assert wait_for(prefetcher, "b") == b"b"
+    assert prefetcher.take("a") is None
+
+
+def test_oldest_reads_are_dropped_past_max_entries():
+    prefetcher = PngPrefetcher(max_entries=2, load=lambda path: path.encode())
+    prefetcher.request(["a", "b", "c"])
+    deadline = time.monotonic() + 5
+    while "c" not in prefetcher._data:       # "c" is read last
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+    assert prefetcher.take("a") is None
+    assert prefetcher.take("b") == b"b" and prefetcher.take("c") == b"c"
@@ -0,0 +1,122 @@
+"""The headless `query` command."""
+
+import io
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from wz_icon_catalog import compile_icon_db, import_icon_db_sqlite, main
+
+ICON_DB = {
+    "Item": {
+        "Cash": {
+            "05010001": "Item/Cash/05010001.png",
+            "05010000": "Item/Cash/05010000.png",
+        },
+        "Consume": {"2000000": "Item/Consume/2000000.png"},
+    },
+    "Mob": {"100100": "Mob/100100.png", "2000000": "Mob/2000000.png"},
+}
+
+
+@pytest.fixture
+def json_path(tmp_path):
+    path = tmp_path / "icon_db.json"
+    path.write_text(json.dumps(ICON_DB), encoding="utf-8")
+    return str(path)
+
+
+def run(capsys, *argv):
+    code = main(["query", *argv])
+    out, err = capsys.readouterr()
+    return code, out, err
+
+
+def rows(out):
+    return [json.loads(line) for line in out.splitlines()]
+
+
+def test_whole_catalog_in_display_order(json_path, capsys):
+    code, out, _err = run(capsys, json_path)
+    assert code == 0
+    assert [(r["type"], r["category"], r["id"]) for r in rows(out)] == [
+        ("Item", "Cash", "05010000"),
+        ("Item", "Cash", "05010001"),
+        ("Item", "Consume", "2000000"),
+        ("Mob", None, "100100"),
+        ("Mob", None, "2000000"),
+    ]
+
+
+def test_type_category_and_filter(json_path, capsys):
+    _code, out, _err = run(capsys, json_path, "-t", "Item", "-c", "Cash", "-f", "001")
+    assert rows(out) == [{
+        "type": "Item", "category": "Cash", "id": "05010001",
+        "path": "Item/Cash/05010001.png",
+    }]
+
+
+def test_tsv_with_png_root(json_path, capsys, tmp_path):
+    root = str(tmp_path / "png")
+    _code, out, _err = run(capsys, json_path, "-t", "Mob", "--format", "tsv",
+                           "--png-root", root)
+    first = out.splitlines()[0].split("\t")
+    assert first == ["Mob", "", "100100", "Mob/100100.png",
+                     os.path.normpath(os.path.join(root, "Mob/100100.png"))]
+
+
+def test_resolve_ids(json_path, capsys, monkeypatch):
+    monkeypatch.setattr("sys.stdin", io.StringIO("100100\n\nnope\n"))
+    code, out, err = run(capsys, json_path, "--id", "2000000", "--ids-from", "-")
+    assert code == 1
+    # An ID can exist under several types
+    assert [(r["type"], r["id"]) for r in rows(out)] == [
+        ("Item", "2000000"), ("Mob", "2000000"), ("Mob", "100100"),
+    ]
+    assert err == "not found: nope\n"
+
+
+@pytest.mark.parametrize("argv, message", [
+    (["-t", "Npc"], "unknown type: Npc"),
+    (["-t", "Item", "-c", "Pet"], "unknown category for Item: Pet"),
+    (["-c", "Cash"], "--category needs --type"),
+])
+def test_bad_arguments(json_path, capsys, argv, message):
+    with pytest.raises(SystemExit) as info:
+        main(["query", json_path, *argv])
+    assert info.value.code == 2
+    assert message in capsys.readouterr().err
+
+
+def test_missing_catalog_is_a_usage_error(tmp_path, capsys):
+    with pytest.raises(SystemExit) as info:
+        main(["query", str(tmp_path / "nope.json")])
+    assert info.value.code == 2
+    assert "cannot open catalog" in capsys.readouterr().err
+
+
+def test_every_catalog_format_answers_alike(json_path, capsys):
+    expected = run(capsys, json_path)[1]
+    sqlite_path = import_icon_db_sqlite(json_path)
+    assert run(capsys, sqlite_path)[1] == expected
+    compiled_path = compile_icon_db(json_path)
+    assert run(capsys, compiled_path)[1] == expected
+    # icon_db.json itself is answered from the up-to-date .wzcat next to it
+    assert run(capsys, json_path)[1] == expected
+
+
+def test_viewer_entry_point_runs_without_tkinter(json_path, tmp_path):
+    # Hide tkinter, as on a Python built without Tk
+    (tmp_path / "tkinter.py").write_text("raise ImportError('no Tk')\n")
+    viewer = os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                          "wz_icon_viewer_gui.py")
+    env = dict(os.environ, PYTHONPATH=str(tmp_path))
+    result = subprocess.run(
+        [sys.executable, viewer, "query", json_path, "-t", "Mob"],
+        capture_output=True, text=True, env=env, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    assert [row["id"] for row in rows(result.stdout)] == ["100100", "2000000"]
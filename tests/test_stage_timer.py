@@ -0,0 +1,52 @@
+"""StageTimer bookkeeping (no display needed)."""
+
+import json
+
+import pytest
+
+pytest.importorskip("tkinter")
+
+from wz_icon_viewer_gui import StageTimer  # noqa: E402
+
+
+def test_disabled_timer_records_nothing():
+    timer = StageTimer()
+    with timer.operation("filter"):
+        with timer.stage("list fill"):
+            pass
+    timer.record("load", {"parse": 0.5})
+    snap = timer.snapshot()
+    assert snap["stages"] == {} and snap["operations"] == {}
+    assert timer.last is None
+
+
+def test_operation_breakdown_and_histogram():
+    timer = StageTimer()
+    timer.enabled = True
+    seen = []
+    timer.listener = seen.append
+    timer.record("load", {"parse": 0.004, "sort": 0.0015})
+
+    name, total_ms, breakdown = timer.last
+    assert name == "load" and total_ms == pytest.approx(5.5)
+    assert breakdown == pytest.approx({"parse": 4.0, "sort": 1.5})
+    assert seen == [timer.last]
+    assert timer.last_text().startswith("load 5.5 ms (parse 4.0, sort 1.5)")
+
+    stages = timer.snapshot()["stages"]
+    assert stages["parse"]["count"] == 1
+    # 4 ms lands in the <= 5 ms bucket
+    assert stages["parse"]["histogram"][StageTimer.BUCKETS_MS.index(5)] == 1
+
+
+def test_counters_are_exported_not_shown(tmp_path):
+    timer = StageTimer()
+    for name in ("refresh requested", "refresh requested", "refresh run"):
+        timer.count(name)
+    path = tmp_path / "timings.json"
+    timer.export(str(path))
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert data["counters"] == {"refresh requested": 2, "refresh run": 1}
+    assert timer.last_text() == ""
+    timer.reset()
+    assert timer.snapshot()["counters"] == {}
@@ -0,0 +1,62 @@
+"""StallWatchdog and its --stall-ms switch (no display needed)."""
+
+import time
+
+import pytest
+
+pytest.importorskip("tkinter")
+
+import wz_icon_viewer_gui as gui  # noqa: E402
+from wz_icon_viewer_gui import StallWatchdog  # noqa: E402
+
+
+def _watch(tmp_path, block):
+    log = tmp_path / "stalls.log"
+    dog = StallWatchdog(str(log), threshold_ms=20)
+    dog.start()
+    try:
+        block(dog)
+        for _ in range(5):     # the main loop is responsive again
+            dog.beat()
+            time.sleep(0.02)
+    finally:
+        dog.stop()
+    return dog, log
+
+
+def test_blocked_main_loop_is_logged(tmp_path):
+    dog, log = _watch(tmp_path, lambda dog: time.sleep(0.3))
+    assert dog.stalls == 1
+    text = log.read_text(encoding="utf-8")
+    assert "main loop blocked" in text and "running again" in text
+
+
+def test_paused_block_is_not_a_stall(tmp_path):
+    def modal(dog):
+        with dog.paused():
+            time.sleep(0.3)
+
+    dog, log = _watch(tmp_path, modal)
+    assert dog.stalls == 0
+    assert not log.exists()
+
+
+def test_log_is_rotated_past_the_cap(tmp_path, monkeypatch):
+    monkeypatch.setattr(gui, "STALL_LOG_MAX_BYTES", 10)
+    log = tmp_path / "stalls.log"
+    dog = StallWatchdog(str(log))
+    dog._write("x" * 20)
+    dog._write("second\n")
+    assert (tmp_path / "stalls.log.1").read_text(encoding="utf-8") == "x" * 20
+    assert log.read_text(encoding="utf-8") == "second\n"
+
+
+@pytest.mark.parametrize(
+    "value, expected", [(None, 0), ("250", 250), ("fast", 0), ("-5", 0), ("", 0)]
+)
+def test_env_threshold_is_parsed_defensively(monkeypatch, value, expected):
+    if value is None:
+        monkeypatch.delenv(gui.STALL_ENV, raising=False)
+    else:
+        monkeypatch.setenv(gui.STALL_ENV, value)
+    assert gui._env_ms(gui.STALL_ENV) == expected
@@ -0,0 +1,126 @@
+"""The streaming icon_db.json reader against json.loads, at any chunk size."""
+
+import json
+
+import pytest
+
+from wz_icon_catalog import (
+    _walk_icon_db,
+    build_icon_db,
+    iter_icon_db,
+    iter_icon_db_types,
+)
+
+CHUNK_SIZES = [1, 2, 3, 4, 7, 8, 64, 1 << 20]
+
+DOCUMENTS = [
+    '{"A": {"3": 1.5e3}}',
+    '{"A": {"1": "a.png", "2": -0.25E-7, "3": "c.png"}}',
+    '{"A": {"1": true, "2": false, "3": null, "4": "d.png"}}',
+    '{"A": {"1": [1, [2.5, {"x": [null]}], "s"], "2": "b.png"}}',
+    '{"A": 12345678901234567890, "B": [], "C": {}}',
+    '{"Item": {"Cash": {"05010000": "Item/Cash/05010000.png", "x": 0}},'
+    ' "Mob": {"100100": "Mob/100100.png"}}',
+    '{"E\\u00e9": {"k\\"ey": "p\\\\ath\\n.png", "\\ud83d\\ude00": "\\u263a.png"}}',
+    '﻿{ "A" :\n\t{ "1" : "a.png" ,\r\n "2" : 7 } }',
+]
+
+
+def expected_records(text):
+    """What the walker should yield for text, derived from json.loads."""
+    records = []
+    for type_name, value in json.loads(text.lstrip("﻿")).items():
+        if not isinstance(value, dict):
+            continue
+        records.append((type_name, None, None, None))
+        for key, sub in value.items():
+            if isinstance(sub, str):
+                records.append((type_name, None, key, sub))
+            elif isinstance(sub, dict):
+                records.append((type_name, key, None, None))
+                records.extend(
+                    (type_name, key, item_id, rel_path)
+                    for item_id, rel_path in sub.items()
+                    if isinstance(rel_path, str)
+                )
+    return records
+
+
+@pytest.fixture(params=range(len(DOCUMENTS)))
+def document(request, tmp_path):
+    text = DOCUMENTS[request.param]
+    path = tmp_path / "icon_db.json"
+    path.write_bytes(text.encode("utf-8"))
+    return str(path), text
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_walk_matches_json_loads(document, chunk_size):
+    path, text = document
+    assert list(_walk_icon_db(path, chunk_size=chunk_size)) == expected_records(text)
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_iter_icon_db_builds_same_catalog(document, chunk_size):
+    path, text = document
+    records = [r for r in expected_records(text) if r[2] is not None]
+    assert list(iter_icon_db(path, chunk_size=chunk_size)) == records
+    assert build_icon_db(_walk_icon_db(path, chunk_size=chunk_size)) == (
+        build_icon_db(expected_records(text))
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64])
+@pytest.mark.parametrize(
+    "text",
+    ['{"A": {"1": 1.}}', '{"A": {"1": 1e}}', '{"A": {"1": tru}}', '{"A": {"1": "x"}',
+     '[]', '{"A": {}} x'],
+)
+def test_malformed_input_is_rejected(tmp_path, chunk_size, text):
+    path = tmp_path / "icon_db.json"
+    path.write_text(text, encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(_walk_icon_db(str(path), chunk_size=chunk_size))
+
+
+@pytest.mark.parametrize("decode_max", [0, 1 << 30])   # streamed, decoded
+def test_types_match_either_way(document, decode_max):
+    path, text = document
+    expected = build_icon_db(expected_records(text))
+    types = list(iter_icon_db_types(path, chunk_size=3, decode_max=decode_max))
+    assert [name for name, _value in types] == list(expected)
+    assert dict(types) == expected
+
+
+@pytest.mark.parametrize(
+    "text",
+    ['{"A": {"1": 1.}}', '{"A": {"1": "x"}', '[]', '{"A": {}} x', '{"A" {}}',
+     '{"A": {}, }', '{"A": {}; "B": {}}', '{,}', ''],
+)
+def test_decoded_types_reject_malformed_input(tmp_path, text):
+    path = tmp_path / "icon_db.json"
+    path.write_text(text, encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_icon_db_types(str(path)))
+
+
+def test_decoded_types_report_progress(tmp_path):
+    path = tmp_path / "icon_db.json"
+    path.write_text(DOCUMENTS[5] + "\n", encoding="utf-8")
+    calls = []
+    list(iter_icon_db_types(str(path), lambda done, total: calls.append(done)))
+    assert len(calls) == 3          # after each type, then the end
+    assert calls == sorted(calls) and calls[-1] == len(DOCUMENTS[5]) + 1
+
+
+def test_progress_reports_bytes_read(tmp_path):
+    path = tmp_path / "icon_db.json"
+    path.write_text(DOCUMENTS[1], encoding="utf-8")
+    calls = []
+    def progress(done, total):
+        calls.append((done, total))
+
+    list(_walk_icon_db(str(path), progress=progress, chunk_size=8))
+    size = len(DOCUMENTS[1])
+    assert calls and calls[-1] == (size, size)
+    assert all(total == size for _done, total in calls)
@@ -0,0 +1,96 @@
+"""ThumbnailGallery grid and visible-range math (no display needed)."""
+
+import itertools
+import types
+
+import pytest
+
+pytest.importorskip("tkinter")
+
+import wz_icon_viewer_gui as gui  # noqa: E402
+from wz_icon_viewer_gui import ThumbnailGallery  # noqa: E402
+
+TILE_W, TILE_H = 20, 30
+
+
+def make_gallery(items, cols=4, rows=3):
+    """A gallery cols tiles wide and rows tiles tall, with no Tk window."""
+    g = ThumbnailGallery.__new__(ThumbnailGallery)
+    g.tile_size = 12
+    g._font = None
+    g.tile_w, g.tile_h = TILE_W, TILE_H
+    g.image_for = None
+    g.views = []
+    g.on_view = g.views.append
+    g.yscrollcommand = None
+    g._items = ()
+    g._top_row = 0
+    g._cols = 1
+    g._selected = None
+    g._tiles = []
+    g.events = []
+    g.height = rows * TILE_H
+    g.winfo_height = lambda: g.height
+    g.event_generate = g.events.append
+    g.focus_set = lambda: None
+    ids = itertools.count(1)
+    g.create_rectangle = g.create_image = g.create_text = lambda *a, **kw: next(ids)
+    g.coords = g.itemconfigure = g.delete = lambda *a, **kw: None
+    g.set_items(items)
+    resize(g, cols * TILE_W, rows * TILE_H)
+    return g
+
+
+def resize(g, width, height):
+    g.height = height
+    g._on_configure(types.SimpleNamespace(width=width, height=height))
+
+
+def test_visible_tiles_come_first_then_the_margins(monkeypatch):
+    monkeypatch.setattr(gui, "GALLERY_MARGIN_ROWS", 1)
+    g = make_gallery([str(i) for i in range(100)])     # 25 rows of 4
+    g.yview("moveto", 0.4)
+    assert g._top_row == 10
+    wanted = g.views[-1]
+    # rows 10-13 (3 visible + the partly shown one), then 14, then 9
+    assert wanted == list(range(40, 56)) + list(range(56, 60)) + list(range(36, 40))
+
+
+def test_wanted_indices_stop_at_the_ends(monkeypatch):
+    monkeypatch.setattr(gui, "GALLERY_MARGIN_ROWS", 2)
+    g = make_gallery([str(i) for i in range(10)])
+    assert g.views[-1] == list(range(10))
+    assert g.yview() == (0.0, 1.0)
+
+
+def test_clicks_map_to_tiles():
+    g = make_gallery([str(i) for i in range(30)])
+    g._scroll_by(2)
+    g._on_click(types.SimpleNamespace(x=2 * TILE_W + 5, y=TILE_H + 1))
+    assert g.curselection() == (14,)                     # row 3, column 2
+    assert g.events == ["<<GallerySelect>>"]
+    assert g._index_at(types.SimpleNamespace(x=4 * TILE_W, y=0)) is None
+    assert g._index_at(types.SimpleNamespace(x=0, y=10 * TILE_H)) is None
+
+
+def test_arrow_keys_move_by_tile_and_row():
+    g = make_gallery([str(i) for i in range(50)])
+    g._move_selection(1)
+    assert g.curselection() == (0,)
+    g._move_selection(g._cols)                           # Down
+    g._move_selection(1)                                 # Right
+    assert g.curselection() == (5,)
+    g._move_selection(g._cols * g._visible_rows())       # Next
+    assert g.curselection() == (17,) and g._top_row == 2
+    g._move_selection(1000)
+    assert g.curselection() == (49,) and g._top_row == 10
+
+
+def test_resizing_keeps_the_first_visible_item():
+    g = make_gallery([str(i) for i in range(100)])
+    g._set_top_row(10)                                   # item 40 at top left
+    resize(g, 8 * TILE_W, 3 * TILE_H)
+    assert g._cols == 8 and g._top_row == 5              # 40 // 8
+    assert len(g._tiles) == (3 + 1) * 8
+    resize(g, 8 * TILE_W, 20 * TILE_H)                   # taller than the grid
+    assert g._top_row == 0
@@ -0,0 +1,136 @@
+"""ThumbnailStore and load_thumbnail."""
+
+import os
+import sqlite3
+
+import pytest
+
+import wz_png
+from wz_icon_catalog import (
+    ThumbnailStore,
+    build_thumbnail_store,
+    load_thumbnail,
+    main,
+    render_thumbnail,
+    stored_thumbnail,
+    thumb_store_path_for,
+)
+
+BOX = 16
+
+
+def write_png(root, rel_path, size):
+    path = os.path.join(root, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pixels = bytearray(os.urandom(size * size * 4))
+    wz_png.save_png(path, wz_png.PngImage(size, size, pixels))
+    return path
+
+
+@pytest.fixture
+def png_root(tmp_path):
+    root = str(tmp_path / "png")
+    write_png(root, "Item/Cash/small.png", 8)
+    write_png(root, "Item/Cash/big.png", 48)
+    return root
+
+
+@pytest.fixture
+def store(png_root):
+    store = ThumbnailStore(thumb_store_path_for(png_root))
+    yield store
+    store.close()
+
+
+def rows(png_root):
+    conn = sqlite3.connect(thumb_store_path_for(png_root))
+    try:
+        return dict(conn.execute("SELECT path, used FROM thumbs"))
+    finally:
+        conn.close()
+
+
+def test_render_scales_only_what_does_not_fit(png_root):
+    with open(os.path.join(png_root, "Item/Cash/small.png"), "rb") as f:
+        small = f.read()
+    assert render_thumbnail(small, BOX) is small
+    with open(os.path.join(png_root, "Item/Cash/big.png"), "rb") as f:
+        image = wz_png.decode_png(render_thumbnail(f.read(), BOX))
+    assert (image.width, image.height) == (16, 16)
+    assert render_thumbnail(b"not a png", BOX) == b"not a png"
+
+
+def test_only_scaled_images_are_stored(png_root, store):
+    small = load_thumbnail(store, png_root, "Item/Cash/small.png", BOX)
+    big = load_thumbnail(store, png_root, "Item/Cash/big.png", BOX)
+    assert wz_png.decode_png(small).width == 8
+    assert wz_png.decode_png(big).width == BOX
+    store.flush()
+    assert list(rows(png_root)) == ["Item/Cash/big.png"]
+    assert stored_thumbnail(store, png_root, "Item/Cash/small.png", BOX) is None
+    assert stored_thumbnail(store, png_root, "Item/Cash/big.png", BOX) == big
+    assert load_thumbnail(store, png_root, "Item/Cash/missing.png", BOX) == b""
+
+
+def test_hits_are_written_in_batches(png_root, store, monkeypatch):
+    import wz_icon_catalog
+
+    monkeypatch.setattr(wz_icon_catalog, "THUMB_STORE_TOUCH_BATCH", 3)
+    load_thumbnail(store, png_root, "Item/Cash/big.png", BOX)
+    before = rows(png_root)["Item/Cash/big.png"]
+
+    load_thumbnail(store, png_root, "Item/Cash/big.png", BOX)
+    load_thumbnail(store, png_root, "Item/Cash/big.png", BOX)
+    assert rows(png_root)["Item/Cash/big.png"] == before       # still in memory
+    store.flush()
+    assert rows(png_root)["Item/Cash/big.png"] > before
+
+
+def test_changed_file_is_rerendered(png_root, store):
+    old = load_thumbnail(store, png_root, "Item/Cash/big.png", BOX)
+    write_png(png_root, "Item/Cash/big.png", 64)
+    new = load_thumbnail(store, png_root, "Item/Cash/big.png", BOX)
+    assert new != old
+    assert wz_png.decode_png(new).width == 16
+
+
+def test_validate_drops_gone_and_now_small_files(png_root, store):
+    write_png(png_root, "Mob/1.png", 40)
+    load_thumbnail(store, png_root, "Item/Cash/big.png", BOX)
+    load_thumbnail(store, png_root, "Mob/1.png", BOX)
+    os.remove(os.path.join(png_root, "Mob/1.png"))
+    write_png(png_root, "Item/Cash/big.png", 10)
+    assert store.validate(png_root) == (0, 0, 2)
+    assert store.bytes_used == 0
+
+
+def test_eviction_keeps_recently_used(png_root):
+    for n in range(4):
+        write_png(png_root, f"Mob/{n}.png", 40)
+    store = ThumbnailStore(thumb_store_path_for(png_root))
+    try:
+        load_thumbnail(store, png_root, "Mob/0.png", BOX)
+        one = store.bytes_used
+        store.max_bytes = one * 3
+        for n in (1, 2):
+            load_thumbnail(store, png_root, f"Mob/{n}.png", BOX)
+        load_thumbnail(store, png_root, "Mob/0.png", BOX)      # hit: now newest
+        load_thumbnail(store, png_root, "Mob/3.png", BOX)      # over budget
+    finally:
+        store.close()
+    assert "Mob/0.png" in rows(png_root)
+    assert "Mob/1.png" not in rows(png_root)
+
+
+def test_cli_thumbs_counts_rendered_icons(png_root, tmp_path, capsys):
+    json_path = tmp_path / "icon_db.json"
+    json_path.write_text(
+        '{"Item": {"Cash": {"1": "Item/Cash/small.png", "2": "Item/Cash/big.png",'
+        ' "3": "Item/Cash/gone.png"}}}',
+        encoding="utf-8",
+    )
+    path, rendered, missing = build_thumbnail_store(str(json_path), png_root, BOX)
+    assert (rendered, missing) == (1, 1)
+    assert main(["thumbs", str(json_path), png_root]) == 0
+    assert "1 paths were missing" in capsys.readouterr().out
+    assert os.path.exists(path)
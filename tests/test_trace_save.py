@@ -0,0 +1,55 @@
+"""Saving the --trace file when the viewer closes (no display needed)."""
+
+import json
+import types
+
+import pytest
+
+pytest.importorskip("tkinter")
+
+import wz_icon_viewer_gui as gui  # noqa: E402
+from wz_icon_viewer_gui import IconViewerApp, TraceRecorder  # noqa: E402
+
+
+def fake_app(trace_path):
+    tracer = TraceRecorder()
+    tracer.enabled = True
+    with tracer.span("filter"):
+        pass
+    app = types.SimpleNamespace(
+        tracer=tracer, trace_path=trace_path, _trace_saved=False,
+        _trace_error=None, watchdog=None, thumb_store=None, destroyed=False,
+    )
+    app._save_trace = lambda: IconViewerApp._save_trace(app)
+    app.destroy = lambda: setattr(app, "destroyed", True)
+    return app
+
+
+def test_close_saves_trace_once(tmp_path):
+    path = tmp_path / "session.json"
+    app = fake_app(str(path))
+    IconViewerApp._on_close(app)
+    assert app.destroyed
+    events = json.loads(path.read_text(encoding="utf-8"))["traceEvents"]
+    assert any(e.get("name") == "filter" for e in events)
+
+    path.unlink()
+    assert app._save_trace() is None   # main() after mainloop: already written
+    assert not path.exists()
+
+
+def test_unwritable_trace_is_reported(tmp_path, monkeypatch):
+    shown = []
+    monkeypatch.setattr(gui.messagebox, "showerror", lambda *a: shown.append(a))
+    app = fake_app(str(tmp_path / "missing" / "session.json"))
+    IconViewerApp._on_close(app)
+    assert app.destroyed
+    assert len(shown) == 1 and "Failed to save trace" in shown[0][1]
+    assert isinstance(app._save_trace(), OSError)
+
+
+def test_no_trace_path_writes_nothing(tmp_path):
+    app = fake_app(None)
+    IconViewerApp._on_close(app)
+    assert app.destroyed and app._save_trace() is None
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,55 @@
+"""Category combo for nested types other than Item (no display needed)."""
+
+import types
+
+import pytest
+
+pytest.importorskip("tkinter")
+
+from wz_icon_viewer_gui import IconViewerApp, StageTimer  # noqa: E402
+
+ICON_DB = {
+    "Item": {"Cash": {"1": "Item/Cash/1.png"}},
+    "Skill": {"Beginner": {"0001000": "a.png"}, "Warrior": {"1001004": "b.png"}},
+    "Mob": {"100100": "Mob/100100.png"},
+}
+
+
+class Var:
+    def __init__(self, value=""):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+def fake_app(type_name):
+    app = types.SimpleNamespace(
+        icon_db=ICON_DB, timer=StageTimer(), var_type=Var(type_name),
+        var_category=Var(), var_filter=Var(" 100 "), combo_category={},
+        shown=None, refreshed=0,
+    )
+    app._show_category = lambda: setattr(app, "shown", True)
+    app._hide_category = lambda: setattr(app, "shown", False)
+    app._category_visible = lambda: app.shown
+    app.refresh_id_list = lambda: setattr(app, "refreshed", app.refreshed + 1)
+    return app
+
+
+def test_any_nested_type_gets_categories():
+    app = fake_app("Skill")
+    IconViewerApp._on_type_changed(app)
+    assert app.shown and app.combo_category["values"] == ["Beginner", "Warrior"]
+    assert app.var_category.get() == "Beginner" and app.refreshed == 1
+    assert IconViewerApp._refresh_key(app) == ("Skill", "Beginner", "100")
+
+
+def test_flat_type_hides_categories():
+    app = fake_app("Mob")
+    app.var_category.set("Cash")
+    IconViewerApp._on_type_changed(app)
+    assert app.shown is False and app.var_category.get() == ""
+    assert IconViewerApp._refresh_key(app) == ("Mob", None, "100")
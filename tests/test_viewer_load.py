@@ -0,0 +1,69 @@
+"""Background catalog loading in the viewer (no display needed)."""
+
+import json
+import queue
+import threading
+
+import pytest
+
+pytest.importorskip("tkinter")
+
+from wz_icon_catalog import compile_icon_db  # noqa: E402
+from wz_icon_viewer_gui import IconViewerApp  # noqa: E402
+
+ICON_DB = {"Item": {"Cash": {"1": "Item/Cash/1.png"}}, "Mob": {"2": "Mob/2.png"}}
+
+
+@pytest.fixture
+def json_path(tmp_path):
+    path = tmp_path / "icon_db.json"
+    path.write_text(json.dumps(ICON_DB), encoding="utf-8")
+    return str(path)
+
+
+def drain(q):
+    msgs = []
+    while True:
+        try:
+            msgs.append(q.get_nowait())
+        except queue.Empty:
+            return msgs
+
+
+def test_worker_streams_json(json_path):
+    out = queue.Queue()
+    IconViewerApp._load_worker(json_path, out, threading.Event())
+    msgs = drain(out)
+    assert [m[1] for m in msgs if m[0] == "type"] == ["Item", "Mob"]
+    assert msgs[-1][0] == "done"
+
+
+def test_worker_opens_compiled_catalog(json_path):
+    compile_icon_db(json_path)
+    out = queue.Queue()
+    IconViewerApp._load_worker(json_path, out, threading.Event())
+    (msg,) = drain(out)
+    assert msg[0] == "catalog"
+    assert msg[1].get_types() == ["Item", "Mob"]
+    msg[1].close()
+
+
+def test_cancelled_worker_closes_its_catalog(json_path):
+    compile_icon_db(json_path)
+    out = queue.Queue()
+    cancel = threading.Event()
+    cancel.set()
+    IconViewerApp._load_worker(json_path, out, cancel)
+    (msg,) = drain(out)
+    assert msg[1]._mm is None
+
+
+def test_abandoned_queue_catalogs_are_closed(json_path):
+    compile_icon_db(json_path)
+    out = queue.Queue()
+    IconViewerApp._load_worker(json_path, out, threading.Event())
+    db = out.queue[0][1]
+    out.put(("progress", 1, 2))
+    IconViewerApp._close_queued_catalogs(out)
+    assert db._mm is None
+    assert out.empty()
@@ -0,0 +1,106 @@
+"""VirtualListbox scrolling and selection math (no display needed)."""
+
+import types
+
+import pytest
+
+pytest.importorskip("tkinter")
+
+from wz_icon_viewer_gui import VirtualListbox  # noqa: E402
+
+ROW = 10
+
+
+def make_list(items, rows=5):
+    """A VirtualListbox without a Tk widget behind it, rows lines tall."""
+    lb = VirtualListbox.__new__(VirtualListbox)
+    lb.row_height = ROW
+    lb.yscrollcommand = None
+    lb._items = ()
+    lb._top = 0
+    lb._selected = None
+    lb._rows = []
+    lb.events = []
+    lb.winfo_height = lambda: rows * ROW
+    lb.event_generate = lb.events.append
+    lb.focus_set = lambda: None
+    lb.set_items(items)
+    return lb
+
+
+def click(lb, y):
+    lb._on_click(types.SimpleNamespace(y=y))
+
+
+def test_items_are_not_copied():
+    items = range(1000)
+    lb = make_list(items)
+    assert lb.items is items and lb.size() == 1000 and lb.get(999) == 999
+
+
+def test_click_maps_rows_to_indices():
+    lb = make_list([str(i) for i in range(100)])
+    lb.yview("moveto", 0.5)
+    click(lb, 2 * ROW + 3)
+    assert lb.curselection() == (52,)
+    assert lb.events == ["<<ListboxSelect>>"]
+
+
+def test_click_below_the_last_item_selects_nothing():
+    lb = make_list(["a", "b"])
+    click(lb, 4 * ROW)
+    assert lb.curselection() == () and lb.events == []
+
+
+def test_scrolling_is_clamped_to_the_last_page():
+    lb = make_list([str(i) for i in range(100)])
+    lb.yview("moveto", 1.0)
+    assert lb._top == 95
+    assert lb.yview() == (0.95, 1.0)
+    lb.yview("scroll", -2, "pages")
+    assert lb._top == 85
+    lb.yview("scroll", -100, "units")
+    assert lb.yview() == (0.0, 0.05)
+
+
+def test_see_scrolls_only_when_needed():
+    lb = make_list([str(i) for i in range(100)])
+    lb.see(3)
+    assert lb._top == 0
+    lb.see(40)
+    assert lb._top == 36          # 40 becomes the bottom row
+    lb.see(10)
+    assert lb._top == 10
+
+
+def test_keyboard_selection_follows_and_clamps():
+    lb = make_list([str(i) for i in range(20)])
+    lb._move_selection(1)          # nothing selected: first visible row
+    assert lb.curselection() == (0,)
+    lb._move_selection(-1)
+    assert lb.curselection() == (0,)
+    lb._move_selection(lb._visible_rows())
+    assert lb.curselection() == (5,) and lb._top == 1
+    lb._select_and_notify(len(lb.items) - 1)
+    assert lb.curselection() == (19,) and lb._top == 15
+    lb._move_selection(1)
+    assert lb.curselection() == (19,)
+    assert len(lb.events) == 5
+
+
+def test_new_items_reset_scroll_and_selection():
+    lb = make_list([str(i) for i in range(50)])
+    lb._select_and_notify(30)
+    lb.set_items(["x"])
+    assert lb.curselection() == () and lb._top == 0
+    assert lb.yview() == (0.0, 1.0)
+    assert make_list([]).yview() == (0.0, 1.0)
+
+
+def test_scrollbar_gets_every_change():
+    lb = make_list([str(i) for i in range(100)])
+    seen = []
+    lb.yscrollcommand = lambda first, last: seen.append((first, last))
+    lb.yview("scroll", 1, "units")
+    lb.selection_set(3)
+    assert seen == [(0.01, 0.06), (0.01, 0.06)]
@@ -0,0 +1,191 @@
+"""wz_png decoding of every color type the decoder claims to support."""
+
+import struct
+import zlib
+
+import pytest
+
+import wz_png
+from wz_png import PngImage, decode_png, encode_png, parse_header, subsample
+
+
+def chunk(ctype, body):
+    return struct.pack(">I", len(body)) + ctype + body + struct.pack(
+        ">I", zlib.crc32(ctype + body)
+    )
+
+
+def pack_row(samples, depth):
+    """Pack one scanline of integer samples at depth bits each."""
+    if depth == 8:
+        return bytes(samples)
+    if depth == 16:
+        return b"".join(struct.pack(">H", s) for s in samples)
+    out = bytearray()
+    per_byte = 8 // depth
+    for i in range(0, len(samples), per_byte):
+        byte = 0
+        group = samples[i:i + per_byte]
+        for n, s in enumerate(group):
+            byte |= s << (8 - depth * (n + 1))
+        out.append(byte)
+    return bytes(out)
+
+
+def paeth(a, b, c):
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    return b if pb <= pc else c
+
+
+def filter_row(ftype, line, prev, bpp):
+    out = bytearray(len(line))
+    for i, x in enumerate(line):
+        a = line[i - bpp] if i >= bpp else 0
+        b = prev[i]
+        c = prev[i - bpp] if i >= bpp else 0
+        pred = (0, a, b, (a + b) >> 1, paeth(a, b, c))[ftype]
+        out[i] = (x - pred) & 0xFF
+    return bytes([ftype]) + bytes(out)
+
+
+def make_png(width, height, depth, color, rows, plte=None, trns=None, filters=(0,)):
+    """PNG bytes for rows of samples; scanline filters cycle through filters."""
+    channels = wz_png._CHANNELS[color]
+    bpp = max(1, channels * depth // 8)
+    raw = bytearray()
+    prev = bytes((width * channels * depth + 7) // 8)
+    for y, samples in enumerate(rows):
+        line = pack_row(samples, depth)
+        raw += filter_row(filters[y % len(filters)], line, prev, bpp)
+        prev = line
+    parts = [
+        wz_png.PNG_SIGNATURE,
+        chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, depth, color, 0, 0, 0)),
+    ]
+    if plte is not None:
+        parts.append(chunk(b"PLTE", plte))
+    if trns is not None:
+        parts.append(chunk(b"tRNS", trns))
+    parts.append(chunk(b"IDAT", zlib.compress(bytes(raw))))
+    parts.append(chunk(b"IEND", b""))
+    return b"".join(parts)
+
+
+def pixels_of(image):
+    return [image.pixel(x, y) for y in range(image.height) for x in range(image.width)]
+
+
+@pytest.mark.parametrize("filters", [(0,), (1,), (2,), (3,), (4,), (0, 1, 2, 3, 4)])
+def test_rgba8_round_trip_with_every_filter(filters):
+    rows = [[(x * 37 + y * 11 + c * 5) % 256 for x in range(7) for c in range(4)]
+            for y in range(5)]
+    image = decode_png(make_png(7, 5, 8, wz_png.COLOR_RGBA, rows, filters=filters))
+    assert bytes(image.pixels) == b"".join(bytes(r) for r in rows)
+    again = decode_png(encode_png(image))
+    assert again.pixels == image.pixels
+
+
+@pytest.mark.parametrize("depth", [1, 2, 4, 8])
+def test_palette_with_trns(depth):
+    n = 1 << depth
+    plte = b"".join(bytes((i, 255 - i, i // 2)) for i in range(n))
+    trns = bytes((0, 128))  # entries past the tRNS table are opaque
+    rows = [[(x + y) % n for x in range(5)] for y in range(3)]
+    image = decode_png(
+        make_png(5, 3, depth, wz_png.COLOR_PALETTE, rows, plte, trns, filters=(0, 2))
+    )
+    alpha = {0: 0, 1: 128}
+    assert pixels_of(image) == [
+        (i, 255 - i, i // 2, alpha.get(i, 255)) for row in rows for i in row
+    ]
+
+
+def test_palette_without_plte_is_rejected():
+    with pytest.raises(ValueError):
+        decode_png(make_png(1, 1, 8, wz_png.COLOR_PALETTE, [[0]]))
+
+
+@pytest.mark.parametrize("depth", [1, 2, 4, 8, 16])
+def test_gray_scales_to_8_bits_and_honours_trns(depth):
+    top = (1 << depth) - 1
+    rows = [[0, top, top // 3, top], [top // 3, 0, top, 0]]
+    trns = struct.pack(">H", top // 3)
+    image = decode_png(make_png(4, 2, depth, wz_png.COLOR_GRAY, rows, trns=trns))
+    expected = []
+    for row in rows:
+        for s in row:
+            v = s >> 8 if depth == 16 else s * (255 // top)
+            expected.append((v, v, v, 0 if s == top // 3 else 255))
+    assert pixels_of(image) == expected
+
+
+@pytest.mark.parametrize("depth", [8, 16])
+def test_gray_alpha(depth):
+    rows = [[10, 20, 30, 40, 50, 60]]
+    if depth == 16:
+        rows = [[s * 257 for s in rows[0]]]
+    image = decode_png(make_png(3, 1, depth, wz_png.COLOR_GRAY_ALPHA, rows, filters=(1,)))
+    assert pixels_of(image) == [(10, 10, 10, 20), (30, 30, 30, 40), (50, 50, 50, 60)]
+
+
+@pytest.mark.parametrize("depth", [8, 16])
+def test_rgb_with_trns_key(depth):
+    widen = 257 if depth == 16 else 1      # 0xAB -> 0xABAB
+    rows = [[s * widen for s in row] for row in ([1, 2, 3, 4, 5, 6], [4, 5, 6, 1, 2, 3])]
+    trns = struct.pack(">HHH", 4 * widen, 5 * widen, 6 * widen)
+    image = decode_png(
+        make_png(2, 2, depth, wz_png.COLOR_RGB, rows, trns=trns, filters=(4, 3))
+    )
+    assert pixels_of(image) == [
+        (1, 2, 3, 255), (4, 5, 6, 0), (4, 5, 6, 0), (1, 2, 3, 255)
+    ]
+
+
+def test_rgb16_key_compares_full_samples():
+    # Same high byte as the key but a different low byte: stays opaque
+    rows = [[0x0400, 0x0500, 0x0600]]
+    trns = struct.pack(">HHH", 0x0401, 0x0500, 0x0600)
+    image = decode_png(make_png(1, 1, 16, wz_png.COLOR_RGB, rows, trns=trns))
+    assert image.pixel(0, 0) == (4, 5, 6, 255)
+
+
+def test_rgba16_keeps_high_bytes():
+    rows = [[0x1234, 0x5678, 0x9ABC, 0xDEF0]]
+    image = decode_png(make_png(1, 1, 16, wz_png.COLOR_RGBA, rows))
+    assert image.pixel(0, 0) == (0x12, 0x56, 0x9A, 0xDE)
+
+
+def test_header_and_errors():
+    data = make_png(3, 2, 8, wz_png.COLOR_RGBA, [[0] * 12] * 2)
+    header = parse_header(data)
+    assert (header.width, header.height, header.bit_depth, header.color_type) == (
+        3, 2, 8, wz_png.COLOR_RGBA
+    )
+    with pytest.raises(ValueError):
+        parse_header(b"GIF89a" + data[6:])
+    corrupt = bytearray(data)
+    corrupt[-20] ^= 0xFF    # inside the IDAT body: CRC no longer matches
+    with pytest.raises(ValueError):
+        decode_png(bytes(corrupt))
+    with pytest.raises(ValueError):
+        decode_png(data[:-12])   # no IEND
+    interlaced = make_png(1, 1, 8, wz_png.COLOR_RGBA, [[0] * 4])
+    ihdr = bytearray(interlaced[16:33])
+    ihdr[-1] = 1
+    interlaced = interlaced[:8] + chunk(b"IHDR", bytes(ihdr)) + interlaced[33:]
+    with pytest.raises(ValueError):
+        decode_png(interlaced)
+
+
+def test_subsample_keeps_every_nth_pixel():
+    pixels = bytearray()
+    for y in range(5):
+        for x in range(5):
+            pixels += bytes((x, y, 0, 255))
+    small = subsample(PngImage(5, 5, pixels), 2)
+    assert (small.width, small.height) == (3, 3)
+    assert small.pixel(2, 1) == (4, 2, 0, 255)
+    assert subsample(small, 1) is small
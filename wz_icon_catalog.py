@@ -0,0 +1,2383 @@
+"""
+wz_icon_catalog.py
+
+Catalog + PNG root data layer for the MapleStory WZ Icon Viewer
+
+- Reads icon_db.json (parsed, streamed, compiled or SQLite catalogs)
+- Builds and reads the PNG root sidecars (metadata, thumbnails, atlases,
+  pack archive)
+- Headless command line (compile / sqlite / meta / thumbs / atlas / pack /
+  query) for build scripts and CI
+- stdlib only and never imports tkinter, so it works without a display
+"""
+
+import codecs
+import json
+import mmap
+import os
+import re
+import sqlite3
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from json.decoder import scanstring
+
+import wz_png
+
+# argparse, concurrent.futures, multiprocessing and urllib.request are
+# imported where they are used: together they are most of this module's
+# import time, and library users (the viewer, scripts doing lookups)
+# rarely need them.
+
+
+THUMB_SIZE = 64          # gallery thumbnails (and stored thumbnails) fit this box
+
+
+# ---------------------------------------------------------------------------
+#  Core logic helpers (JSON + data access)
+# ---------------------------------------------------------------------------
+
+def load_icon_db(path, stream=False):
+    """
+    Load icon_db.json from disk and return the parsed dict.
+
+    With stream=True the file is parsed incrementally (see iter_icon_db)
+    instead of being read into a single string first.
+    """
+    if stream:
+        return build_icon_db(_walk_icon_db(path))
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    if not isinstance(data, dict):
+        raise ValueError("icon_db.json must contain a top-level JSON object")
+
+    return data
+
+
+#  Every backend shows the same catalog as the streaming reader sees it
+#  (see _walk_icon_db): a type is an object, a type holding any object is
+#  nested and its categories are exactly its object members, and only
+#  string values are icon paths. Anything else in a parsed dict (numbers,
+#  lists, stray strings next to categories) is ignored here, and the
+#  compiled writer goes through these same helpers.
+
+def get_types(icon_db):
+    """Return a sorted list of all top-level types."""
+    if hasattr(icon_db, "get_types"):
+        return icon_db.get_types()
+    if not isinstance(icon_db, dict):
+        return []
+    return sorted(str(k) for k, v in icon_db.items() if isinstance(v, dict))
+
+
+def _is_nested_item(icon_db, type_name):
+    """
+    Return True if this type appears to use nested categories:
+    e.g. Item -> { 'Cash': {id: path}, 'Consume': {...}, ... }
+    """
+    if type_name not in icon_db:
+        return False
+    data = icon_db[type_name]
+    if not isinstance(data, dict):
+        return False
+    # If any value is a dict, we treat it as nested
+    return any(isinstance(v, dict) for v in data.values())
+
+
+def get_categories(icon_db, type_name):
+    """
+    For nested types (Item), return sorted category names.
+    For flat types, return [].
+    """
+    if hasattr(icon_db, "get_categories"):
+        return icon_db.get_categories(type_name)
+    if not _is_nested_item(icon_db, type_name):
+        return []
+    data = icon_db[type_name]
+    return sorted(str(k) for k, v in data.items() if isinstance(v, dict))
+
+
+def _path_entries(data):
+    """{id: rel_path} for the string-valued members of one ID group."""
+    return {str(k): v for k, v in data.items() if isinstance(v, str)}
+
+
+def get_ids(icon_db, type_name, category=None):
+    """
+    Return mapping {id: relative_path} for a given type/category.
+
+    - For nested types (Item):
+        type -> category -> {id: path}
+    - For flat types:
+        type -> {id: path}
+    """
+    if hasattr(icon_db, "get_ids"):
+        return icon_db.get_ids(type_name, category)
+    data = icon_db.get(type_name)
+    if not isinstance(data, dict):
+        return {}
+
+    # Nested type
+    if _is_nested_item(icon_db, type_name):
+        if not category:
+            return {}
+        sub = data.get(category)
+        if isinstance(sub, dict):
+            return _path_entries(sub)
+        return {}
+
+    # Flat type
+    return _path_entries(data)
+
+
+def id_sort_key(item_id):
+    """Sort numeric IDs numerically, then others lexicographically."""
+    return (0, int(item_id)) if item_id.isdigit() else (1, item_id)
+
+
+def sort_ids(ids):
+    """Return ids as a list in display order (see id_sort_key)."""
+    return sorted(ids, key=id_sort_key)
+
+
+def get_sorted_ids(icon_db, type_name, category=None):
+    """
+    Return the IDs of a type/category as a sequence in display order.
+
+    Backends that store a precomputed order return it directly; plain
+    dicts are sorted here.
+    """
+    if hasattr(icon_db, "get_sorted_ids"):
+        return icon_db.get_sorted_ids(type_name, category)
+    return sort_ids(get_ids(icon_db, type_name, category))
+
+
+def build_id_order(icon_db, type_name):
+    """
+    Precompute the display order of every ID group of one type.
+
+    Returns {(type_name, category): tuple_of_ids}; category is None for
+    flat types. Meant to run once at load time so that filtering only has
+    to walk an already sorted sequence.
+    """
+    cats = get_categories(icon_db, type_name)
+    return {
+        (type_name, cat): tuple(get_sorted_ids(icon_db, type_name, cat))
+        for cat in (cats or [None])
+    }
+
+
+class TrigramIndex:
+    """
+    Substring index over one display-ordered ID sequence.
+
+    Maps every 3-character gram to the positions (array of u32, ascending)
+    of the IDs containing it. A query only has to verify the IDs in its
+    rarest gram's posting list, and results come out in display order.
+    Queries shorter than 3 characters fall back to a scan.
+    """
+
+    def __init__(self, ids):
+        self.ids = ids
+        postings = {}
+        for pos, item_id in enumerate(ids):
+            for gram in {item_id[i:i + 3] for i in range(len(item_id) - 2)}:
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array("I")
+                posting.append(pos)
+        self._postings = postings
+
+    def search(self, query):
+        """Return the IDs containing query, in display order."""
+        ids = self.ids
+        if len(query) < 3:
+            return [i for i in ids if query in i]
+
+        rarest = None
+        for i in range(len(query) - 2):
+            posting = self._postings.get(query[i:i + 3])
+            if posting is None:
+                return []
+            if rarest is None or len(posting) < len(rarest):
+                rarest = posting
+
+        if len(query) == 3:
+            return [ids[pos] for pos in rarest]
+        return [ids[pos] for pos in rarest if query in ids[pos]]
+
+    def cost(self, query):
+        """Number of IDs search(query) would have to look at."""
+        if len(query) < 3:
+            return len(self.ids)
+        return min(
+            len(self._postings.get(query[i:i + 3], ()))
+            for i in range(len(query) - 2)
+        )
+
+
+SHORT_QUERY_CACHE = 32    # 1-2 character results kept per IdFilter
+
+
+class IdFilter:
+    """
+    Type-as-you-search filter over one display-ordered ID sequence.
+
+    Keeps a stack of (query, hits) where each query contains the one
+    below it. Typing more characters refines the previous hits instead of
+    starting over (whenever that is cheaper than asking the index);
+    backspacing pops back to the cached result for the shorter query.
+    Queries too short for the index are scanned once and then served from
+    a small LRU cache.
+
+    The TrigramIndex is built on first use, or with auto_index=False only
+    by build_index() (e.g. on a worker thread); until then queries scan.
+    """
+
+    def __init__(self, ids, auto_index=True):
+        self.ids = ids
+        self.auto_index = auto_index
+        self._index = None
+        self._history = []
+        self._short_hits = OrderedDict()
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = TrigramIndex(self.ids)
+        return self._index
+
+    def build_index(self):
+        """Build the TrigramIndex now; safe to call from another thread."""
+        if self._index is None:
+            self._index = TrigramIndex(self.ids)
+        return self._index
+
+    def search(self, query):
+        """Return the IDs containing query, in display order."""
+        if not query:
+            return self.ids
+
+        # Drop cached results that the new query does not extend
+        history = self._history
+        while history and history[-1][0] not in query:
+            history.pop()
+        if history and history[-1][0] == query:
+            return history[-1][1]
+
+        short = len(query) < 3
+        hits = self._short_hits.get(query) if short else None
+        if hits is not None:
+            self._short_hits.move_to_end(query)
+        else:
+            # The index cannot help short queries; don't build it for them
+            index = None if short else (self.index if self.auto_index else self._index)
+            base = history[-1][1] if history else self.ids
+            if index is None or len(base) <= index.cost(query):
+                hits = [i for i in base if query in i]
+            else:
+                hits = index.search(query)
+            if short:
+                self._short_hits[query] = hits
+                if len(self._short_hits) > SHORT_QUERY_CACHE:
+                    self._short_hits.popitem(last=False)
+
+        history.append((query, hits))
+        return hits
+
+
+def open_icon_db(path):
+    """
+    Open a catalog from disk.
+
+    Compiled catalogs (see compile_icon_db) and SQLite catalogs (see
+    import_icon_db_sqlite) are detected by their header; anything else is
+    parsed as icon_db.json.
+    """
+    backend = catalog_backend(path)
+    if backend is not None:
+        return backend(path)
+    return load_icon_db(path)
+
+
+def catalog_backend(path):
+    """
+    Sniff the file header and return the backend class for a binary
+    catalog (compiled or SQLite), or None for plain JSON.
+    """
+    with open(path, "rb") as f:
+        head = f.read(len(SQLITE_MAGIC))
+    if head.startswith(COMPILED_MAGIC):
+        return CompiledIconDb
+    if head == SQLITE_MAGIC:
+        return SqliteIconDb
+    return None
+
+
+def close_icon_db(icon_db):
+    """Release any file handles held by a catalog backend."""
+    close = getattr(icon_db, "close", None)
+    if close is not None:
+        close()
+
+
+# ---------------------------------------------------------------------------
+#  Streaming reader (bounded memory, stdlib only)
+# ---------------------------------------------------------------------------
+
+_WS = re.compile(r"[ \t\n\r]*")
+_PAIR = re.compile(
+    r'[ \t\n\r]*"([^"\\]*)"[ \t\n\r]*:[ \t\n\r]*"([^"\\]*)"[ \t\n\r]*([,}])'
+)
+_SCALAR = re.compile(r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?|true|false|null")
+# Everything a number or literal can be made of; a scalar is only complete
+# once a character outside this set (or the end of input) follows it.
+_SCALAR_CHARS = re.compile(r"[-+.0-9A-Za-z]*")
+
+STREAM_CHUNK_SIZE = 1 << 20
+# iter_icon_db_types decodes files up to this size one type at a time with
+# json's C scanner; only larger ones go through the pure-Python tokenizer.
+DECODE_MAX_BYTES = 256 * 1024 * 1024
+
+_DECODER = json.JSONDecoder()
+
+
+class _JsonStream:
+    """
+    Minimal pull tokenizer over a binary file.
+
+    Only the unread tail of the current chunk is kept in memory, so the
+    footprint is bounded by chunk size + the longest single token.
+    """
+
+    def __init__(self, f, chunk_size=STREAM_CHUNK_SIZE, progress=None):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._progress = progress
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._eof = False
+        self.bytes_read = 0
+        self.buf = ""
+        self.pos = 0
+
+    def _fill(self):
+        """Append the next chunk to the buffer; False once the file is exhausted."""
+        if self._eof:
+            return False
+        chunk = self._f.read(self._chunk_size)
+        if chunk:
+            text = self._decoder.decode(chunk)
+            self.bytes_read += len(chunk)
+        else:
+            text = self._decoder.decode(b"", final=True)
+            self._eof = True
+        self.buf = self.buf[self.pos:] + text
+        self.pos = 0
+        if self._progress is not None:
+            self._progress(self.bytes_read)
+        return True
+
+    def error(self, msg):
+        return json.JSONDecodeError(msg, self.buf, self.pos)
+
+    def peek(self):
+        """Skip whitespace and return the next character ('' at end of input)."""
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise self.error(f"Expecting '{char}'")
+        self.pos += 1
+
+    def string(self):
+        """Decode the string at the cursor (which must be on its opening quote)."""
+        while True:
+            try:
+                value, self.pos = scanstring(self.buf, self.pos + 1)
+                return value
+            except json.JSONDecodeError:
+                # Possibly just cut off at the chunk boundary
+                if not self._fill():
+                    raise
+
+    def skip_scalar(self):
+        # A chunk boundary can cut "1.5e3" into "1." + "5e3"; read on until
+        # the token is followed by something that cannot extend it.
+        while _SCALAR_CHARS.match(self.buf, self.pos).end() >= len(self.buf):
+            if not self._fill():
+                break
+        m = _SCALAR.match(self.buf, self.pos)
+        if m is None:
+            raise self.error("Expecting value")
+        self.pos = m.end()
+
+    def skip_value(self):
+        """Skip one complete value of any type."""
+        depth = 0
+        while True:
+            c = self.peek()
+            if c == '"':
+                self.string()
+            elif c in ("{", "["):
+                self.pos += 1
+                depth += 1
+            elif c in ("}", "]"):
+                self.pos += 1
+                depth -= 1
+            elif c in (",", ":") and depth:
+                self.pos += 1
+            elif c == "":
+                raise self.error("Unexpected end of data")
+            else:
+                self.skip_scalar()
+            if depth <= 0:
+                return
+
+    def members(self):
+        """
+        Iterate the object at the cursor, yielding each key.
+
+        The consumer must read (or skip) the member's value before asking
+        for the next key.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                raise self.error("Expecting property name enclosed in double quotes")
+            key = self.string()
+            self.expect(":")
+            yield key
+            delim = self.peek()
+            self.pos += 1
+            if delim == "}":
+                return
+            if delim != ",":
+                self.pos -= 1
+                raise self.error("Expecting ',' delimiter")
+
+    def string_members(self):
+        """
+        Like members(), but yields (key, value) with string values decoded.
+
+        value is None when the member is not a string; the consumer must
+        then read or skip it. Plain "id": "path" pairs take a regex fast
+        path that avoids per-token work.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            m = _PAIR.match(self.buf, self.pos)
+            if m is not None:
+                self.pos = m.end()
+                yield m.group(1), m.group(2)
+                if m.group(3) == "}":
+                    return
+                continue
+
+            if self.peek() != '"':
+                raise self.error("Expecting property name enclosed in double quotes")
+            key = self.string()
+            self.expect(":")
+            if self.peek() == '"':
+                yield key, self.string()
+            else:
+                yield key, None
+            delim = self.peek()
+            self.pos += 1
+            if delim == "}":
+                return
+            if delim != ",":
+                self.pos -= 1
+                raise self.error("Expecting ',' delimiter")
+
+
+def _walk_icon_db(path, progress=None, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Stream icon_db.json as (type, category, id, rel_path) records.
+
+    Besides entry records this also yields shape markers so that empty
+    types/categories survive: (type, None, None, None) when a type object
+    starts and (type, category, None, None) when a category object starts.
+    Values that are neither paths nor objects are skipped.
+    """
+    total = os.path.getsize(path)
+    if progress is None:
+        report = None
+    else:
+        def report(done):
+            progress(done, total)
+
+    with open(path, "rb") as f:
+        stream = _JsonStream(f, chunk_size, report)
+        if stream.peek() != "{":
+            raise ValueError("icon_db.json must contain a top-level JSON object")
+
+        for type_name in stream.members():
+            if stream.peek() != "{":
+                stream.skip_value()
+                continue
+            yield type_name, None, None, None
+
+            for key, value in stream.string_members():
+                if value is not None:
+                    yield type_name, None, key, value
+                elif stream.peek() == "{":
+                    yield type_name, key, None, None
+                    for item_id, rel_path in stream.string_members():
+                        if rel_path is None:
+                            stream.skip_value()
+                        else:
+                            yield type_name, key, item_id, rel_path
+                else:
+                    stream.skip_value()
+
+        if stream.peek() != "":
+            raise stream.error("Extra data")
+
+
+def iter_icon_db(path, progress=None, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Stream icon_db.json without building it in memory.
+
+    Yields (type, category, id, rel_path) tuples; category is None for flat
+    types. progress(done, total), if given, is called with bytes read.
+    """
+    for record in _walk_icon_db(path, progress, chunk_size):
+        if record[2] is not None:
+            yield record
+
+
+def build_icon_db(records):
+    """Assemble (type, category, id, rel_path) records into an icon_db dict."""
+    icon_db = {}
+    for type_name, category, item_id, rel_path in records:
+        data = icon_db.setdefault(type_name, {})
+        if category is not None:
+            data = data.setdefault(category, {})
+        if item_id is not None:
+            data[item_id] = rel_path
+    return icon_db
+
+
+def iter_icon_db_types(path, progress=None, chunk_size=STREAM_CHUNK_SIZE,
+                       decode_max=DECODE_MAX_BYTES):
+    """
+    Read icon_db.json one top-level type at a time.
+
+    Yields (type_name, value) as each type finishes, with value in the
+    shape _walk_icon_db sees (only paths and categories of paths).
+    Files up to decode_max bytes are read whole and each type is decoded
+    by json's C scanner; larger ones are streamed, so only one type's
+    entries are held in memory at once.
+    """
+    if os.path.getsize(path) <= decode_max:
+        yield from _decode_icon_db_types(path, progress)
+        return
+
+    current = None
+    records = []
+    for record in _walk_icon_db(path, progress, chunk_size):
+        if record[0] != current:
+            if current is not None:
+                yield current, build_icon_db(records)[current]
+            current = record[0]
+            records = []
+        records.append(record)
+    if current is not None:
+        yield current, build_icon_db(records)[current]
+
+
+def _decode_icon_db_types(path, progress=None):
+    total = os.path.getsize(path)
+    with open(path, "r", encoding="utf-8-sig") as f:
+        text = f.read()
+    scale = total / max(len(text), 1)   # report characters as bytes
+
+    pos = _WS.match(text).end()
+    if text[pos:pos + 1] != "{":
+        raise ValueError("icon_db.json must contain a top-level JSON object")
+    pos = _WS.match(text, pos + 1).end()
+    delim = "}" if text[pos:pos + 1] == "}" else ","
+    if delim == "}":
+        pos = _WS.match(text, pos + 1).end()
+    while delim == ",":
+        if text[pos:pos + 1] != '"':
+            raise json.JSONDecodeError(
+                "Expecting property name enclosed in double quotes", text, pos
+            )
+        type_name, pos = scanstring(text, pos + 1)
+        pos = _WS.match(text, pos).end()
+        if text[pos:pos + 1] != ":":
+            raise json.JSONDecodeError("Expecting ':' delimiter", text, pos)
+        pos = _WS.match(text, pos + 1).end()
+        value, pos = _DECODER.raw_decode(text, pos)
+        if progress is not None:
+            progress(int(pos * scale), total)
+        if isinstance(value, dict):
+            yield type_name, _icon_db_type(value)
+        pos = _WS.match(text, pos).end()
+        delim = text[pos:pos + 1]
+        if delim not in (",", "}"):
+            raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+        pos = _WS.match(text, pos + 1).end()
+    if pos != len(text):
+        raise json.JSONDecodeError("Extra data", text, pos)
+    if progress is not None:
+        progress(total, total)
+
+
+def _icon_db_type(value):
+    """Keep what the streaming reader keeps of one type's object."""
+    out = {}
+    for key, sub in value.items():
+        if isinstance(sub, str):
+            out[key] = sub
+        elif isinstance(sub, dict):
+            out[key] = {
+                item_id: rel_path for item_id, rel_path in sub.items()
+                if isinstance(rel_path, str)
+            }
+    return out
+
+
+class StreamingIconDb:
+    """
+    Catalog backend that never holds the whole file in memory.
+
+    get_types/get_categories come from a single shape pass that is cached;
+    each get_ids call streams the file once and keeps only matching rows.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._shape = None
+
+    def _get_shape(self):
+        if self._shape is None:
+            shape = {}
+            for type_name, category, _id, _path in _walk_icon_db(self.path):
+                cats = shape.setdefault(type_name, set())
+                if category is not None:
+                    cats.add(category)
+            self._shape = shape
+        return self._shape
+
+    def get_types(self):
+        return sorted(self._get_shape())
+
+    def get_categories(self, type_name):
+        return sorted(self._get_shape().get(type_name, ()))
+
+    def get_ids(self, type_name, category=None):
+        if type_name not in self._get_shape():
+            return {}
+        if self._shape[type_name] and not category:
+            return {}
+        return {
+            item_id: rel_path
+            for t, cat, item_id, rel_path in iter_icon_db(self.path)
+            if t == type_name and cat == category
+        }
+
+
+# ---------------------------------------------------------------------------
+#  Compiled binary catalog
+# ---------------------------------------------------------------------------
+#
+#  Layout (all integers little-endian u32):
+#
+#    header   magic, version, n_types, n_groups, n_entries,
+#             types_off, groups_off, entries_off, order_off, pool_off
+#    types    name_off, name_len, flags, group_start, group_count
+#    groups   type_index, cat_off, cat_len, entry_start, entry_count
+#    entries  id_off, id_len, path_off, path_len   (sorted by id per group)
+#    order    per group, entry indices in display order (see id_sort_key)
+#    pool     UTF-8 string data referenced by the tables above
+#
+#  Flat types own a single group whose cat_len is _NO_CATEGORY.
+
+COMPILED_MAGIC = b"WZIC"
+COMPILED_VERSION = 2
+COMPILED_EXT = ".wzcat"
+
+_HEADER = struct.Struct("<4sIIIIIIIII")
+_ORDER_ITEM = struct.Struct("<I")
+_TYPE_ROW = struct.Struct("<IIIII")
+_GROUP_ROW = struct.Struct("<IIIII")
+_ENTRY_ROW = struct.Struct("<IIII")
+
+_TYPE_NESTED = 1
+_NO_CATEGORY = 0xFFFFFFFF
+
+
+def compiled_path_for(json_path):
+    """Return the default compiled catalog path for an icon_db.json path."""
+    return os.path.splitext(json_path)[0] + COMPILED_EXT
+
+
+def find_compiled_icon_db(json_path):
+    """
+    Return the compiled catalog next to json_path if it exists and is at
+    least as new as the JSON, else None.
+    """
+    compiled = compiled_path_for(json_path)
+    try:
+        if os.path.getmtime(compiled) < os.path.getmtime(json_path):
+            return None
+        with open(compiled, "rb") as f:
+            head = f.read(_HEADER.size)
+    except OSError:
+        return None
+    # Files written by an older format version are treated as stale
+    if len(head) < 8 or struct.unpack_from("<4sI", head) != (
+        COMPILED_MAGIC,
+        COMPILED_VERSION,
+    ):
+        return None
+    return compiled
+
+
+def compile_icon_db(json_path, out_path=None):
+    """Compile icon_db.json into a binary catalog and return its path."""
+    if out_path is None:
+        out_path = compiled_path_for(json_path)
+    write_compiled_icon_db(load_icon_db(json_path), out_path)
+    return out_path
+
+
+def write_compiled_icon_db(icon_db, out_path):
+    """Write a parsed icon_db dict to out_path in the compiled format."""
+    pool = bytearray()
+
+    def intern(text):
+        raw = str(text).encode("utf-8")
+        off = len(pool)
+        pool.extend(raw)
+        return off, len(raw)
+
+    types_tbl = bytearray()
+    groups_tbl = bytearray()
+    entries_tbl = bytearray()
+    order_tbl = bytearray()
+    n_groups = 0
+    n_entries = 0
+
+    def add_group(type_index, category, mapping):
+        nonlocal n_groups, n_entries
+        if category is None:
+            cat_off, cat_len = 0, _NO_CATEGORY
+        else:
+            cat_off, cat_len = intern(category)
+        rows = sorted((k.encode("utf-8"), v) for k, v in mapping.items())
+        groups_tbl.extend(
+            _GROUP_ROW.pack(type_index, cat_off, cat_len, n_entries, len(rows))
+        )
+        for raw_id, rel_path in rows:
+            id_off = len(pool)
+            pool.extend(raw_id)
+            path_off, path_len = intern(rel_path)
+            entries_tbl.extend(
+                _ENTRY_ROW.pack(id_off, len(raw_id), path_off, path_len)
+            )
+        display = sorted(
+            range(len(rows)), key=lambda i: id_sort_key(rows[i][0].decode("utf-8"))
+        )
+        order_tbl.extend(struct.pack(f"<{len(display)}I", *display))
+        n_groups += 1
+        n_entries += len(rows)
+
+    # Same view of the dict as the plain helpers (see get_ids)
+    types = get_types(icon_db)
+    for type_index, type_name in enumerate(types):
+        nested = _is_nested_item(icon_db, type_name)
+        name_off, name_len = intern(type_name)
+        group_start = n_groups
+        if nested:
+            for cat in get_categories(icon_db, type_name):
+                add_group(type_index, cat, get_ids(icon_db, type_name, cat))
+        else:
+            add_group(type_index, None, get_ids(icon_db, type_name))
+        types_tbl.extend(
+            _TYPE_ROW.pack(
+                name_off,
+                name_len,
+                _TYPE_NESTED if nested else 0,
+                group_start,
+                n_groups - group_start,
+            )
+        )
+
+    types_off = _HEADER.size
+    groups_off = types_off + len(types_tbl)
+    entries_off = groups_off + len(groups_tbl)
+    order_off = entries_off + len(entries_tbl)
+    pool_off = order_off + len(order_tbl)
+    header = _HEADER.pack(
+        COMPILED_MAGIC,
+        COMPILED_VERSION,
+        len(types),
+        n_groups,
+        n_entries,
+        types_off,
+        groups_off,
+        entries_off,
+        order_off,
+        pool_off,
+    )
+
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        for chunk in (header, types_tbl, groups_tbl, entries_tbl, order_tbl, pool):
+            f.write(chunk)
+    os.replace(tmp_path, out_path)
+
+
+class _CompiledEntries(Mapping):
+    """Read-only {id: rel_path} view over one group of a compiled catalog."""
+
+    def __init__(self, catalog, start, count):
+        self._catalog = catalog
+        self._start = start
+        self._count = count
+
+    def _row(self, index):
+        return _ENTRY_ROW.unpack_from(
+            self._catalog._mm,
+            self._catalog._entries_off + (self._start + index) * _ENTRY_ROW.size,
+        )
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        text = self._catalog._text
+        for index in range(self._count):
+            id_off, id_len, _path_off, _path_len = self._row(index)
+            yield text(id_off, id_len)
+
+    def items(self):
+        """(id, rel_path) pairs in one pass, without a search per ID."""
+        text = self._catalog._text
+        for index in range(self._count):
+            id_off, id_len, path_off, path_len = self._row(index)
+            yield text(id_off, id_len), text(path_off, path_len)
+
+    def __getitem__(self, item_id):
+        key = str(item_id).encode("utf-8")
+        raw = self._catalog._raw
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            id_off, id_len, path_off, path_len = self._row(mid)
+            probe = raw(id_off, id_len)
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return self._catalog._text(path_off, path_len)
+        raise KeyError(item_id)
+
+
+class _CompiledIds(Sequence):
+    """IDs of one compiled group in display order, decoded on access."""
+
+    def __init__(self, entries):
+        self._entries = entries
+
+    def __len__(self):
+        return self._entries._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        entries = self._entries
+        if index < 0:
+            index += entries._count
+        if not 0 <= index < entries._count:
+            raise IndexError(index)
+        catalog = entries._catalog
+        (row,) = _ORDER_ITEM.unpack_from(
+            catalog._mm,
+            catalog._order_off + (entries._start + index) * _ORDER_ITEM.size,
+        )
+        id_off, id_len, _path_off, _path_len = entries._row(row)
+        return catalog._text(id_off, id_len)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
+class CompiledIconDb:
+    """
+    Memory-mapped compiled catalog.
+
+    Implements get_types / get_categories / get_ids with the same contract
+    as the module-level helpers; entries are decoded on access only.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            (
+                magic,
+                version,
+                n_types,
+                _n_groups,
+                _n_entries,
+                types_off,
+                self._groups_off,
+                self._entries_off,
+                self._order_off,
+                self._pool_off,
+            ) = _HEADER.unpack_from(self._mm, 0)
+        except Exception:
+            self.close()
+            raise
+
+        if magic != COMPILED_MAGIC or version != COMPILED_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported compiled catalog: {path}")
+
+        # The type table is tiny; decode it once.
+        self._types = {}
+        for i in range(n_types):
+            name_off, name_len, flags, group_start, group_count = (
+                _TYPE_ROW.unpack_from(self._mm, types_off + i * _TYPE_ROW.size)
+            )
+            self._types[self._text(name_off, name_len)] = (
+                bool(flags & _TYPE_NESTED),
+                group_start,
+                group_count,
+            )
+
+    def close(self):
+        mm = getattr(self, "_mm", None)
+        if mm is not None:
+            mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _raw(self, off, length):
+        start = self._pool_off + off
+        return self._mm[start:start + length]
+
+    def _text(self, off, length):
+        return self._raw(off, length).decode("utf-8")
+
+    def _groups(self, type_name):
+        _nested, group_start, group_count = self._types[type_name]
+        for i in range(group_start, group_start + group_count):
+            yield _GROUP_ROW.unpack_from(
+                self._mm, self._groups_off + i * _GROUP_ROW.size
+            )
+
+    def get_types(self):
+        return list(self._types)
+
+    def get_categories(self, type_name):
+        if type_name not in self._types or not self._types[type_name][0]:
+            return []
+        return [
+            self._text(cat_off, cat_len)
+            for _t, cat_off, cat_len, _s, _c in self._groups(type_name)
+        ]
+
+    def get_ids(self, type_name, category=None):
+        if type_name not in self._types:
+            return {}
+        nested = self._types[type_name][0]
+        if nested and not category:
+            return {}
+        for _t, cat_off, cat_len, start, count in self._groups(type_name):
+            if not nested or self._text(cat_off, cat_len) == category:
+                return _CompiledEntries(self, start, count)
+        return {}
+
+    def get_sorted_ids(self, type_name, category=None):
+        entries = self.get_ids(type_name, category)
+        if not entries:
+            return []
+        return _CompiledIds(entries)
+
+
+# ---------------------------------------------------------------------------
+#  SQLite catalog
+# ---------------------------------------------------------------------------
+#
+#  One row per icon in a WITHOUT ROWID table clustered on
+#  (type, category, id); flat types use category ''. sort_key holds the
+#  display order (see id_sort_text) and is covered by its own index. The
+#  small types and categories tables keep empty types/categories and the
+#  nested flag.
+
+SQLITE_MAGIC = b"SQLite format 3\x00"
+SQLITE_EXT = ".sqlite"
+SQLITE_SCHEMA_VERSION = 2
+
+_SQLITE_SCHEMA = """
+CREATE TABLE meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE types (
+    name   TEXT PRIMARY KEY,
+    nested INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE categories (
+    type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (type, name)
+) WITHOUT ROWID;
+CREATE TABLE icons (
+    type     TEXT NOT NULL,
+    category TEXT NOT NULL,
+    id       TEXT NOT NULL,
+    path     TEXT NOT NULL,
+    sort_key TEXT NOT NULL,
+    PRIMARY KEY (type, category, id)
+) WITHOUT ROWID;
+CREATE INDEX icons_order ON icons (type, category, sort_key, id);
+"""
+
+
+def id_sort_text(item_id):
+    """
+    Text key whose plain (binary) ordering matches id_sort_key, so SQL can
+    ORDER BY it: numeric IDs become "0" + zero-padded digit count + digits.
+    """
+    if item_id.isdigit():
+        digits = str(int(item_id))
+        return f"0{len(digits):04d}{digits}"
+    return "1" + item_id
+
+
+def sqlite_path_for(json_path):
+    """Return the default SQLite catalog path for an icon_db.json path."""
+    return os.path.splitext(json_path)[0] + SQLITE_EXT
+
+
+def import_icon_db_sqlite(json_path, out_path=None):
+    """
+    Import icon_db.json into a SQLite catalog and return its path.
+
+    The JSON is streamed (see iter_icon_db) and all rows are inserted in a
+    single transaction, so memory stays flat and the import is all or
+    nothing.
+    """
+    if out_path is None:
+        out_path = sqlite_path_for(json_path)
+
+    tmp_path = out_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    types = {}
+    categories = set()
+
+    def icon_rows():
+        for type_name, category, item_id, rel_path in _walk_icon_db(json_path):
+            if category is not None:
+                types[type_name] = 1
+                categories.add((type_name, category))
+            else:
+                types.setdefault(type_name, 0)
+            if item_id is not None:
+                yield (
+                    type_name,
+                    category or "",
+                    item_id,
+                    rel_path,
+                    id_sort_text(item_id),
+                )
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.executescript(_SQLITE_SCHEMA)
+        with conn:
+            # Later duplicates win, matching json.load
+            conn.executemany(
+                "INSERT OR REPLACE INTO icons VALUES (?, ?, ?, ?, ?)", icon_rows()
+            )
+            conn.executemany("INSERT INTO types VALUES (?, ?)", types.items())
+            conn.executemany("INSERT INTO categories VALUES (?, ?)", categories)
+            conn.execute(
+                "INSERT INTO meta VALUES ('schema_version', ?)",
+                (str(SQLITE_SCHEMA_VERSION),),
+            )
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+class _SqliteEntries(Mapping):
+    """
+    Read-only {id: rel_path} view over one type/category of a SQLite
+    catalog. Rows are fetched on demand; nothing is cached except the count.
+    """
+
+    def __init__(self, conn, type_name, category):
+        self._conn = conn
+        self._key = (type_name, category)
+        self._count = None
+
+    def __len__(self):
+        if self._count is None:
+            self._count = self._conn.execute(
+                "SELECT COUNT(*) FROM icons WHERE type = ? AND category = ?",
+                self._key,
+            ).fetchone()[0]
+        return self._count
+
+    def __iter__(self):
+        cur = self._conn.execute(
+            "SELECT id FROM icons WHERE type = ? AND category = ? ORDER BY id",
+            self._key,
+        )
+        for (item_id,) in cur:
+            yield item_id
+
+    def items(self):
+        """(id, rel_path) pairs from one query instead of one per ID."""
+        return iter(self._conn.execute(
+            "SELECT id, path FROM icons WHERE type = ? AND category = ? ORDER BY id",
+            self._key,
+        ))
+
+    def __getitem__(self, item_id):
+        row = self._conn.execute(
+            "SELECT path FROM icons WHERE type = ? AND category = ? AND id = ?",
+            self._key + (str(item_id),),
+        ).fetchone()
+        if row is None:
+            raise KeyError(item_id)
+        return row[0]
+
+
+class SqliteIconDb:
+    """
+    SQLite-backed catalog, opened read-only.
+
+    Implements get_types / get_categories / get_ids with the same contract
+    as the module-level helpers; get_ids returns a lazy view that only
+    queries the rows that are actually accessed.
+    """
+
+    def __init__(self, path):
+        from urllib.request import pathname2url
+
+        self.path = path
+        uri = "file:" + pathname2url(os.path.abspath(path)) + "?mode=ro"
+        # Opened on the loader thread, used on the Tk thread afterwards
+        self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        try:
+            version = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'schema_version'"
+            ).fetchone()
+        except sqlite3.DatabaseError as exc:
+            self.close()
+            raise ValueError(f"Not a WZ icon catalog: {path}") from exc
+        if version is None or version[0] != str(SQLITE_SCHEMA_VERSION):
+            self.close()
+            raise ValueError(f"Unsupported SQLite catalog: {path}")
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _nested(self, type_name):
+        row = self._conn.execute(
+            "SELECT nested FROM types WHERE name = ?", (type_name,)
+        ).fetchone()
+        return None if row is None else bool(row[0])
+
+    def get_types(self):
+        return [
+            name
+            for (name,) in self._conn.execute("SELECT name FROM types ORDER BY name")
+        ]
+
+    def get_categories(self, type_name):
+        return [
+            name
+            for (name,) in self._conn.execute(
+                "SELECT name FROM categories WHERE type = ? ORDER BY name",
+                (type_name,),
+            )
+        ]
+
+    def get_ids(self, type_name, category=None):
+        nested = self._nested(type_name)
+        if nested is None or (nested and not category):
+            return {}
+        return _SqliteEntries(self._conn, type_name, category if nested else "")
+
+    def get_sorted_ids(self, type_name, category=None):
+        nested = self._nested(type_name)
+        if nested is None or (nested and not category):
+            return []
+        cur = self._conn.execute(
+            "SELECT id FROM icons WHERE type = ? AND category = ? "
+            "ORDER BY sort_key, id",
+            (type_name, category if nested else ""),
+        )
+        return [item_id for (item_id,) in cur]
+
+
+# ---------------------------------------------------------------------------
+#  PNG metadata sidecar
+# ---------------------------------------------------------------------------
+#
+#  icon_meta.json in the PNG root maps each rel_path to
+#  [width, height, bit_depth, color_type, file_size, mtime_ns], read from
+#  the IHDR chunk and os.stat only, so the viewer knows an image's size
+#  before decoding it. Paths that were missing at build time are left out.
+
+META_FILENAME = "icon_meta.json"
+META_VERSION = 2
+META_FIELDS = ("width", "height", "bit_depth", "color_type", "size", "mtime_ns")
+
+META_POOL_MIN = 20000    # below this many paths a process pool is not worth it
+META_BATCH = 2000        # paths per worker task
+
+
+def meta_path_for(png_root):
+    """Return the sidecar metadata path for a PNG root folder."""
+    return os.path.join(png_root, META_FILENAME)
+
+
+def read_png_meta(full_path):
+    """Return the META_FIELDS row for one PNG, or None if it is unreadable."""
+    try:
+        st = os.stat(full_path)
+        header = wz_png.read_header(full_path)
+    except (OSError, ValueError, struct.error):
+        return None
+    return [
+        header.width,
+        header.height,
+        header.bit_depth,
+        header.color_type,
+        st.st_size,
+        st.st_mtime_ns,
+    ]
+
+
+def _read_png_meta_batch(png_root, rel_paths):
+    # Top-level so ProcessPoolExecutor can pickle it
+    rows = []
+    for rel_path in rel_paths:
+        full_path = os.path.normpath(os.path.join(png_root, rel_path))
+        rows.append((rel_path, read_png_meta(full_path)))
+    return rows
+
+
+def build_png_meta_index(json_path, png_root, out_path=None, workers=None):
+    """
+    Read the IHDR of every PNG referenced by icon_db.json and write the
+    sidecar index. Returns (out_path, found, missing).
+
+    Large catalogs are spread over a process pool; workers=1 forces a
+    single process.
+    """
+    if out_path is None:
+        out_path = meta_path_for(png_root)
+
+    rel_paths = list(dict.fromkeys(
+        rel_path for _t, _c, _i, rel_path in iter_icon_db(json_path)
+    ))
+    batches = [
+        rel_paths[i:i + META_BATCH] for i in range(0, len(rel_paths), META_BATCH)
+    ]
+
+    if workers == 1 or len(rel_paths) < META_POOL_MIN:
+        results = (_read_png_meta_batch(png_root, batch) for batch in batches)
+        entries = _collect_png_meta(results)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(
+                _read_png_meta_batch, [png_root] * len(batches), batches
+            )
+            entries = _collect_png_meta(results)
+
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"version": META_VERSION, "fields": META_FIELDS, "entries": entries},
+            f,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+    os.replace(tmp_path, out_path)
+    return out_path, len(entries), len(rel_paths) - len(entries)
+
+
+def _collect_png_meta(results):
+    entries = {}
+    for rows in results:
+        for rel_path, row in rows:
+            if row is not None:
+                entries[rel_path] = row
+    return entries
+
+
+def load_png_meta_index(png_root, sources=None):
+    """
+    Load the sidecar index for png_root as {rel_path: row}.
+
+    Returns an empty dict when there is no index or it has an unknown
+    version. With sources (a scan_png_root snapshot) rows whose PNG is
+    gone or has a different size or mtime are left out.
+    """
+    try:
+        with open(meta_path_for(png_root), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != META_VERSION:
+        return {}
+    entries = data.get("entries") or {}
+    if sources is not None:
+        entries = {
+            rel_path: row for rel_path, row in entries.items()
+            if sources.get(snapshot_key(rel_path)) == (row[4], row[5])
+        }
+    return entries
+
+
+def format_png_meta(row):
+    """Short human-readable summary of a metadata row for the info panel."""
+    width, height, _depth, _color, size, _mtime = row
+    if size >= 1024 * 1024:
+        size_text = f"{size / (1024 * 1024):.1f} MiB"
+    elif size >= 1024:
+        size_text = f"{size / 1024:.1f} KiB"
+    else:
+        size_text = f"{size} B"
+    return f"{width} x {height} px    {size_text}"
+
+
+# ---------------------------------------------------------------------------
+#  PNG root snapshot
+# ---------------------------------------------------------------------------
+
+def snapshot_key(rel_path):
+    """Normalize a rel_path for lookups in a scan_png_root snapshot."""
+    return os.path.normcase(os.path.normpath(rel_path))
+
+
+def scan_png_root(png_root):
+    """
+    Walk png_root once with os.scandir and return the PNG files under it
+    as {snapshot_key(rel_path): (size, mtime_ns)}.
+
+    One directory listing per folder replaces a stat per icon on the Tk
+    thread, which is what matters on network shares. On Windows the
+    listing carries the stat data; elsewhere DirEntry.stat costs a stat
+    per PNG, but only here, in the background.
+    """
+    found = {}
+    seen_dirs = set()   # (st_dev, st_ino): symlinked folders may form loops
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        full_dir = os.path.join(png_root, rel_dir)
+        try:
+            st = os.stat(full_dir)
+            it = os.scandir(full_dir)
+        except OSError:
+            continue
+        if (st.st_dev, st.st_ino) in seen_dirs:
+            it.close()
+            continue
+        seen_dirs.add((st.st_dev, st.st_ino))
+        with it:
+            for entry in it:
+                rel_path = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    continue
+                if is_dir:
+                    stack.append(rel_path)
+                elif entry.name.lower().endswith(".png"):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    found[os.path.normcase(rel_path)] = (st.st_size, st.st_mtime_ns)
+    return found
+
+
+# ---------------------------------------------------------------------------
+#  Persistent thumbnail store
+# ---------------------------------------------------------------------------
+#
+#  icon_thumbs.sqlite in the PNG root keeps scaled-down PNGs between
+#  sessions, one row per (rel_path, box). A row is only used while the
+#  source file's size and mtime_ns still match; the least recently used
+#  rows are dropped once the stored bytes exceed the budget.
+
+THUMB_STORE_FILENAME = "icon_thumbs.sqlite"
+THUMB_STORE_VERSION = 2
+THUMB_STORE_BYTES = 256 * 1024 * 1024
+THUMB_STORE_TOUCH_BATCH = 256   # LRU updates kept in memory before a commit
+
+_THUMB_STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS thumbs (
+    path   TEXT NOT NULL,
+    box    INTEGER NOT NULL,
+    size   INTEGER NOT NULL,
+    mtime  INTEGER NOT NULL,
+    used   INTEGER NOT NULL,
+    nbytes INTEGER NOT NULL,
+    data   BLOB NOT NULL,
+    PRIMARY KEY (path, box)
+);
+CREATE INDEX IF NOT EXISTS thumbs_used ON thumbs (used);
+"""
+
+
+def thumb_store_path_for(png_root):
+    """Return the thumbnail store path for a PNG root folder."""
+    return os.path.join(png_root, THUMB_STORE_FILENAME)
+
+
+def subsample_factor(width, height, box):
+    """Integer subsample factor that makes a width x height image fit box."""
+    if width > box or height > box:
+        return max(1, int(max(width / box, height / box)))
+    return 1
+
+
+def render_thumbnail(data, box):
+    """
+    Return PNG bytes for data scaled down to fit a box x box square.
+
+    Uses wz_png, so it is safe off the Tk thread. Images that already fit,
+    and ones wz_png cannot decode (e.g. interlaced), come back unchanged
+    and are scaled by Tk when displayed.
+    """
+    try:
+        header = wz_png.parse_header(data)
+    except (ValueError, struct.error):
+        return data
+    scale = subsample_factor(header.width, header.height, box)
+    if scale == 1:
+        return data
+    try:
+        image = wz_png.decode_png(data)
+    except (ValueError, struct.error, zlib.error):
+        return data
+    return wz_png.encode_png(wz_png.subsample(image, scale))
+
+
+class ThumbnailStore:
+    """
+    SQLite cache of rendered thumbnails (see render_thumbnail).
+
+    Only images that were actually scaled down are stored; ones that
+    already fit are cheaper to read from their file. Hits bump the LRU
+    clock in memory and are written in batches (THUMB_STORE_TOUCH_BATCH,
+    or with the next put, or on flush/close), so a read never commits.
+
+    One connection is shared by the Tk thread and the reader threads;
+    every call holds the store's lock.
+    """
+
+    def __init__(self, path, max_bytes=THUMB_STORE_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._touched = {}            # (path, box) -> clock not yet written
+
+        conn = sqlite3.connect(path, check_same_thread=False)
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.executescript(_THUMB_STORE_SCHEMA)
+            row = conn.execute(
+                "SELECT value FROM meta WHERE key = 'version'"
+            ).fetchone()
+            if row is None or row[0] != str(THUMB_STORE_VERSION):
+                conn.execute("DELETE FROM thumbs")
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('version', ?)",
+                    (str(THUMB_STORE_VERSION),),
+                )
+            conn.commit()
+            self.bytes_used, self._clock = conn.execute(
+                "SELECT COALESCE(SUM(nbytes), 0), COALESCE(MAX(used), 0) FROM thumbs"
+            ).fetchone()
+        except sqlite3.Error:
+            conn.close()
+            raise
+        self._conn = conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._write_touches()
+                self._conn.commit()
+                self._conn.close()
+                self._conn = None
+
+    def flush(self):
+        """Write pending LRU updates now."""
+        with self._lock:
+            if self._conn is not None and self._touched:
+                self._write_touches()
+                self._conn.commit()
+
+    def get(self, rel_path, box, size, mtime):
+        """Stored thumbnail bytes, or None if missing or out of date."""
+        with self._lock:
+            if self._conn is None:
+                return None
+            row = self._conn.execute(
+                "SELECT size, mtime, data FROM thumbs WHERE path = ? AND box = ?",
+                (rel_path, box),
+            ).fetchone()
+            if row is None or row[0] != size or row[1] != mtime:
+                return None
+            self._clock += 1
+            self._touched[(rel_path, box)] = self._clock
+            if len(self._touched) >= THUMB_STORE_TOUCH_BATCH:
+                self._write_touches()
+                self._conn.commit()
+            return row[2]
+
+    def put(self, rel_path, box, size, mtime, data):
+        with self._lock:
+            if self._conn is None:
+                return
+            old = self._conn.execute(
+                "SELECT nbytes FROM thumbs WHERE path = ? AND box = ?",
+                (rel_path, box),
+            ).fetchone()
+            self._clock += 1
+            self._touched.pop((rel_path, box), None)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO thumbs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (rel_path, box, size, mtime, self._clock, len(data), data),
+            )
+            self.bytes_used += len(data) - (old[0] if old else 0)
+            # Eviction goes by `used`, so write the pending hits first
+            self._write_touches()
+            if self.bytes_used > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def discard(self, rel_path, box):
+        with self._lock:
+            if self._conn is None:
+                return
+            row = self._conn.execute(
+                "SELECT nbytes FROM thumbs WHERE path = ? AND box = ?",
+                (rel_path, box),
+            ).fetchone()
+            if row is None:
+                return
+            self._conn.execute(
+                "DELETE FROM thumbs WHERE path = ? AND box = ?", (rel_path, box)
+            )
+            self._touched.pop((rel_path, box), None)
+            self.bytes_used -= row[0]
+            self._conn.commit()
+
+    def _write_touches(self):
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE thumbs SET used = ? WHERE path = ? AND box = ?",
+                [(used, path, box) for (path, box), used in self._touched.items()],
+            )
+            self._touched = {}
+
+    def _evict(self):
+        # Drop least recently used rows down to 90% of the budget
+        target = self.max_bytes * 9 // 10
+        doomed = []
+        cur = self._conn.execute(
+            "SELECT path, box, nbytes FROM thumbs ORDER BY used"
+        )
+        for path, box, nbytes in cur:
+            if self.bytes_used <= target:
+                break
+            doomed.append((path, box))
+            self.bytes_used -= nbytes
+        cur.close()
+        self._conn.executemany(
+            "DELETE FROM thumbs WHERE path = ? AND box = ?", doomed
+        )
+
+    def validate(self, png_root, pack=None):
+        """
+        Re-check every row against its source file (in pack, if given):
+        rows whose file is gone are dropped, rows whose file changed are
+        re-rendered. Returns (kept, refreshed, removed).
+        """
+        with self._lock:
+            if self._conn is None:
+                return 0, 0, 0
+            rows = self._conn.execute(
+                "SELECT path, box, size, mtime FROM thumbs"
+            ).fetchall()
+
+        kept = refreshed = removed = 0
+        for rel_path, box, size, mtime in rows:
+            try:
+                current = png_source_stat(png_root, rel_path, pack)
+                if current == (size, mtime):
+                    kept += 1
+                    continue
+                data = read_png_source(png_root, rel_path, pack)
+            except OSError:
+                self.discard(rel_path, box)
+                removed += 1
+                continue
+            thumb = render_thumbnail(data, box)
+            if thumb is data:
+                # Now fits the box: read from the file from here on
+                self.discard(rel_path, box)
+                removed += 1
+                continue
+            self.put(rel_path, box, *current, thumb)
+            refreshed += 1
+        return kept, refreshed, removed
+
+
+def load_thumbnail(store, png_root, rel_path, box, pack=None):
+    """
+    Thumbnail bytes for rel_path, from the store when it is up to date,
+    otherwise rendered from the PNG (and stored if it had to be scaled
+    down). Returns b"" if the PNG cannot be read. store and pack may be
+    None.
+    """
+    return _load_thumbnail(store, png_root, rel_path, box, pack)[0]
+
+
+def _load_thumbnail(store, png_root, rel_path, box, pack):
+    # (data, stored): stored is False for images served as they are
+    try:
+        size, mtime = png_source_stat(png_root, rel_path, pack)
+        if store is not None:
+            data = store.get(rel_path, box, size, mtime)
+            if data is not None:
+                return data, True
+        source = read_png_source(png_root, rel_path, pack)
+    except OSError:
+        return b"", False
+    data = render_thumbnail(source, box)
+    if data is source:
+        return data, False
+    if store is not None:
+        store.put(rel_path, box, size, mtime, data)
+    return data, store is not None
+
+
+def build_thumbnail_store(json_path, png_root, box=THUMB_SIZE):
+    """
+    Validate the PNG root's thumbnail store and render whatever is missing
+    for the catalog. Returns (path, rendered, missing); icons that already
+    fit the box are not stored and not counted as rendered.
+    """
+    store = ThumbnailStore(thumb_store_path_for(png_root))
+    try:
+        store.validate(png_root)
+        rendered = missing = 0
+        seen = set()
+        for _t, _c, _i, rel_path in iter_icon_db(json_path):
+            rel_path = os.path.normpath(rel_path).replace(os.sep, "/")
+            if rel_path in seen:
+                continue
+            seen.add(rel_path)
+            if stored_thumbnail(store, png_root, rel_path, box) is not None:
+                continue
+            data, stored = _load_thumbnail(store, png_root, rel_path, box, None)
+            if not data:
+                missing += 1
+            elif stored:
+                rendered += 1
+    finally:
+        store.close()
+    return store.path, rendered, missing
+
+
+def stored_thumbnail(store, png_root, rel_path, box, pack=None):
+    """Like load_thumbnail, but only ever answers from the store (or None)."""
+    if store is None:
+        return None
+    try:
+        size, mtime = png_source_stat(png_root, rel_path, pack)
+    except OSError:
+        return None
+    return store.get(rel_path, box, size, mtime)
+
+
+# ---------------------------------------------------------------------------
+#  Sprite atlases
+# ---------------------------------------------------------------------------
+#
+#  icon_atlas/ in the PNG root holds, per type/category, one or more atlas
+#  PNGs with the group's icons shelf-packed, plus index.json mapping
+#  rel_path -> [page, x, y, width, height, size, mtime_ns], the last two
+#  being the source PNG's stat at build time. Reading one atlas replaces
+#  hundreds of tiny file opens. Icons larger than ATLAS_MAX_ICON, and ones
+#  wz_png cannot decode, are left out and keep loading from their files,
+#  and so do icons whose PNG changed after the build.
+
+ATLAS_DIRNAME = "icon_atlas"
+ATLAS_INDEX = "index.json"
+ATLAS_VERSION = 2
+ATLAS_PAGE_SIZE = 2048
+ATLAS_MAX_ICON = 256
+
+
+def atlas_dir_for(png_root):
+    """Return the atlas folder for a PNG root folder."""
+    return os.path.join(png_root, ATLAS_DIRNAME)
+
+
+def pack_shelves(sizes, page_size=ATLAS_PAGE_SIZE):
+    """
+    Shelf-pack (width, height) boxes, tallest first, onto page_size
+    square pages. Returns (page, x, y) for each box, in input order.
+    """
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    places = [None] * len(sizes)
+    page = x = y = shelf_h = 0
+    for i in order:
+        w, h = sizes[i]
+        if x + w > page_size:
+            x, y, shelf_h = 0, y + shelf_h, 0
+        if y + h > page_size:
+            page, x, y, shelf_h = page + 1, 0, 0, 0
+        places[i] = (page, x, y)
+        x += w
+        shelf_h = max(shelf_h, h)
+    return places
+
+
+def _pack_atlas_group(png_root, out_dir, group_no, rel_paths):
+    # Top-level so ProcessPoolExecutor can pickle it
+    images = []
+    for rel_path in rel_paths:
+        full_path = os.path.normpath(os.path.join(png_root, rel_path))
+        try:
+            st = os.stat(full_path)
+            image = wz_png.load_png(full_path)
+        except (OSError, ValueError, struct.error, zlib.error):
+            continue
+        if image.width <= ATLAS_MAX_ICON and image.height <= ATLAS_MAX_ICON:
+            images.append((rel_path, (st.st_size, st.st_mtime_ns), image))
+    if not images:
+        return [], []
+
+    places = pack_shelves([(image.width, image.height) for _r, _s, image in images])
+
+    extents = [[0, 0] for _ in range(max(page for page, _x, _y in places) + 1)]
+    for (_r, _s, image), (page, x, y) in zip(images, places):
+        extent = extents[page]
+        extent[0] = max(extent[0], x + image.width)
+        extent[1] = max(extent[1], y + image.height)
+    canvases = [wz_png.PngImage(w, h, bytearray(w * h * 4)) for w, h in extents]
+
+    entries = []
+    for (rel_path, source, image), (page, x, y) in zip(images, places):
+        canvas = canvases[page]
+        stride = canvas.width * 4
+        for row in range(image.height):
+            start = (y + row) * stride + x * 4
+            canvas.pixels[start:start + image.width * 4] = image.row(row)
+        entries.append((rel_path, page, x, y, image.width, image.height, *source))
+
+    names = []
+    for page, canvas in enumerate(canvases):
+        name = f"{group_no:05d}_{page:02d}.png"
+        wz_png.save_png(os.path.join(out_dir, name), canvas)
+        names.append(name)
+    return names, entries
+
+
+def build_atlases(json_path, png_root, workers=None):
+    """
+    Pack each type/category of icon_db.json into atlas pages under the PNG
+    root and write the index. Returns (index_path, icons, pages).
+
+    Groups are packed in a process pool for large catalogs (see
+    build_png_meta_index); workers=1 forces a single process.
+    """
+    out_dir = atlas_dir_for(png_root)
+    os.makedirs(out_dir, exist_ok=True)
+
+    groups = {}
+    for type_name, category, _item_id, rel_path in iter_icon_db(json_path):
+        rel_path = os.path.normpath(rel_path).replace(os.sep, "/")
+        groups.setdefault((type_name, category), {})[rel_path] = None
+    jobs = [list(rel_paths) for rel_paths in groups.values()]
+    total = sum(len(rel_paths) for rel_paths in jobs)
+
+    args = (
+        [png_root] * len(jobs),
+        [out_dir] * len(jobs),
+        range(len(jobs)),
+        jobs,
+    )
+    if workers == 1 or total < META_POOL_MIN:
+        results = list(map(_pack_atlas_group, *args))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_pack_atlas_group, *args))
+
+    pages = []
+    entries = {}
+    for names, rows in results:
+        base = len(pages)
+        pages.extend(names)
+        for rel_path, page, x, y, w, h, size, mtime_ns in rows:
+            entries[rel_path] = [base + page, x, y, w, h, size, mtime_ns]
+
+    # Pages left over from an earlier, larger build
+    keep = set(pages)
+    for name in os.listdir(out_dir):
+        if name.endswith(".png") and name not in keep:
+            os.remove(os.path.join(out_dir, name))
+
+    index_path = os.path.join(out_dir, ATLAS_INDEX)
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"version": ATLAS_VERSION, "pages": pages, "entries": entries},
+            f,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+    os.replace(tmp_path, index_path)
+    return index_path, len(entries), len(pages)
+
+
+def load_atlas_index(png_root, sources=None):
+    """
+    Load the atlas index for png_root as (pages, {rel_path: entry}) with
+    entry = [page, x, y, width, height], or None when there is no index or
+    it has an unknown version.
+
+    With sources (a scan_png_root snapshot) icons whose PNG is gone or has
+    changed since the build are left out, and load from their files
+    instead. The check is a dict lookup per icon, no file access.
+    """
+    try:
+        with open(
+            os.path.join(atlas_dir_for(png_root), ATLAS_INDEX), "r", encoding="utf-8"
+        ) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != ATLAS_VERSION:
+        return None
+    entries = {}
+    for rel_path, row in (data.get("entries") or {}).items():
+        if sources is not None and (
+            sources.get(snapshot_key(rel_path)) != (row[5], row[6])
+        ):
+            continue
+        entries[rel_path] = row[:5]
+    return data.get("pages") or [], entries
+
+
+# ---------------------------------------------------------------------------
+#  PNG pack archive
+# ---------------------------------------------------------------------------
+#
+#  icon_pack.wzpack in the PNG root holds every PNG of a catalog in one
+#  file, so browsing never opens per-icon files:
+#
+#    header   magic, version, n_entries, entries_off, pool_off
+#    data     the PNG files, back to back
+#    entries  data_off, path_off, data_len, path_len   (sorted by path)
+#    pool     UTF-8 rel_paths, normalized and "/"-separated
+#
+#  Offsets are u64, lengths u32, little-endian. The archive is
+#  memory-mapped and PngPack.get hands out memoryview slices of it.
+
+PACK_MAGIC = b"WZPK"
+PACK_VERSION = 1
+PACK_FILENAME = "icon_pack.wzpack"
+
+_PACK_HEADER = struct.Struct("<4sIQQQ")
+_PACK_ENTRY = struct.Struct("<QQII")
+
+
+def pack_path_for(png_root):
+    """Return the pack archive path for a PNG root folder."""
+    return os.path.join(png_root, PACK_FILENAME)
+
+
+def pack_png_root(json_path, png_root, out_path=None):
+    """
+    Copy every PNG referenced by icon_db.json into a pack archive.
+    Returns (out_path, packed, missing).
+    """
+    if out_path is None:
+        out_path = pack_path_for(png_root)
+
+    rel_paths = dict.fromkeys(
+        os.path.normpath(rel_path).replace(os.sep, "/")
+        for _t, _c, _i, rel_path in iter_icon_db(json_path)
+    )
+
+    tmp_path = out_path + ".tmp"
+    entries = []
+    missing = 0
+    with open(tmp_path, "wb") as f:
+        f.write(bytes(_PACK_HEADER.size))
+        for rel_path in rel_paths:
+            try:
+                with open(os.path.join(png_root, rel_path), "rb") as src:
+                    data = src.read()
+            except OSError:
+                missing += 1
+                continue
+            entries.append((rel_path.encode("utf-8"), f.tell(), len(data)))
+            f.write(data)
+
+        entries.sort()
+        table = bytearray()
+        pool = bytearray()
+        for key, data_off, data_len in entries:
+            table += _PACK_ENTRY.pack(data_off, len(pool), data_len, len(key))
+            pool += key
+
+        entries_off = f.tell()
+        f.write(table)
+        pool_off = f.tell()
+        f.write(pool)
+        f.seek(0)
+        f.write(
+            _PACK_HEADER.pack(
+                PACK_MAGIC, PACK_VERSION, len(entries), entries_off, pool_off
+            )
+        )
+
+    os.replace(tmp_path, out_path)
+    return out_path, len(entries), missing
+
+
+class PngPack:
+    """
+    Memory-mapped pack archive (see pack_png_root).
+
+    get(rel_path) returns a zero-copy memoryview of the PNG bytes, or None
+    if the archive does not have it. rel_path must be normalized and
+    "/"-separated.
+
+    Reader threads may still be inside get() when the viewer closes the
+    pack; lookups and close() share a lock, so close() waits for them
+    and later lookups just miss.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mm = None
+        self._file = open(path, "rb")
+        try:
+            self.mtime_ns = os.fstat(self._file.fileno()).st_mtime_ns
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, self._count, self._entries_off, self._pool_off = (
+                _PACK_HEADER.unpack_from(self._mm, 0)
+            )
+        except Exception:
+            self.close()
+            raise
+
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported PNG pack: {path}")
+        self._view = memoryview(self._mm)
+
+    def close(self):
+        with self._lock:
+            mm = self._mm
+            if mm is not None:
+                self._mm = None
+                self._view = None
+                try:
+                    mm.close()
+                except BufferError:
+                    # Slices still in use; the mapping goes away with them
+                    pass
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, rel_path):
+        with self._lock:
+            return self._find(rel_path) is not None
+
+    def _find(self, rel_path):
+        # Caller holds self._lock
+        mm = self._mm
+        if mm is None:
+            return None
+        key = rel_path.encode("utf-8")
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            row = _PACK_ENTRY.unpack_from(
+                mm, self._entries_off + mid * _PACK_ENTRY.size
+            )
+            start = self._pool_off + row[1]
+            probe = mm[start:start + row[3]]
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return row
+        return None
+
+    def get(self, rel_path):
+        with self._lock:
+            row = self._find(rel_path)
+            if row is None:
+                return None
+            data_off, _path_off, data_len, _path_len = row
+            return self._view[data_off:data_off + data_len]
+
+
+def png_source_stat(png_root, rel_path, pack=None):
+    """
+    (size, mtime_ns) of rel_path, from the pack when it has the file,
+    otherwise from the PNG root. Raises OSError if neither has it.
+    """
+    if pack is not None:
+        data = pack.get(rel_path)
+        if data is not None:
+            return len(data), pack.mtime_ns
+    st = os.stat(os.path.normpath(os.path.join(png_root, rel_path)))
+    return st.st_size, st.st_mtime_ns
+
+
+def read_png_source(png_root, rel_path, pack=None):
+    """PNG bytes of rel_path (a memoryview when served from the pack)."""
+    if pack is not None:
+        data = pack.get(rel_path)
+        if data is not None:
+            return data
+    with open(os.path.normpath(os.path.join(png_root, rel_path)), "rb") as f:
+        return f.read()
+
+
+# ---------------------------------------------------------------------------
+#  Query (headless lookups)
+# ---------------------------------------------------------------------------
+
+QUERY_FORMATS = ("jsonl", "tsv")
+
+
+def open_query_catalog(path):
+    """open_icon_db, preferring an up-to-date compiled catalog next to a JSON."""
+    return open_icon_db(find_compiled_icon_db(path) or path)
+
+
+def _query_groups(icon_db, type_name=None, category=None):
+    """(type, category, {id: rel_path}) for each group in scope."""
+    types = get_types(icon_db) if type_name is None else [type_name]
+    for t in types:
+        categories = get_categories(icon_db, t)
+        if not categories:
+            yield t, None, get_ids(icon_db, t)
+            continue
+        for cat in categories if category is None else [category]:
+            yield t, cat, get_ids(icon_db, t, category=cat)
+
+
+def iter_catalog(icon_db, type_name=None, category=None, filter_text=""):
+    """
+    Yield (type, category, id, rel_path) in display order, optionally
+    limited to one type/category and to IDs containing filter_text.
+    category is None for flat types.
+    """
+    for t, cat, entries in _query_groups(icon_db, type_name, category):
+        for item_id in get_sorted_ids(icon_db, t, cat):
+            if filter_text and filter_text not in item_id:
+                continue
+            rel_path = entries.get(item_id)
+            if isinstance(rel_path, str):
+                yield t, cat, item_id, rel_path
+
+
+def resolve_ids(icon_db, ids, type_name=None, category=None, missing=None):
+    """
+    Yield (type, category, id, rel_path) for every group in scope that has
+    each requested ID (an ID can exist under several types). IDs found
+    nowhere are appended to missing, if given.
+    """
+    groups = list(_query_groups(icon_db, type_name, category))
+    for item_id in ids:
+        found = False
+        for t, cat, entries in groups:
+            rel_path = entries.get(item_id)
+            if isinstance(rel_path, str):
+                found = True
+                yield t, cat, item_id, rel_path
+        if not found and missing is not None:
+            missing.append(item_id)
+
+
+def write_query_rows(rows, out, fmt="jsonl", png_root=None):
+    """
+    Write rows as JSON Lines or TSV (type, category, id, path[, file]),
+    one line per row as they arrive. Returns the number of rows.
+    """
+    count = 0
+    for t, cat, item_id, rel_path in rows:
+        full_path = (
+            os.path.normpath(os.path.join(png_root, rel_path)) if png_root else None
+        )
+        if fmt == "tsv":
+            fields = [t, cat or "", item_id, rel_path]
+            if full_path is not None:
+                fields.append(full_path)
+            out.write("\t".join(fields) + "\n")
+        else:
+            row = {"type": t, "category": cat, "id": item_id, "path": rel_path}
+            if full_path is not None:
+                row["file"] = full_path
+            out.write(json.dumps(row, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def _read_id_file(path):
+    f = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    try:
+        return [line.strip() for line in f if line.strip()]
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def _run_query(parser, args):
+    try:
+        icon_db = open_query_catalog(args.catalog)
+    except (OSError, ValueError) as exc:
+        parser.error(f"cannot open catalog: {exc}")
+    try:
+        if args.type is not None and args.type not in get_types(icon_db):
+            parser.error(f"unknown type: {args.type}")
+        if args.category is not None and args.category not in get_categories(
+            icon_db, args.type
+        ):
+            parser.error(f"unknown category for {args.type}: {args.category}")
+
+        ids = list(args.id or ())
+        if args.ids_from:
+            ids.extend(_read_id_file(args.ids_from))
+
+        missing = []
+        if ids:
+            rows = resolve_ids(icon_db, ids, args.type, args.category, missing)
+        else:
+            rows = iter_catalog(icon_db, args.type, args.category, args.filter)
+        try:
+            write_query_rows(rows, sys.stdout, args.format, args.png_root)
+            sys.stdout.flush()
+        except BrokenPipeError:
+            # Reader went away (e.g. piped into head); not an error
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return 0
+    finally:
+        close_icon_db(icon_db)
+
+    for item_id in missing:
+        print(f"not found: {item_id}", file=sys.stderr)
+    return 1 if missing else 0
+
+
+# ---------------------------------------------------------------------------
+#  Command line
+# ---------------------------------------------------------------------------
+
+def main(argv=None):
+    """Run one headless subcommand; returns the process exit code."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="MapleStory WZ Icon Viewer tools")
+    sub = parser.add_subparsers(dest="command")
+
+    p_compile = sub.add_parser(
+        "compile", help="compile icon_db.json into a binary catalog"
+    )
+    p_compile.add_argument("json_path", help="path to icon_db.json")
+    p_compile.add_argument(
+        "-o", "--output", help=f"output path (default: <json>{COMPILED_EXT})"
+    )
+
+    p_sqlite = sub.add_parser(
+        "sqlite", help="import icon_db.json into a SQLite catalog"
+    )
+    p_sqlite.add_argument("json_path", help="path to icon_db.json")
+    p_sqlite.add_argument(
+        "-o", "--output", help=f"output path (default: <json>{SQLITE_EXT})"
+    )
+
+    p_meta = sub.add_parser(
+        "meta", help="index PNG sizes into a metadata sidecar for the viewer"
+    )
+    p_meta.add_argument("json_path", help="path to icon_db.json")
+    p_meta.add_argument("png_root", help="PNG root folder")
+    p_meta.add_argument(
+        "-j", "--workers", type=int,
+        help="worker processes (default: one per CPU; 1 disables the pool)",
+    )
+
+    p_thumbs = sub.add_parser(
+        "thumbs", help="pre-render gallery thumbnails into the PNG root's store"
+    )
+    p_thumbs.add_argument("json_path", help="path to icon_db.json")
+    p_thumbs.add_argument("png_root", help="PNG root folder")
+
+    p_atlas = sub.add_parser(
+        "atlas", help="pack each type/category into sprite atlases"
+    )
+    p_atlas.add_argument("json_path", help="path to icon_db.json")
+    p_atlas.add_argument("png_root", help="PNG root folder")
+    p_atlas.add_argument(
+        "-j", "--workers", type=int,
+        help="worker processes (default: one per CPU; 1 disables the pool)",
+    )
+
+    p_pack = sub.add_parser(
+        "pack", help="copy the catalog's PNGs into one pack archive"
+    )
+    p_pack.add_argument("json_path", help="path to icon_db.json")
+    p_pack.add_argument("png_root", help="PNG root folder")
+    p_pack.add_argument(
+        "-o", "--output",
+        help=f"output path (default: <png_root>/{PACK_FILENAME})",
+    )
+
+    p_query = sub.add_parser(
+        "query", help="print catalog entries as JSON Lines or TSV"
+    )
+    p_query.add_argument(
+        "catalog", help="icon_db.json, compiled (.wzcat) or SQLite catalog"
+    )
+    p_query.add_argument("-t", "--type", help="only this type")
+    p_query.add_argument("-c", "--category", help="only this category (needs --type)")
+    p_query.add_argument(
+        "-f", "--filter", default="", help="only IDs containing this text"
+    )
+    p_query.add_argument(
+        "-i", "--id", action="append", help="resolve this ID (repeatable)"
+    )
+    p_query.add_argument(
+        "--ids-from", metavar="FILE",
+        help="resolve the IDs listed one per line in FILE ('-' for stdin)",
+    )
+    p_query.add_argument(
+        "--format", choices=QUERY_FORMATS, default="jsonl", help="output format"
+    )
+    p_query.add_argument(
+        "--png-root", help="also print each icon's full path under this folder"
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compile":
+        out_path = compile_icon_db(args.json_path, args.output)
+        print(f"Compiled catalog written to: {out_path}")
+        return 0
+
+    if args.command == "sqlite":
+        out_path = import_icon_db_sqlite(args.json_path, args.output)
+        print(f"SQLite catalog written to: {out_path}")
+        return 0
+
+    if args.command == "meta":
+        out_path, found, missing = build_png_meta_index(
+            args.json_path, args.png_root, workers=args.workers
+        )
+        print(f"Metadata for {found} images written to: {out_path}")
+        if missing:
+            print(f"{missing} paths were missing or not valid PNGs")
+        return 0
+
+    if args.command == "atlas":
+        index_path, icons, pages = build_atlases(
+            args.json_path, args.png_root, args.workers
+        )
+        print(f"Packed {icons} icons into {pages} atlas pages: {index_path}")
+        return 0
+
+    if args.command == "pack":
+        out_path, packed, missing = pack_png_root(
+            args.json_path, args.png_root, args.output
+        )
+        print(f"Packed {packed} PNGs into: {out_path}")
+        if missing:
+            print(f"{missing} paths were missing")
+        return 0
+
+    if args.command == "thumbs":
+        out_path, rendered, missing = build_thumbnail_store(
+            args.json_path, args.png_root
+        )
+        print(f"Rendered {rendered} thumbnails into: {out_path}")
+        if missing:
+            print(f"{missing} paths were missing")
+        return 0
+
+    if args.command == "query":
+        if args.category is not None and args.type is None:
+            parser.error("--category needs --type")
+        return _run_query(parser, args)
+
+    parser.print_help()
+    return 2
+
+
+if __name__ == "__main__":
+    import multiprocessing
+
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -8,10 +8,65 @@ MapleStory WZ Icon Viewer
 - Uses only tkinter + stdlib (PyInstaller-friendly, no Pillow)
 """
 
+import argparse
+import bisect
+import contextlib
+import io
 import json
 import os
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+import queue
+import sys
+import tempfile
+import threading
+import time
+import traceback
+import tracemalloc
+import types
+from array import array
+from collections import OrderedDict, deque
+
+if __name__ == "__main__" and sys.argv[1:] and not sys.argv[1].startswith("-"):
+    # Subcommands (compile, query, ...) are headless: run them before
+    # tkinter is imported, so they also work on a Python without Tk
+    from wz_icon_catalog import main as _catalog_main
+
+    sys.exit(_catalog_main(sys.argv[1:]))
+
+import tkinter as tk  # noqa: E402
+from tkinter import ttk, filedialog, messagebox  # noqa: E402
+from tkinter import font as tkfont  # noqa: E402
+
+from wz_icon_catalog import (  # noqa: E402
+    COMPILED_EXT,
+    META_FILENAME,
+    PACK_FILENAME,
+    SQLITE_EXT,
+    THUMB_SIZE,
+    IdFilter,
+    PngPack,
+    ThumbnailStore,
+    atlas_dir_for,
+    build_id_order,
+    catalog_backend,
+    close_icon_db,
+    find_compiled_icon_db,
+    format_png_meta,
+    get_categories,
+    get_ids,
+    get_sorted_ids,
+    get_types,
+    iter_icon_db_types,
+    load_atlas_index,
+    load_png_meta_index,
+    load_thumbnail,
+    pack_path_for,
+    read_png_source,
+    scan_png_root,
+    snapshot_key,
+    subsample_factor,
+    thumb_store_path_for,
+)
+from wz_icon_catalog import main as catalog_main  # noqa: E402
 
 
 # ---------------------------------------------------------------------------
@@ -27,90 +82,1156 @@ FG_BUTTON = "#D1D1D1"
 BG_HIGHLIGHT = "#5F6368"
 BG_PREVIEW = "#202124"
 
+LOAD_POLL_MS = 50        # how often the UI drains the background loader queue
+FILTER_DELAY_MS = 80     # typing pause before the ID list is re-filtered
+INDEX_BACKGROUND_MIN = 5000   # groups this big get their search index built off-thread
+
+PREVIEW_MAX = 512                    # preview is subsampled to fit this box
+PREVIEW_CACHE_BYTES = 64 * 1024 * 1024   # budget for decoded preview images
+PREFETCH_NEIGHBORS = 4   # IDs read ahead on each side of the selection
+
+THUMB_CACHE_BYTES = 32 * 1024 * 1024     # budget for decoded thumbnails
+THUMB_BATCH_MS = 12      # Tk-thread time spent decoding thumbnails per tick
+GALLERY_MARGIN_ROWS = 2  # rows loaded ahead above/below the gallery viewport
+ATLAS_CACHE_BYTES = 64 * 1024 * 1024     # budget for decoded atlas pages
+
+HEARTBEAT_MS = 50          # main-loop heartbeat checked by the stall watchdog
+STALL_THRESHOLD_MS = 150   # threshold for a bare --stall-ms (the watchdog is opt-in)
+STALL_ENV = "WZ_VIEWER_STALL_MS"
+STALL_LOG = os.path.join(tempfile.gettempdir(), "wz_icon_viewer_stalls.log")
+STALL_LOG_MAX_BYTES = 1024 * 1024   # then the log is rotated to <log>.1
+
+TRACE_ENV = "WZ_VIEWER_TRACE"      # trace file, same as --trace
+TRACE_MAX_EVENTS = 50000           # ring buffer size; older spans are dropped
+
 
 # ---------------------------------------------------------------------------
-#  Core logic helpers (JSON + data access)
+#  GUI Application
 # ---------------------------------------------------------------------------
 
-def load_icon_db(path):
-    """Load icon_db.json from disk and return the parsed dict."""
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+class _LoadCancelled(Exception):
+    """Raised inside the loader thread to abandon a cancelled load."""
 
-    if not isinstance(data, dict):
-        raise ValueError("icon_db.json must contain a top-level JSON object")
 
-    return data
+def preview_subsample(width, height, max_size=PREVIEW_MAX):
+    """Integer subsample factor that makes an image fit the preview box."""
+    return subsample_factor(width, height, max_size)
 
 
-def get_types(icon_db):
-    """Return a sorted list of all top-level types."""
-    if not isinstance(icon_db, dict):
-        return []
-    return sorted(str(k) for k in icon_db.keys())
+class PhotoImageCache:
+    """
+    LRU cache of decoded (already subsampled) PhotoImages.
 
+    Bounded by an estimated byte budget of width * height * 4 per image.
+    Evicted images are deleted from Tk explicitly so the Tcl image table
+    does not grow behind our back.
+    """
 
-def _is_nested_item(icon_db, type_name):
+    def __init__(self, budget_bytes=PREVIEW_CACHE_BYTES):
+        self.budget_bytes = budget_bytes
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self._images = OrderedDict()   # key -> (PhotoImage, nbytes)
+
+    def __len__(self):
+        return len(self._images)
+
+    def __contains__(self, key):
+        return key in self._images
+
+    def get(self, key):
+        entry = self._images.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._images.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, img):
+        old = self._images.pop(key, None)
+        if old is not None:
+            self.bytes_used -= old[1]
+            if old[0] is not img:
+                self._delete(old[0])
+        nbytes = img.width() * img.height() * 4
+        self._images[key] = (img, nbytes)
+        self.bytes_used += nbytes
+        # Never evict the image just added, even if it alone is over budget
+        while self.bytes_used > self.budget_bytes and len(self._images) > 1:
+            _key, (evicted, size) = self._images.popitem(last=False)
+            self.bytes_used -= size
+            self._delete(evicted)
+
+    def clear(self):
+        for img, _size in self._images.values():
+            self._delete(img)
+        self._images.clear()
+        self.bytes_used = 0
+
+    def stats_text(self):
+        return (
+            f"cache {self.hits} hits / {self.misses} misses, "
+            f"{len(self._images)} images, {self.bytes_used / (1024 * 1024):.1f} MB"
+        )
+
+    @staticmethod
+    def _delete(img):
+        try:
+            img.tk.call("image", "delete", img.name)
+        except tk.TclError:
+            pass
+
+
+class StageTimer:
     """
-    Return True if this type appears to use nested categories:
-    e.g. Item -> { 'Cash': {id: path}, 'Consume': {...}, ... }
+    Wall-time histograms for the viewer's stages (parse, sort, filter, ...).
+
+    Off by default. While off, stage() and operation() return a shared
+    no-op context manager, so instrumented code only pays for one
+    attribute check. An operation is one user action (type change,
+    keystroke refresh, selection); the stages timed inside it make up the
+    breakdown kept in `last` and passed to `listener`.
     """
-    if type_name not in icon_db:
+
+    BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+    def __init__(self):
+        self.enabled = False
+        self.tracer = None            # TraceRecorder that also gets every span
+        self.listener = None          # called with `last` after each operation
+        self.last = None              # (operation, total_ms, {stage: ms})
+        self.counters = {}            # name -> count, kept even while off
+        self._stages = {}             # name -> [count, total_ms, max_ms, buckets]
+        self._operations = {}
+        self._breakdown = None        # {stage: ms} of the running operation
+        self._lock = threading.Lock()   # loader threads add stages too
+
+    def stage(self, name):
+        if not self.enabled and self.tracer is None:
+            return _NOT_TIMED
+        return _Timed(self, name, operation=False)
+
+    def operation(self, name):
+        # Nested operations (a type change refreshing the list) fold into
+        # the outer one
+        if not self.enabled and self.tracer is None:
+            return _NOT_TIMED
+        if self._breakdown is not None:
+            return _NOT_TIMED
+        return _Timed(self, name, operation=True)
+
+    def add(self, name, seconds):
+        """Record one stage timing (any thread)."""
+        ms = seconds * 1000.0
+        with self._lock:
+            self._count(self._stages, name, ms)
+            breakdown = self._breakdown
+            if breakdown is not None:
+                breakdown[name] = breakdown.get(name, 0.0) + ms
+
+    def count(self, name):
+        """Bump an event counter (Tk thread only); exported with the stats."""
+        self.counters[name] = self.counters.get(name, 0) + 1
+
+    def record(self, name, stages):
+        """Record a finished operation from {stage: seconds} measured elsewhere."""
+        if not self.enabled:
+            return
+        for stage, seconds in stages.items():
+            self.add(stage, seconds)
+        breakdown = {stage: seconds * 1000.0 for stage, seconds in stages.items()}
+        self._finish(name, sum(breakdown.values()), breakdown)
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+            self._operations = {}
+        self.counters = {}
+        self.last = None
+
+    def last_text(self):
+        """One-line breakdown of the last operation, largest stages first."""
+        if self.last is None:
+            return ""
+        name, total_ms, breakdown = self.last
+        parts = sorted(breakdown.items(), key=lambda item: -item[1])
+        stages = ", ".join(f"{stage} {ms:.1f}" for stage, ms in parts)
+        return f"{name} {total_ms:.1f} ms" + (f" ({stages})" if stages else "")
+
+    def snapshot(self):
+        """Collected stats as plain data: {"stages": ..., "operations": ...}."""
+        with self._lock:
+            return {
+                "buckets_ms": list(self.BUCKETS_MS),
+                "stages": self._summary(self._stages),
+                "operations": self._summary(self._operations),
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+    def export(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def _begin(self):
+        self._breakdown = {}
+
+    def _finish(self, name, total_ms, breakdown):
+        self._breakdown = None
+        with self._lock:
+            self._count(self._operations, name, total_ms)
+        self.last = (name, total_ms, breakdown)
+        if self.listener is not None:
+            self.listener(self.last)
+
+    def _count(self, table, name, ms):
+        entry = table.get(name)
+        if entry is None:
+            entry = table[name] = [0, 0.0, 0.0, [0] * (len(self.BUCKETS_MS) + 1)]
+        entry[0] += 1
+        entry[1] += ms
+        entry[2] = max(entry[2], ms)
+        entry[3][bisect.bisect_left(self.BUCKETS_MS, ms)] += 1
+
+    @staticmethod
+    def _summary(table):
+        return {
+            name: {
+                "count": count,
+                "total_ms": round(total, 3),
+                "mean_ms": round(total / count, 3),
+                "max_ms": round(worst, 3),
+                # counts per bucket upper bound, the last one unbounded
+                "histogram": list(buckets),
+            }
+            for name, (count, total, worst, buckets) in sorted(table.items())
+        }
+
+
+class _Timed:
+    """Context manager behind StageTimer.stage/operation while enabled."""
+
+    __slots__ = ("timer", "name", "operation", "start")
+
+    def __init__(self, timer, name, operation):
+        self.timer = timer
+        self.name = name
+        self.operation = operation
+
+    def __enter__(self):
+        if self.operation:
+            self.timer._begin()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        timer = self.timer
+        if timer.tracer is not None:
+            cat = "action" if self.operation else "stage"
+            timer.tracer.complete(self.name, cat, self.start, end)
+        if not timer.enabled:
+            if self.operation:
+                timer._breakdown = None
+            return False
+        if self.operation:
+            timer._finish(self.name, (end - self.start) * 1000.0, timer._breakdown or {})
+        else:
+            timer.add(self.name, end - self.start)
         return False
-    data = icon_db[type_name]
-    if not isinstance(data, dict):
+
+
+_NOT_TIMED = contextlib.nullcontext()
+
+
+class TraceRecorder:
+    """
+    Records spans as Chrome Trace Event JSON (chrome://tracing, Perfetto).
+
+    Off by default; while off span() returns a shared no-op context
+    manager. Finished spans become complete ("X") events in a ring buffer
+    of max_events, so a long session keeps only its latest events. Spans
+    may be recorded from any thread; each thread gets its own track.
+    """
+
+    def __init__(self, max_events=TRACE_MAX_EVENTS):
+        self.enabled = False
+        self._events = deque(maxlen=max_events)   # append is thread-safe
+        self._threads = {}            # native thread id -> thread name
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._origin = time.perf_counter()
+
+    def __len__(self):
+        return len(self._events)
+
+    def span(self, name, cat="task", **args):
+        if not self.enabled:
+            return _NOT_TIMED
+        return _Span(self, name, cat, args)
+
+    def complete(self, name, cat, start, end, args=None):
+        """Add a finished span; start/end are time.perf_counter() values."""
+        tid = threading.get_native_id()
+        if tid not in self._threads:
+            with self._lock:
+                self._threads[tid] = threading.current_thread().name
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": round((start - self._origin) * 1e6, 1),
+            "dur": round((end - start) * 1e6, 1),
+            "pid": self._pid,
+            "tid": tid,
+        }
+        if args:
+            event["args"] = args
+        self._events.append(event)
+
+    def save(self, path):
+        with self._lock:
+            threads = list(self._threads.items())
+        names = [
+            {"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid,
+             "args": {"name": name}}
+            for tid, name in threads
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"traceEvents": names + list(self._events), "displayTimeUnit": "ms"},
+                f,
+            )
+
+
+class _Span:
+    """Context manager behind TraceRecorder.span while enabled."""
+
+    __slots__ = ("tracer", "name", "cat", "args", "start")
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.complete(
+            self.name, self.cat, self.start, time.perf_counter(), self.args
+        )
         return False
-    # If any value is a dict, we treat it as nested
-    return any(isinstance(v, dict) for v in data.values())
 
 
-def get_categories(icon_db, type_name):
+class StallWatchdog:
+    """
+    Logs the Tk thread's stack whenever the main loop stops servicing
+    events for longer than threshold_ms.
+
+    The Tk thread calls beat() from an after() loop (see
+    IconViewerApp._heartbeat); a daemon thread checks how long ago the
+    last beat was. Only plain Python state crosses threads: touching Tk
+    from the watchdog would just wait for the stalled main loop.
+
+    Modal dialogs block after() callbacks without the viewer being stuck,
+    so the app runs them inside paused().
+    """
+
+    def __init__(self, log_path, threshold_ms=STALL_THRESHOLD_MS, context=None):
+        self.log_path = log_path
+        self.threshold = threshold_ms / 1000.0
+        self.context = context        # () -> str, called on the watchdog thread
+        self.stalls = 0
+        self._main_ident = None
+        self._last_beat = time.monotonic()
+        self._stalled_beat = None     # last beat before the stall being logged
+        self._paused = 0
+        self._stop = threading.Event()
+
+    def start(self):
+        """Start watching the calling (Tk) thread."""
+        self._main_ident = threading.get_ident()
+        self._last_beat = time.monotonic()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def beat(self):
+        self._last_beat = time.monotonic()
+
+    @contextlib.contextmanager
+    def paused(self):
+        """Don't report stalls inside the block (e.g. a modal dialog)."""
+        self._paused += 1
+        try:
+            yield
+        finally:
+            self._last_beat = time.monotonic()
+            self._paused -= 1
+
+    def _run(self):
+        period = HEARTBEAT_MS / 1000.0
+        interval = max(0.01, min(self.threshold / 3, period))
+        while not self._stop.wait(interval):
+            if self._paused:
+                continue
+            last = self._last_beat
+            if self._stalled_beat is not None:
+                if last != self._stalled_beat:
+                    stalled_ms = (last - self._stalled_beat - period) * 1000.0
+                    self._write(
+                        f"--- main loop running again after {stalled_ms:.0f} ms\n\n"
+                    )
+                    self._stalled_beat = None
+                continue
+            blocked = time.monotonic() - last - period
+            if blocked > self.threshold:
+                self._stalled_beat = last
+                self.stalls += 1
+                self._report(blocked)
+
+    def _report(self, blocked):
+        frame = sys._current_frames().get(self._main_ident)
+        stack = "".join(traceback.format_stack(frame)) if frame else "  (no frame)\n"
+        context = ""
+        if self.context is not None:
+            try:
+                context = self.context()
+            except Exception as exc:  # noqa: BLE001
+                context = f"(context failed: {exc})"
+        self._write(
+            f"=== {time.strftime('%Y-%m-%d %H:%M:%S')} main loop blocked "
+            f"> {blocked * 1000.0:.0f} ms\n"
+            f"{context}\n"
+            f"{stack}"
+        )
+
+    def _write(self, text):
+        try:
+            if os.path.getsize(self.log_path) > STALL_LOG_MAX_BYTES:
+                os.replace(self.log_path, self.log_path + ".1")
+        except OSError:
+            pass   # no log yet
+        try:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(text)
+        except OSError:
+            pass   # nowhere to complain from this thread; keep watching
+
+
+class PngPrefetcher:
     """
-    For nested types (Item), return sorted category names.
-    For flat types, return [].
+    Reads the PNG bytes of likely-next previews on a background thread.
+
+    Only I/O happens off the Tk thread; the caller turns the bytes into a
+    PhotoImage on the Tk thread via take(). load(path) produces the bytes
+    (default: the file contents; the gallery reads through its thumbnail
+    store). request() replaces the
+    wanted list (nearest first); cancel() also drops everything already
+    read, and reads that were in flight at that moment are discarded.
+    Unreadable files (and loads that raise) come back as b"" so callers
+    can tell them apart from files that have not been read yet.
     """
-    if not _is_nested_item(icon_db, type_name):
-        return []
-    data = icon_db.get(type_name, {})
-    return sorted(str(k) for k in data.keys())
 
+    def __init__(self, max_entries=4 * PREFETCH_NEIGHBORS, load=None,
+                 name="png prefetch"):
+        self._max_entries = max_entries
+        self._load = load or self._read_file
+        self._name = name
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._pending = []
+        self._data = OrderedDict()   # path -> PNG bytes
+        self._epoch = 0
+        self._thread = None
+
+    def request(self, paths):
+        with self._lock:
+            self._pending = [p for p in paths if p not in self._data]
+            self._wake.notify()
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name=self._name, daemon=True
+            )
+            self._thread.start()
+
+    def cancel(self):
+        with self._lock:
+            self._epoch += 1
+            self._pending = []
+            self._data.clear()
+
+    def held_bytes(self):
+        """Bytes read ahead and not taken yet."""
+        with self._lock:
+            return sum(len(data) for data in self._data.values())
+
+    def take(self, path):
+        """Return (and forget) the prefetched bytes for path, or None."""
+        with self._lock:
+            return self._data.pop(path, None)
+
+    @staticmethod
+    def _read_file(path):
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return b""
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._pending:
+                    self._wake.wait()
+                path = self._pending.pop(0)
+                epoch = self._epoch
+
+            try:
+                data = self._load(path)
+            except Exception:  # noqa: BLE001
+                # e.g. a locked thumbnail store or a corrupt PNG; the
+                # caller falls back to reading the file itself
+                data = b""
+
+            with self._lock:
+                if epoch != self._epoch:
+                    continue
+                self._data[path] = data
+                while len(self._data) > self._max_entries:
+                    self._data.popitem(last=False)
+
+
+class VirtualListbox(tk.Canvas):
+    """
+    Single-selection listbox that only draws the rows on screen.
+
+    Items are any sequence (list, tuple, lazy catalog view) and are never
+    copied into Tk; a fixed pool of canvas rows is re-labelled on scroll,
+    so cost per scroll/selection is proportional to the visible rows, not
+    the item count. Mirrors the parts of the tk.Listbox API the viewer
+    uses (curselection, get, size, see, selection_set, yview) and fires
+    <<ListboxSelect>> on user selection.
+    """
+
+    TEXT_PAD = 4
+    WHEEL_ROWS = 3
+
+    def __init__(self, master, width=24, **kw):
+        self._font = tkfont.nametofont("TkDefaultFont")
+        self.row_height = self._font.metrics("linespace") + 2
+        super().__init__(
+            master,
+            width=self._font.measure("0") * width,
+            bg=BG_LIST,
+            highlightthickness=0,
+            takefocus=1,
+            **kw,
+        )
+        self.yscrollcommand = None
+        self._items = ()
+        self._top = 0
+        self._selected = None
+        self._rows = []   # pooled (rect, text) canvas item pairs
+
+        self.bind("<Configure>", self._on_configure)
+        self.bind("<Button-1>", self._on_click)
+        self.bind("<MouseWheel>", self._on_wheel)
+        self.bind("<Button-4>", lambda _e: self._scroll_by(-self.WHEEL_ROWS))
+        self.bind("<Button-5>", lambda _e: self._scroll_by(self.WHEEL_ROWS))
+        self.bind("<Up>", lambda _e: self._move_selection(-1))
+        self.bind("<Down>", lambda _e: self._move_selection(1))
+        self.bind("<Prior>", lambda _e: self._move_selection(-self._visible_rows()))
+        self.bind("<Next>", lambda _e: self._move_selection(self._visible_rows()))
+        self.bind("<Home>", lambda _e: self._select_and_notify(0))
+        self.bind("<End>", lambda _e: self._select_and_notify(len(self._items) - 1))
+
+    # -- Listbox-like API ------------------------------------------------
+
+    @property
+    def items(self):
+        return self._items
+
+    def set_items(self, items):
+        """Show a new sequence; resets scroll position and selection."""
+        self._items = items
+        self._top = 0
+        self._selected = None
+        self._redraw()
+
+    def size(self):
+        return len(self._items)
+
+    def get(self, index):
+        return self._items[index]
+
+    def curselection(self):
+        return () if self._selected is None else (self._selected,)
+
+    def selection_set(self, index):
+        self._selected = index
+        self._redraw()
+
+    def selection_clear(self):
+        self._selected = None
+        self._redraw()
+
+    def see(self, index):
+        visible = self._visible_rows()
+        if index < self._top:
+            self._set_top(index)
+        elif index >= self._top + visible:
+            self._set_top(index - visible + 1)
+
+    def yview(self, *args):
+        n = len(self._items)
+        if not args:
+            if not n:
+                return 0.0, 1.0
+            return self._top / n, min(n, self._top + self._visible_rows()) / n
+
+        if args[0] == "moveto":
+            self._set_top(int(float(args[1]) * n))
+        elif args[0] == "scroll":
+            count = int(args[1])
+            if args[2] == "pages":
+                count *= self._visible_rows()
+            self._scroll_by(count)
+        return None
+
+    # -- Internals -------------------------------------------------------
+
+    def _visible_rows(self):
+        return max(1, self.winfo_height() // self.row_height)
+
+    def _set_top(self, top):
+        top = max(0, min(top, len(self._items) - self._visible_rows()))
+        if top != self._top:
+            self._top = top
+            self._redraw()
+
+    def _scroll_by(self, rows):
+        self._set_top(self._top + rows)
+
+    def _on_configure(self, event):
+        rh = self.row_height
+        needed = event.height // rh + 1
+        while len(self._rows) < needed:
+            rect = self.create_rectangle(0, 0, 0, 0, outline="", fill=BG_LIST)
+            text = self.create_text(
+                self.TEXT_PAD, 0, anchor="w", font=self._font, fill=FG_TEXT
+            )
+            self._rows.append((rect, text))
+        while len(self._rows) > needed:
+            for item in self._rows.pop():
+                self.delete(item)
+
+        for k, (rect, text) in enumerate(self._rows):
+            y = k * rh
+            self.coords(rect, 0, y, event.width, y + rh)
+            self.coords(text, self.TEXT_PAD, y + rh // 2)
+
+        # Keep the last page full after growing the window
+        self._top = max(0, min(self._top, len(self._items) - self._visible_rows()))
+        self._redraw()
+
+    def _redraw(self):
+        items = self._items
+        n = len(items)
+        for k, (rect, text) in enumerate(self._rows):
+            i = self._top + k
+            if i < n:
+                fill = BG_HIGHLIGHT if i == self._selected else BG_LIST
+                self.itemconfigure(rect, fill=fill, state="normal")
+                self.itemconfigure(text, text=items[i], state="normal")
+            else:
+                self.itemconfigure(rect, state="hidden")
+                self.itemconfigure(text, state="hidden")
+
+        if self.yscrollcommand is not None:
+            self.yscrollcommand(*self.yview())
+
+    def _on_click(self, event):
+        self.focus_set()
+        index = self._top + event.y // self.row_height
+        if index < len(self._items):
+            self._select_and_notify(index)
+
+    def _on_wheel(self, event):
+        # Windows reports multiples of 120, macOS small deltas
+        notches = -int(event.delta / 120) or (-1 if event.delta > 0 else 1)
+        self._scroll_by(notches * self.WHEEL_ROWS)
+
+    def _move_selection(self, step):
+        if self._items:
+            current = self._selected
+            if current is None:
+                current = self._top - 1 if step > 0 else self._top
+            self._select_and_notify(current + step)
+        return "break"
+
+    def _select_and_notify(self, index):
+        n = len(self._items)
+        if not n:
+            return "break"
+        index = max(0, min(index, n - 1))
+        self.selection_set(index)
+        self.see(index)
+        self.event_generate("<<ListboxSelect>>")
+        return "break"
+
+
+class ThumbnailGallery(tk.Canvas):
+    """
+    Grid of thumbnails that only draws the tiles on screen.
+
+    Works like VirtualListbox: items are any sequence and a fixed pool of
+    canvas tiles is re-used while scrolling. Images come from
+    image_for(index), which returns a PhotoImage or None while it is not
+    loaded yet; after each redraw on_view(indices) receives the visible
+    indices followed by GALLERY_MARGIN_ROWS rows on either side, so the
+    owner can load just those and call refresh_images(). Fires
+    <<GallerySelect>> on user selection and <<GalleryActivate>> on
+    double-click / Return.
+    """
+
+    TILE_PAD = 4
+
+    def __init__(self, master, tile_size=THUMB_SIZE, image_for=None,
+                 on_view=None, **kw):
+        self._font = tkfont.nametofont("TkDefaultFont")
+        self.tile_size = tile_size
+        self.tile_w = tile_size + 2 * self.TILE_PAD
+        self.tile_h = tile_size + self._font.metrics("linespace") + 3 * self.TILE_PAD
+        super().__init__(
+            master,
+            bg=BG_PREVIEW,
+            highlightthickness=0,
+            takefocus=1,
+            **kw,
+        )
+        self.image_for = image_for
+        self.on_view = on_view
+        self.yscrollcommand = None
+        self._items = ()
+        self._top_row = 0
+        self._cols = 1
+        self._selected = None
+        self._tiles = []   # pooled (rect, image, text) canvas items
+
+        self.bind("<Configure>", self._on_configure)
+        self.bind("<Button-1>", self._on_click)
+        self.bind("<Double-Button-1>", self._on_double_click)
+        self.bind("<Return>", lambda _e: self.event_generate("<<GalleryActivate>>"))
+        self.bind("<MouseWheel>", self._on_wheel)
+        self.bind("<Button-4>", lambda _e: self._scroll_by(-1))
+        self.bind("<Button-5>", lambda _e: self._scroll_by(1))
+        self.bind("<Left>", lambda _e: self._move_selection(-1))
+        self.bind("<Right>", lambda _e: self._move_selection(1))
+        self.bind("<Up>", lambda _e: self._move_selection(-self._cols))
+        self.bind("<Down>", lambda _e: self._move_selection(self._cols))
+        self.bind(
+            "<Prior>",
+            lambda _e: self._move_selection(-self._cols * self._visible_rows()),
+        )
+        self.bind(
+            "<Next>",
+            lambda _e: self._move_selection(self._cols * self._visible_rows()),
+        )
+
+    # -- Public API ------------------------------------------------------
+
+    @property
+    def items(self):
+        return self._items
+
+    def set_items(self, items):
+        """Show a new sequence; resets scroll position and selection."""
+        self._items = items
+        self._top_row = 0
+        self._selected = None
+        self._redraw()
+
+    def size(self):
+        return len(self._items)
+
+    def curselection(self):
+        return () if self._selected is None else (self._selected,)
+
+    def selection_set(self, index):
+        self._selected = index
+        self._redraw()
+
+    def see(self, index):
+        row = index // self._cols
+        visible = self._visible_rows()
+        if row < self._top_row:
+            self._set_top_row(row)
+        elif row >= self._top_row + visible:
+            self._set_top_row(row - visible + 1)
+
+    def yview(self, *args):
+        rows = self._row_count()
+        if not args:
+            if not rows:
+                return 0.0, 1.0
+            end = min(rows, self._top_row + self._visible_rows())
+            return self._top_row / rows, end / rows
+
+        if args[0] == "moveto":
+            self._set_top_row(int(float(args[1]) * rows))
+        elif args[0] == "scroll":
+            count = int(args[1])
+            if args[2] == "pages":
+                count *= self._visible_rows()
+            self._scroll_by(count)
+        return None
+
+    def refresh_images(self):
+        """Re-query image_for for the visible tiles (after loads finish)."""
+        n = len(self._items)
+        start = self._top_row * self._cols
+        for k, (_rect, image, _text) in enumerate(self._tiles):
+            i = start + k
+            if i < n:
+                self.itemconfigure(image, image=self._image(i) or "")
+
+    # -- Internals -------------------------------------------------------
+
+    def _image(self, index):
+        return self.image_for(index) if self.image_for is not None else None
+
+    def _visible_rows(self):
+        return max(1, self.winfo_height() // self.tile_h)
+
+    def _row_count(self):
+        return (len(self._items) + self._cols - 1) // self._cols
+
+    def _set_top_row(self, row):
+        row = max(0, min(row, self._row_count() - self._visible_rows()))
+        if row != self._top_row:
+            self._top_row = row
+            self._redraw()
+
+    def _scroll_by(self, rows):
+        self._set_top_row(self._top_row + rows)
+
+    def _on_configure(self, event):
+        # Keep the first visible item in view when the column count changes
+        first = self._top_row * self._cols
+        cols = self._cols = max(1, event.width // self.tile_w)
+
+        needed = (event.height // self.tile_h + 1) * cols
+        while len(self._tiles) < needed:
+            rect = self.create_rectangle(0, 0, 0, 0, outline="", fill=BG_PREVIEW)
+            image = self.create_image(0, 0, anchor="center")
+            text = self.create_text(0, 0, anchor="n", font=self._font, fill=FG_TEXT)
+            self._tiles.append((rect, image, text))
+        while len(self._tiles) > needed:
+            for item in self._tiles.pop():
+                self.delete(item)
+
+        pad = self.TILE_PAD
+        for k, (rect, image, text) in enumerate(self._tiles):
+            x = (k % cols) * self.tile_w
+            y = (k // cols) * self.tile_h
+            self.coords(rect, x, y, x + self.tile_w, y + self.tile_h)
+            self.coords(image, x + self.tile_w // 2, y + pad + self.tile_size // 2)
+            self.coords(text, x + self.tile_w // 2, y + 2 * pad + self.tile_size)
+
+        self._top_row = max(
+            0, min(first // cols, self._row_count() - self._visible_rows())
+        )
+        self._redraw()
+
+    def _redraw(self):
+        items = self._items
+        n = len(items)
+        start = self._top_row * self._cols
+        for k, (rect, image, text) in enumerate(self._tiles):
+            i = start + k
+            if i < n:
+                fill = BG_HIGHLIGHT if i == self._selected else BG_PREVIEW
+                self.itemconfigure(rect, fill=fill, state="normal")
+                self.itemconfigure(image, image=self._image(i) or "", state="normal")
+                self.itemconfigure(text, text=items[i], state="normal")
+            else:
+                for item in (rect, image, text):
+                    self.itemconfigure(item, state="hidden")
+
+        if self.yscrollcommand is not None:
+            self.yscrollcommand(*self.yview())
+        if self.on_view is not None and n:
+            self.on_view(self._wanted_indices())
+
+    def _wanted_indices(self):
+        """Visible indices first, then the margin rows below and above."""
+        cols = self._cols
+        n = len(self._items)
+        top = self._top_row
+        bottom = top + self._visible_rows() + 1
+        margin = GALLERY_MARGIN_ROWS
+        ranges = (
+            range(top * cols, min(n, bottom * cols)),
+            range(bottom * cols, min(n, (bottom + margin) * cols)),
+            range(max(0, top - margin) * cols, top * cols),
+        )
+        return [i for r in ranges for i in r]
+
+    def _index_at(self, event):
+        col = event.x // self.tile_w
+        if col >= self._cols:
+            return None
+        index = (self._top_row + event.y // self.tile_h) * self._cols + col
+        return index if index < len(self._items) else None
+
+    def _on_click(self, event):
+        self.focus_set()
+        index = self._index_at(event)
+        if index is not None:
+            self._select_and_notify(index)
+
+    def _on_double_click(self, event):
+        if self._index_at(event) is not None:
+            self.event_generate("<<GalleryActivate>>")
+
+    def _on_wheel(self, event):
+        notches = -int(event.delta / 120) or (-1 if event.delta > 0 else 1)
+        self._scroll_by(notches)
+
+    def _move_selection(self, step):
+        if self._items:
+            current = self._selected
+            if current is None:
+                current = self._top_row * self._cols - (1 if step > 0 else 0)
+            self._select_and_notify(current + step)
+        return "break"
+
+    def _select_and_notify(self, index):
+        n = len(self._items)
+        if not n:
+            return "break"
+        index = max(0, min(index, n - 1))
+        self.selection_set(index)
+        self.see(index)
+        self.event_generate("<<GallerySelect>>")
+        return "break"
+
+
+# Objects deep_sizeof never looks into (code, Tk wrappers, OS handles)
+_OPAQUE = (
+    type, types.ModuleType, types.FunctionType, types.MethodType,
+    types.BuiltinFunctionType, tk.Misc, tk.Image, io.IOBase,
+)
+_LEAVES = (str, bytes, bytearray, int, float, bool, type(None), array, memoryview)
+
+
+def deep_sizeof(obj, seen, count_strings=True):
+    """
+    Estimated bytes held by obj and what it references.
 
-def get_ids(icon_db, type_name, category=None):
+    Dicts, objects and large sequences are counted once across calls that
+    share `seen` (a set of ids). count_strings=False skips strings, for
+    structures whose IDs and paths are the catalog's own string objects.
+    File-mapped catalogs only count their Python wrappers; their pages
+    belong to the OS file cache.
     """
-    Return mapping {id: relative_path} for a given type/category.
+    getsizeof = sys.getsizeof
+    size = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, _LEAVES):
+            if count_strings or not isinstance(obj, str):
+                size += getsizeof(obj, 0)
+            continue
+        if isinstance(obj, _OPAQUE):
+            continue
+        # Small tuples/lists (metadata rows) are never shared; skipping the
+        # id bookkeeping for them keeps `seen` small on million-entry roots
+        if not isinstance(obj, (tuple, list)) or len(obj) >= 16:
+            if id(obj) in seen:
+                continue
+            seen.add(id(obj))
+        size += getsizeof(obj, 0)
+        if isinstance(obj, dict):
+            # list() copies under the GIL, so the Tk thread may keep going
+            groups = (list(obj), list(obj.values()))
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            groups = (list(obj),)
+        else:
+            groups = ()
+            attrs = getattr(obj, "__dict__", None)
+            if attrs is not None:
+                stack.append(attrs)
+            for cls in type(obj).__mro__:
+                for slot in getattr(cls, "__slots__", ()):
+                    if slot not in ("__dict__", "__weakref__"):
+                        stack.append(getattr(obj, slot, None))
+        # Strings are most of a catalog: size them here, not via the
+        # stack. sum() avoids creating an int per string, which matters
+        # while tracemalloc is tracing every allocation.
+        for group in groups:
+            if count_strings:
+                size += sum(getsizeof(item) for item in group if type(item) is str)
+            stack.extend(item for item in group if type(item) is not str)
+    return size
+
+
+def format_mb(nbytes):
+    return f"{nbytes / (1024 * 1024):8.1f} MB"
+
+
+class MemoryPanel(tk.Toplevel):
+    """
+    Diagnostics window: estimated memory per data structure, decoded
+    image caches, Tcl image count and (when running) tracemalloc's top
+    allocation sites, with buttons to trim caches.
 
-    - For Item with nested categories:
-        Item -> category -> {id: path}
-    - For flat types:
-        type -> {id: path}
+    Structure sizes are measured on a background thread; everything that
+    touches Tk is read before and after, on the Tk thread.
     """
-    if type_name not in icon_db:
-        return {}
 
-    data = icon_db[type_name]
+    TOP_ALLOCATIONS = 10
 
-    # Nested Item
-    if type_name == "Item" and _is_nested_item(icon_db, "Item"):
-        if not category:
-            return {}
-        sub = data.get(category)
-        if isinstance(sub, dict):
-            return {str(k): v for k, v in sub.items()}
-        return {}
+    def __init__(self, app):
+        super().__init__(app)
+        self.app = app
+        self.title("Memory")
+        self.geometry("620x520")
+        self.configure(bg=BG_MAIN)
 
-    # Flat type
-    if isinstance(data, dict):
-        return {str(k): v for k, v in data.items()}
+        buttons = ttk.Frame(self, padding=6)
+        buttons.pack(side="bottom", fill="x")
+        ttk.Button(buttons, text="Refresh", command=self.refresh).pack(side="left")
+        ttk.Button(
+            buttons, text="Trim image caches", command=self._on_trim_caches
+        ).pack(side="left", padx=(6, 0))
+        ttk.Button(
+            buttons, text="Drop search indexes", command=self._on_drop_indexes
+        ).pack(side="left", padx=(6, 0))
+        self.btn_tracemalloc = ttk.Button(
+            buttons, command=self._on_toggle_tracemalloc
+        )
+        self.btn_tracemalloc.pack(side="right")
 
-    return {}
+        self.text = tk.Text(
+            self, bg=BG_LIST, fg=FG_TEXT, relief="flat", wrap="none",
+            font=tkfont.nametofont("TkFixedFont"), padx=6, pady=6,
+        )
+        self.text.pack(fill="both", expand=True, padx=6, pady=(6, 0))
+        self._busy = False
+        self.refresh()
 
+    def refresh(self):
+        self._update_tracemalloc_button()
+        if self._busy:
+            return
+        self._busy = True
+        self._set_text("Measuring...")
+        app = self.app
+        roots = app.memory_roots()
+        tracing = tracemalloc.is_tracing()
+        app._run_in_background(
+            lambda: self._measure(roots, tracing),
+            self._on_measured,
+            "measure memory",
+        )
+
+    def _measure(self, roots, tracing):
+        """Runs on a worker thread: no Tk calls."""
+        seen = set()
+        sizes = [
+            (label, deep_sizeof(obj, seen, count_strings))
+            for label, obj, count_strings in roots
+        ]
+        allocations = None
+        if tracing:
+            stats = tracemalloc.take_snapshot().statistics("lineno")
+            allocations = (
+                tracemalloc.get_traced_memory(),
+                stats[:self.TOP_ALLOCATIONS],
+            )
+        return sizes, allocations
+
+    def _on_measured(self, result, error):
+        self._busy = False
+        if not self.winfo_exists():
+            return
+        if error is not None:
+            self._set_text(f"Measuring failed: {error}")
+            return
+        sizes, allocations = result
+        app = self.app
+
+        lines = ["Data structures (estimated, shared objects counted once)"]
+        for label, nbytes in sizes:
+            lines.append(f"  {label:<36} {format_mb(nbytes)}")
+        if not isinstance(app.icon_db, dict):
+            lines.append(
+                f"  (catalog is a {type(app.icon_db).__name__}: "
+                "file pages are not counted)"
+            )
+
+        lines += ["", "Decoded images (width x height x 4)"]
+        for label, cache in app.image_caches():
+            lines.append(
+                f"  {label:<22} {len(cache):>6} images {format_mb(cache.bytes_used)}"
+                f" of {format_mb(cache.budget_bytes).strip()}"
+            )
+        held = app.prefetcher.held_bytes() + app.thumb_reader.held_bytes()
+        lines.append(f"  {'read-ahead PNG bytes':<36} {format_mb(held)}")
+        lines.append(f"  {'Tcl images':<36} {len(app.tk.call('image', 'names')):>11}")
+
+        lines.append("")
+        if allocations is None:
+            lines.append("tracemalloc: off (start it, or run with --tracemalloc")
+            lines.append("to include the catalog load)")
+        else:
+            (current, peak), stats = allocations
+            lines.append(
+                f"tracemalloc: {format_mb(current).strip()} traced, "
+                f"peak {format_mb(peak).strip()}; top allocation sites:"
+            )
+            for stat in stats:
+                frame = stat.traceback[0]
+                where = f"{os.path.basename(frame.filename)}:{frame.lineno}"
+                lines.append(f"  {format_mb(stat.size)}  {stat.count:>9} blocks  {where}")
+        self._set_text("\n".join(lines))
+
+    def _set_text(self, text):
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.insert("1.0", text)
+        self.text.configure(state="disabled")
+
+    def _update_tracemalloc_button(self):
+        label = "Stop tracemalloc" if tracemalloc.is_tracing() else "Start tracemalloc"
+        self.btn_tracemalloc.configure(text=label)
+
+    def _on_toggle_tracemalloc(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        else:
+            tracemalloc.start()
+        self.refresh()
+
+    def _on_trim_caches(self):
+        self.app.trim_image_caches()
+        self.refresh()
+
+    def _on_drop_indexes(self):
+        self.app.id_filters = {}
+        self.refresh()
 
-# ---------------------------------------------------------------------------
-#  GUI Application
-# ---------------------------------------------------------------------------
 
 class IconViewerApp(tk.Tk):
-    def __init__(self):
+    def __init__(self, stall_ms=0, stall_log=STALL_LOG, trace=None):
         super().__init__()
 
         self.title("MapleStory WZ Icon Viewer")
@@ -121,7 +1242,60 @@ class IconViewerApp(tk.Tk):
         self.icon_db = {}
         self.png_root = None
         self.current_entries = {}     # id -> rel_path
+        self.id_order = {}            # (type, category) -> ids in display order
+        self.id_filters = {}          # (type, category) -> IdFilter
         self.current_image = None     # keep PhotoImage alive
+        self.preview_cache = PhotoImageCache()
+        self.prefetcher = PngPrefetcher(load=self._read_png)
+        self.png_meta = {}            # rel_path -> META_FIELDS row matching the scan
+        self.preview_scales = {}      # full_path -> subsample learned on decode
+
+        # Gallery thumbnails: read in the background, decoded on the Tk
+        # thread in short time slices (see _pump_thumbnails)
+        self.thumb_cache = PhotoImageCache(THUMB_CACHE_BYTES)   # full_path -> image
+        self.thumb_reader = PngPrefetcher(
+            max_entries=1024,
+            load=lambda path: self._load_stored_png(path, THUMB_SIZE),
+            name="thumbnail reader",
+        )
+        self.thumb_store = None       # ThumbnailStore in the PNG root, if writable
+        self.atlas = None             # (pages, {rel_path: entry}) from icon_atlas/
+        self.png_pack = None          # PngPack in the PNG root, if there is one
+        self.png_files = None         # scan_png_root snapshot (None until scanned)
+        self.missing_counts = {}      # (type, category) -> PNGs not in the snapshot
+        self._missing_jobs = set()    # (type, category) being counted
+        self._scan_serial = 0
+        self.atlas_pages = PhotoImageCache(ATLAS_CACHE_BYTES)   # page -> image
+        self.thumb_failed = set()     # full paths that could not be read/decoded
+        self._thumb_wanted = []       # full paths the gallery is waiting for
+        self._thumb_job = None
+
+        # Search ID scheduling: keystrokes are coalesced into one refresh
+        self._filter_job = None
+        self._last_refresh_key = None
+
+        # Per-stage timings (off until "Stage timings" is ticked)
+        self.timer = StageTimer()
+        self.timer.listener = self._show_timing
+        # Chrome trace of actions, stages and background work (--trace)
+        self.tracer = TraceRecorder()
+        self.trace_path = trace       # saved on close, see _save_trace()
+        self._trace_saved = False
+        self._trace_error = None
+        if trace:
+            self.tracer.enabled = True
+            self.timer.tracer = self.tracer
+        self._load_started = None
+        self.memory_panel = None      # MemoryPanel window, once opened
+
+        # Main-loop stall watchdog (off when stall_ms is 0)
+        self.watchdog = None
+        self._watch_context = (None, None, "")   # plain copy of _refresh_key()
+
+        # Background loading state
+        self._load_queue = None
+        self._load_cancel = None
+        self._load_poll_job = None
 
         # Tk variables
         self.var_json_path = tk.StringVar(value="No icon_db.json loaded")
@@ -130,10 +1304,21 @@ class IconViewerApp(tk.Tk):
         self.var_category = tk.StringVar()
         self.var_filter = tk.StringVar()
         self.var_info = tk.StringVar(value="")
+        self.var_gallery = tk.BooleanVar(value=False)
+        self.var_timings = tk.BooleanVar(value=False)
+        self.var_timing = tk.StringVar(value="")
         self.var_status = tk.StringVar(value="Ready")
 
         self._setup_style()
         self._build_ui()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
+        if stall_ms > 0:
+            self.watchdog = StallWatchdog(
+                stall_log, stall_ms, context=self._stall_context
+            )
+            self.watchdog.start()
+            self._heartbeat()
 
     # ------------------------------------------------------------------
     #  Styling
@@ -252,6 +1437,14 @@ class IconViewerApp(tk.Tk):
             side="top", anchor="w", pady=(0, 4)
         )
 
+        ttk.Button(
+            file_frame,
+            text="Rescan PNG root",
+            command=self._scan_png_root,
+            width=18,
+        ).pack(side="top", anchor="w", pady=(0, 4))
+        self.bind("<F5>", lambda _e: self._scan_png_root())
+
         # Type / Category / Filter
         controls = ttk.Frame(left)
         controls.pack(fill="x", pady=(pad, pad))
@@ -292,8 +1485,8 @@ class IconViewerApp(tk.Tk):
             controls, textvariable=self.var_filter, width=18
         )
         self.entry_filter.grid(row=2, column=1, sticky="we", padx=(4, 0), pady=(6, 0))
-        # Live filtering as you type
-        self.entry_filter.bind("<KeyRelease>", lambda _e: self.refresh_id_list())
+        # Live filtering as you type (debounced, see _schedule_filter)
+        self.entry_filter.bind("<KeyRelease>", lambda _e: self._schedule_filter())
 
         # ID list
         list_frame = ttk.Frame(left)
@@ -304,9 +1497,7 @@ class IconViewerApp(tk.Tk):
         listbox_frame = ttk.Frame(list_frame)
         listbox_frame.pack(fill="both", expand=True, pady=(2, 0))
 
-        self.list_ids = tk.Listbox(
-            listbox_frame, width=24, exportselection=False, activestyle="none"
-        )
+        self.list_ids = VirtualListbox(listbox_frame, width=24)
         self.list_ids.pack(side="left", fill="both", expand=True)
         self.list_ids.bind("<<ListboxSelect>>", self._on_id_selected)
 
@@ -314,7 +1505,7 @@ class IconViewerApp(tk.Tk):
             listbox_frame, orient="vertical", command=self.list_ids.yview
         )
         scroll.pack(side="right", fill="y")
-        self.list_ids.configure(yscrollcommand=scroll.set)
+        self.list_ids.yscrollcommand = scroll.set
 
         # Right panel ---------------------------------------------------
         right = ttk.Frame(root_frame)
@@ -325,8 +1516,12 @@ class IconViewerApp(tk.Tk):
         )
         self.lbl_preview_title.pack(fill="x", pady=(0, 4))
 
+        # Preview and gallery share this area; only one is packed at a time
+        view_frame = ttk.Frame(right)
+        view_frame.pack(fill="both", expand=True)
+
         self.preview_label = tk.Label(
-            right,
+            view_frame,
             bg=BG_PREVIEW,
             bd=1,
             relief="solid",
@@ -334,6 +1529,22 @@ class IconViewerApp(tk.Tk):
         )
         self.preview_label.pack(fill="both", expand=True)
 
+        self.gallery_frame = ttk.Frame(view_frame)
+        self.gallery = ThumbnailGallery(
+            self.gallery_frame,
+            image_for=self._gallery_image,
+            on_view=self._on_gallery_view,
+        )
+        self.gallery.pack(side="left", fill="both", expand=True)
+        self.gallery.bind("<<GallerySelect>>", self._on_gallery_select)
+        self.gallery.bind("<<GalleryActivate>>", self._on_gallery_activate)
+
+        gallery_scroll = ttk.Scrollbar(
+            self.gallery_frame, orient="vertical", command=self.gallery.yview
+        )
+        gallery_scroll.pack(side="right", fill="y")
+        self.gallery.yscrollcommand = gallery_scroll.set
+
         info_frame = ttk.Frame(right)
         info_frame.pack(fill="x", pady=(4, 0))
         ttk.Label(info_frame, textvariable=self.var_info, justify="left").pack(
@@ -350,6 +1561,26 @@ class IconViewerApp(tk.Tk):
             command=self._copy_selected_id,
         ).pack(side="left", padx=4)
 
+        ttk.Button(
+            copy_frame,
+            text="Memory",
+            command=self._show_memory_panel,
+        ).pack(side="left", padx=4)
+
+        ttk.Checkbutton(
+            copy_frame,
+            text="Gallery view",
+            variable=self.var_gallery,
+            command=self._on_toggle_gallery,
+        ).pack(side="right", padx=4)
+
+        ttk.Checkbutton(
+            copy_frame,
+            text="Stage timings",
+            variable=self.var_timings,
+            command=self._on_toggle_timings,
+        ).pack(side="right", padx=4)
+
         # Bottom status -------------------------------------------------
         status_frame = ttk.Frame(self, padding=(pad, 0, pad, pad))
         status_frame.pack(side="bottom", fill="x")
@@ -357,99 +1588,479 @@ class IconViewerApp(tk.Tk):
             status_frame, textvariable=self.var_status, anchor="w"
         ).pack(side="left", fill="x")
 
+        # Load progress + cancel (only shown while a load is running)
+        self.btn_cancel_load = ttk.Button(
+            status_frame,
+            text="Cancel",
+            command=self._on_cancel_load,
+        )
+        self.progress_load = ttk.Progressbar(
+            status_frame, mode="determinate", length=180
+        )
+
+        # Stage timing readout (only shown while timings are on)
+        self.btn_export_timings = ttk.Button(
+            status_frame,
+            text="Export timings",
+            command=self._export_timings,
+        )
+        self.lbl_timing = ttk.Label(status_frame, textvariable=self.var_timing)
+
     # ------------------------------------------------------------------
     #  File selection handlers
     # ------------------------------------------------------------------
 
     def _on_select_json(self):
-        path = filedialog.askopenfilename(
-            title="Open icon_db.json",
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
-        )
+        with self._modal():
+            path = filedialog.askopenfilename(
+                title="Open icon_db.json",
+                filetypes=[
+                    ("JSON files", "*.json"),
+                    ("Compiled catalogs", f"*{COMPILED_EXT}"),
+                    ("SQLite catalogs", f"*{SQLITE_EXT} *.db"),
+                    ("All files", "*.*"),
+                ],
+            )
         if not path:
             return
         self._load_json(path)
 
     def _load_json(self, path):
+        self._cancel_load()
+
+        self._reset_catalog()
+
+        self.var_json_path.set(os.path.abspath(path))
+        self.var_status.set("Loading icon_db.json...")
+
+        self._load_queue = queue.Queue()
+        self._load_cancel = threading.Event()
+        self._load_started = time.perf_counter()
+        threading.Thread(
+            target=self._traced(self._load_worker, "load worker"),
+            args=(path, self._load_queue, self._load_cancel),
+            name="icon_db loader",
+            daemon=True,
+        ).start()
+
+        self.progress_load.configure(value=0, maximum=1)
+        self.btn_cancel_load.pack(side="right")
+        self.progress_load.pack(side="right", padx=(0, 6))
+        self._load_poll_job = self.after(LOAD_POLL_MS, self._poll_load_queue)
+
+    def _on_select_png_root(self):
+        with self._modal():
+            folder = filedialog.askdirectory(title="Select PNG root folder")
+        if not folder:
+            return
+        self.png_root = folder
+        self.png_meta = {}
+        self.preview_scales = {}
+        self._reset_thumbnails()
+        if self.thumb_store is not None:
+            self.thumb_store.close()
+            self.thumb_store = None
+        self.atlas = None
+        self.atlas_pages.clear()
+        if self.png_pack is not None:
+            self.png_pack.close()
+        pack = self.png_pack = self._open_png_pack(folder)
+        self.png_files = None
+        self.missing_counts = {}
+        self._missing_jobs = set()
+        self.var_png_root.set(folder)
+        if pack is not None:
+            self.var_status.set(
+                f"PNG root set to: {folder} ({len(pack)} PNGs in {PACK_FILENAME})"
+            )
+        else:
+            self.var_status.set(f"PNG root set to: {folder}")
+        self._run_in_background(
+            lambda: self._open_thumb_store(folder, pack),
+            lambda result, error: self._on_thumb_store_ready(folder, result, error),
+            "open thumbnail store",
+        )
+        self._scan_png_root()
+
+    def _scan_png_root(self):
+        """Take a fresh existence snapshot of the PNG root in the background."""
+        folder = self.png_root
+        if not folder:
+            return
+        self._scan_serial += 1
+        serial = self._scan_serial
+        start = time.perf_counter()
+        self._run_in_background(
+            lambda: scan_png_root(folder),
+            lambda files, error: self._on_png_root_scanned(
+                serial, files, error, time.perf_counter() - start
+            ),
+            "scan png root",
+        )
+
+    def _on_png_root_scanned(self, serial, files, error, elapsed):
+        if serial != self._scan_serial:
+            return
+        if error is not None:
+            self.var_status.set(f"Failed to scan PNG root: {error}")
+            return
+        self.png_files = files
+        self.missing_counts = {}
+        self._missing_jobs = set()    # counts against the old snapshot are dropped
+        self.var_status.set(f"PNG root scanned: {len(files)} PNGs in {elapsed:.1f} s")
+        self._update_list_title()
+        # Sidecar rows and atlas slices are checked against the snapshot's
+        # stat data, so nothing stats a file per icon to trust them
+        folder = self.png_root
+        self._run_in_background(
+            lambda: load_png_meta_index(folder, files),
+            lambda meta, error: self._on_png_meta_loaded(serial, meta, error),
+            "load png meta",
+        )
+        self._run_in_background(
+            lambda: load_atlas_index(folder, files),
+            lambda atlas, error: self._on_atlas_loaded(serial, atlas, error),
+            "load atlas index",
+        )
+
+    def _update_list_title(self):
+        """Re-label the shown list, e.g. once its missing count is known."""
+        if self._last_refresh_key is not None and self.list_ids.size():
+            t, cat, _filter_text = self._last_refresh_key
+            self.lbl_preview_title.configure(
+                text=self._list_title(t, cat, self.list_ids.size())
+            )
+
+    def _on_atlas_loaded(self, serial, atlas, error):
+        if serial != self._scan_serial or error is not None:
+            return
+        # A rescan may find a rebuilt atlas, so cached pages are dropped
+        self.atlas = atlas or None
+        self.atlas_pages.clear()
+        if atlas:
+            self.var_status.set(
+                f"PNG root set to: {self.png_root} ({len(atlas[1])} icons in atlases)"
+            )
+
+    def _open_png_pack(self, folder):
+        path = pack_path_for(folder)
+        if not os.path.exists(path):
+            return None
         try:
-            db = load_icon_db(path)
+            return PngPack(path)
+        except (OSError, ValueError) as exc:
+            with self._modal():
+                messagebox.showwarning(
+                    "PNG pack", f"Ignoring unreadable pack archive:\n{path}\n\n{exc}"
+                )
+            return None
+
+    @staticmethod
+    def _open_thumb_store(folder, pack):
+        """Open the folder's thumbnail store and bring it up to date."""
+        store = ThumbnailStore(thumb_store_path_for(folder))
+        try:
+            return store, store.validate(folder, pack)
+        except Exception:
+            store.close()
+            raise
+
+    def _on_thumb_store_ready(self, folder, result, error):
+        if error is not None:
+            # Read-only or broken store: keep reading the PNGs directly
+            return
+        store, (_kept, refreshed, removed) = result
+        if folder != self.png_root:
+            store.close()
+            return
+        self.thumb_store = store
+        if refreshed or removed:
+            self.var_status.set(
+                f"Thumbnail store: {refreshed} refreshed, {removed} removed"
+            )
+
+    def _on_png_meta_loaded(self, serial, meta, error):
+        if serial != self._scan_serial or error is not None:
+            return
+        self.png_meta = meta
+        if meta:
+            self.var_status.set(
+                f"PNG root set to: {self.png_root} "
+                f"({len(meta)} images in {META_FILENAME})"
+            )
+
+    def _run_in_background(self, work, on_done, name="background task"):
+        """Run work() on a thread, then on_done(result, error) on the Tk thread."""
+        out = queue.Queue(maxsize=1)
+        work = self._traced(work, name)
+
+        def runner():
+            try:
+                out.put((work(), None))
+            except Exception as exc:  # noqa: BLE001
+                out.put((None, exc))
+
+        def poll():
+            try:
+                result, error = out.get_nowait()
+            except queue.Empty:
+                self.after(LOAD_POLL_MS, poll)
+                return
+            on_done(result, error)
+
+        threading.Thread(target=runner, name=name, daemon=True).start()
+        self.after(LOAD_POLL_MS, poll)
+
+    def _traced(self, fn, name):
+        """fn wrapped in a trace span when tracing is on, else fn itself."""
+        tracer = self.tracer
+        if not tracer.enabled:
+            return fn
+
+        def run(*args):
+            with tracer.span(name):
+                return fn(*args)
+
+        return run
+
+    # ------------------------------------------------------------------
+    #  Background loading
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _load_worker(path, out, cancel):
+        """
+        Runs on a worker thread. Never touches Tk; everything is reported
+        through the `out` queue and applied by _poll_load_queue.
+        """
+        try:
+            # Prefer an up-to-date compiled catalog sitting next to the JSON
+            start = time.perf_counter()
+            source = find_compiled_icon_db(path) or path
+            backend = catalog_backend(source)
+            if backend is not None:
+                db = backend(source)
+                out.put(("catalog", db, source, time.perf_counter() - start))
+                # Cancelled before the message could be seen: the queue
+                # is abandoned, so nobody else will close the catalog.
+                # (_cancel_load also drains it; closing twice is harmless.)
+                if cancel.is_set():
+                    db.close()
+                return
+
+            def progress(done, total):
+                # Called after each type (or each chunk of a file too big
+                # to decode whole), so cancelling stays responsive.
+                if cancel.is_set():
+                    raise _LoadCancelled
+                out.put(("progress", done, total))
+
+            sort_s = 0.0
+            for type_name, value in iter_icon_db_types(path, progress):
+                if cancel.is_set():
+                    return
+                # Sort once here, off the Tk thread, instead of per keystroke
+                sort_start = time.perf_counter()
+                order = build_id_order({type_name: value}, type_name)
+                sort_s += time.perf_counter() - sort_start
+                out.put(("type", type_name, value, order))
+            parse_s = time.perf_counter() - start - sort_s
+            out.put(("done", {"parse": parse_s, "sort": sort_s}))
+        except _LoadCancelled:
+            pass
         except Exception as exc:  # noqa: BLE001
-            messagebox.showerror("Error", f"Failed to load icon_db.json:\n{exc}")
-            self.var_status.set("Error loading icon_db.json")
+            out.put(("error", exc))
+
+    def _poll_load_queue(self):
+        self._load_poll_job = None
+        q = self._load_queue
+        if q is None:
             return
 
-        self.icon_db = db
-        self.var_json_path.set(os.path.abspath(path))
-        self.var_status.set("icon_db.json loaded")
+        got_types = False
+        finished = False
+        while not finished:
+            try:
+                msg = q.get_nowait()
+            except queue.Empty:
+                break
+
+            kind = msg[0]
+            if kind == "progress":
+                _kind, done, total = msg
+                self.progress_load.configure(value=done, maximum=max(total, 1))
+            elif kind == "type":
+                _kind, type_name, value, order = msg
+                self.icon_db[type_name] = value
+                self.id_order.update(order)
+                got_types = True
+            elif kind == "catalog":
+                _kind, db, source, open_s = msg
+                self.icon_db = db
+                got_types = True
+                finished = True
+                self.var_status.set(f"Catalog loaded: {source}")
+                self.timer.record("load", {"parse": open_s})
+            elif kind == "done":
+                finished = True
+                self.var_status.set("icon_db.json loaded")
+                self.timer.record("load", msg[1])
+            elif kind == "error":
+                self._end_load()
+                self._reset_catalog()
+                with self._modal():
+                    messagebox.showerror(
+                        "Error", f"Failed to load icon_db.json:\n{msg[1]}"
+                    )
+                self.var_status.set("Error loading icon_db.json")
+                return
+
+        if got_types:
+            self._refresh_types()
+
+        if finished:
+            self._end_load()
+            if not self.combo_type["values"]:
+                self.lbl_preview_title.configure(text="No types in JSON")
+            return
+
+        self._load_poll_job = self.after(LOAD_POLL_MS, self._poll_load_queue)
 
+    def _refresh_types(self):
+        """Update the type combo; select the first type as soon as one exists."""
         types = get_types(self.icon_db)
         self.combo_type["values"] = types
-        if types:
+        if types and not self.var_type.get():
             self.var_type.set(types[0])
             self._on_type_changed()
-        else:
-            self.var_type.set("")
-            self._hide_category()
-            self._clear_ids()
-            self.lbl_preview_title.configure(text="No types in JSON")
 
-    def _on_select_png_root(self):
-        folder = filedialog.askdirectory(title="Select PNG root folder")
-        if not folder:
+    def _on_cancel_load(self):
+        if self._load_queue is None:
             return
-        self.png_root = folder
-        self.var_png_root.set(folder)
-        self.var_status.set(f"PNG root set to: {folder}")
+        self._cancel_load()
+        self._reset_catalog()
+        self.lbl_preview_title.configure(text="No image loaded")
+        self.var_status.set("Loading cancelled")
+
+    def _cancel_load(self):
+        """Stop listening to the running loader (if any) and tell it to quit."""
+        if self._load_cancel is not None:
+            self._load_cancel.set()
+        q = self._load_queue
+        self._end_load()
+        if q is not None:
+            self._close_queued_catalogs(q)
+
+    @staticmethod
+    def _close_queued_catalogs(q):
+        """Close catalog backends sitting in an abandoned load queue."""
+        while True:
+            try:
+                msg = q.get_nowait()
+            except queue.Empty:
+                return
+            if msg[0] == "catalog":
+                close_icon_db(msg[1])
+
+    def _end_load(self):
+        if self.tracer.enabled and self._load_started is not None:
+            self.tracer.complete(
+                "load", "action", self._load_started, time.perf_counter()
+            )
+        self._load_started = None
+        if self._load_poll_job is not None:
+            self.after_cancel(self._load_poll_job)
+            self._load_poll_job = None
+        self._load_queue = None
+        self._load_cancel = None
+        self.progress_load.pack_forget()
+        self.btn_cancel_load.pack_forget()
 
     # ------------------------------------------------------------------
     #  Type / Category handlers
     # ------------------------------------------------------------------
 
     def _on_type_changed(self, _event=None):
-        t = self.var_type.get()
-
-        if not t:
-            self._hide_category()
-            self._clear_ids()
-            return
-
-        # If Item & nested categories -> show Category
-        if t == "Item" and get_categories(self.icon_db, "Item"):
-            cats = get_categories(self.icon_db, "Item")
-            self.combo_category["values"] = cats
-            if self.var_category.get() not in cats:
-                self.var_category.set(cats[0] if cats else "")
-            self._show_category()
-        else:
-            self._hide_category()
-            self.var_category.set("")
-
-        self.refresh_id_list()
+        with self.timer.operation("type"):
+            t = self.var_type.get()
+
+            if not t:
+                self._hide_category()
+                self._clear_ids()
+                return
+
+            # Nested type (e.g. Item) -> show Category
+            with self.timer.stage("type switch"):
+                cats = get_categories(self.icon_db, t)
+                if cats:
+                    self.combo_category["values"] = cats
+                    if self.var_category.get() not in cats:
+                        self.var_category.set(cats[0])
+                    self._show_category()
+                else:
+                    self._hide_category()
+                    self.var_category.set("")
+
+            self.refresh_id_list()
 
     def _on_category_changed(self, _event=None):
-        self.refresh_id_list()
+        with self.timer.operation("category"):
+            self.refresh_id_list()
 
     # ------------------------------------------------------------------
     #  List + Preview refresh
     # ------------------------------------------------------------------
 
+    def _schedule_filter(self):
+        """
+        Coalesce Search ID keystrokes: each call replaces the pending
+        refresh, so a burst of typing (or key repeat) runs it only once.
+        """
+        self.timer.count("refresh requested")
+        if self._filter_job is not None:
+            self.after_cancel(self._filter_job)
+        self._filter_job = self.after(FILTER_DELAY_MS, self._run_scheduled_filter)
+
+    def _run_scheduled_filter(self):
+        self._filter_job = None
+        if self._refresh_key() == self._last_refresh_key:
+            # e.g. arrow keys, Shift, or typing and deleting the same char
+            self.timer.count("refresh unchanged")
+            return
+        with self.timer.operation("filter"):
+            self.refresh_id_list()
+
+    def _refresh_key(self):
+        """What the ID list currently depends on: type, category, query."""
+        t = self.var_type.get()
+        cat = None
+        if self._category_visible():
+            cat = self.var_category.get() or None
+        return t, cat, self.var_filter.get().strip()
+
     def refresh_id_list(self):
+        # A direct refresh supersedes any pending keystroke refresh
+        if self._filter_job is not None:
+            self.after_cancel(self._filter_job)
+            self._filter_job = None
+
         self._clear_ids()
+        self.prefetcher.cancel()
+
+        t, cat, filter_text = self._refresh_key()
+        self._last_refresh_key = self._watch_context = (t, cat, filter_text)
+        self.timer.count("refresh run")
 
-        t = self.var_type.get()
         if not t:
             self.lbl_preview_title.configure(text="No type selected")
             return
 
-        cat = None
-        if t == "Item" and self._category_visible():
-            cat = self.var_category.get() or None
-
-        entries = get_ids(self.icon_db, t, category=cat)
+        with self.timer.stage("lookup"):
+            entries = get_ids(self.icon_db, t, category=cat)
         self.current_entries = entries
 
         if not entries:
-            if t == "Item" and cat:
+            if cat:
                 self.lbl_preview_title.configure(
                     text=f"{t}/{cat}: 0 entries"
                 )
@@ -457,37 +2068,127 @@ class IconViewerApp(tk.Tk):
                 self.lbl_preview_title.configure(text=f"{t}: 0 entries")
             return
 
-        ids = list(entries.keys())
-        filter_text = self.var_filter.get().strip()
-
-        # sort numeric IDs numerically, then others lexicographically
-        def sort_key(s):
-            return (0, int(s)) if s.isdigit() else (1, s)
+        id_filter = self._id_filter(t, cat)
+        with self.timer.stage("filter"):
+            ids = id_filter.search(filter_text)
 
-        ids.sort(key=sort_key)
+        with self.timer.stage("list fill"):
+            self.list_ids.set_items(ids)
+            self.gallery.set_items(ids)
 
-        if filter_text:
-            ids = [i for i in ids if filter_text in i]
-
-        for i in ids:
-            self.list_ids.insert("end", i)
-
-        if t == "Item" and cat:
-            label = f"{t}/{cat}: {len(ids)} entries"
-        else:
-            label = f"{t}: {len(ids)} entries"
-
-        self.lbl_preview_title.configure(text=label)
+        self.lbl_preview_title.configure(text=self._list_title(t, cat, len(ids)))
         self.preview_label.configure(image="", text="")
         self.current_image = None
         self.var_info.set("")
 
+    def _list_title(self, t, cat, shown):
+        label = f"{t}/{cat}" if cat else t
+        label = f"{label}: {shown} entries"
+        missing = self._missing_count(t, cat)
+        if missing:
+            label += f" ({missing} missing)"
+        return label
+
+    def _missing_count(self, t, cat):
+        """
+        Missing PNGs of the listed type/category, or None until known.
+
+        Counting checks every entry, so it runs in the background against
+        the current scan snapshot; the title is updated when it is done.
+        """
+        files = self.png_files
+        if files is None:
+            return None
+        key = (t, cat)
+        count = self.missing_counts.get(key)
+        if count is not None or key in self._missing_jobs:
+            return count
+
+        self._missing_jobs.add(key)
+        entries = self.current_entries
+        pack = self.png_pack
+        icon_db = self.icon_db
+
+        def count_missing():
+            missing = 0
+            for _item_id, rel_path in entries.items():
+                if pack is not None and (
+                    os.path.normpath(rel_path).replace(os.sep, "/") in pack
+                ):
+                    continue
+                if snapshot_key(rel_path) not in files:
+                    missing += 1
+            return missing
+
+        def on_done(missing, error):
+            if files is not self.png_files or icon_db is not self.icon_db:
+                return   # _missing_jobs was reset; a new count may be running
+            self._missing_jobs.discard(key)
+            if error is not None:
+                return
+            self.missing_counts[key] = missing
+            if self._last_refresh_key is not None and self._last_refresh_key[:2] == key:
+                self._update_list_title()
+
+        self._run_in_background(count_missing, on_done, "count missing pngs")
+        return None
+
+    def _png_present(self, rel_path):
+        """
+        Existence check answered by the pack and the scan snapshot; the
+        file is only stat'ed while the first scan is still running.
+        """
+        if self.png_pack is not None:
+            if os.path.normpath(rel_path).replace(os.sep, "/") in self.png_pack:
+                return True
+        if self.png_files is None:
+            return os.path.exists(os.path.join(self.png_root, rel_path))
+        return snapshot_key(rel_path) in self.png_files
+
+    def _sorted_ids(self, type_name, category):
+        """Display-ordered IDs for a type/category, computed at most once."""
+        key = (type_name, category)
+        ids = self.id_order.get(key)
+        if ids is None:
+            with self.timer.stage("sort"):
+                ids = get_sorted_ids(self.icon_db, type_name, category)
+            self.id_order[key] = ids
+        return ids
+
+    def _id_filter(self, type_name, category):
+        """
+        Search state for a type/category, created on first use and kept.
+
+        Large groups build their trigram index in the background as soon
+        as they are listed; searches scan until it is ready.
+        """
+        key = (type_name, category)
+        id_filter = self.id_filters.get(key)
+        if id_filter is None:
+            ids = self._sorted_ids(type_name, category)
+            background = len(ids) >= INDEX_BACKGROUND_MIN
+            id_filter = IdFilter(ids, auto_index=not background)
+            self.id_filters[key] = id_filter
+            if background:
+                self._run_in_background(
+                    id_filter.build_index, lambda _index, _error: None,
+                    "build search index",
+                )
+        return id_filter
+
     def _on_id_selected(self, _event=None):
+        with self.timer.operation("select"):
+            self._show_selected_id()
+
+    def _show_selected_id(self):
         sel = self.list_ids.curselection()
         if not sel:
             return
         index = sel[0]
         item_id = self.list_ids.get(index)
+        if self.var_gallery.get() and self.gallery.curselection() != sel:
+            self.gallery.selection_set(index)
+            self.gallery.see(index)
 
         rel_path = self.current_entries.get(item_id)
         if not rel_path:
@@ -496,63 +2197,449 @@ class IconViewerApp(tk.Tk):
         # Compute full path: PNG root / relative path
         if not self.png_root:
             self.var_status.set("PNG root not set")
-            messagebox.showwarning(
-                "PNG root not set",
-                "Please select the PNG root folder first.",
-            )
+            with self._modal():
+                messagebox.showwarning(
+                    "PNG root not set",
+                    "Please select the PNG root folder first.",
+                )
             return
 
         full_path = os.path.normpath(os.path.join(self.png_root, rel_path))
 
-        if not os.path.exists(full_path):
-            self._show_missing_image(full_path, item_id)
-            return
-
-        # Load with PhotoImage
-        try:
-            img = tk.PhotoImage(file=full_path)
-
-            max_w, max_h = 512, 512
-            w, h = img.width(), img.height()
-            if w > max_w or h > max_h:
-                scale = max(w / max_w, h / max_h)
-                scale = int(scale)
-                if scale < 1:
-                    scale = 1
-                img = img.subsample(scale, scale)
-
-            self.current_image = img
-            self.preview_label.configure(image=img, text="")
-        except Exception as exc:  # noqa: BLE001
-            messagebox.showerror(
-                "Error",
-                f"Failed to load image:\n{full_path}\n\n{exc}",
-            )
-            self._show_missing_image(full_path, item_id)
-            return
+        meta = self.png_meta.get(rel_path)
+        key = self._preview_key(rel_path, full_path)
+        img = self.preview_cache.get(key) if key is not None else None
+        if img is None:
+            # Atlas slice first, then prefetched or packed bytes, then the file
+            timer = self.timer
+            with timer.stage("decode"):
+                img = self._atlas_image(full_path)
+            if img is None:
+                with timer.stage("resolve"):
+                    rel_key = self._rel_key(full_path)
+                    data = self.prefetcher.take(full_path) or None
+                    if data is None and self.png_pack is not None:
+                        data = self.png_pack.get(rel_key)
+                    present = data is not None or self._png_present(rel_path)
+                if not present:
+                    self._show_missing_image(full_path, item_id)
+                    return
+
+            try:
+                if img is None:
+                    with timer.stage("decode"):
+                        if data is not None:
+                            # Tk takes bytes only (pack entries are memoryviews)
+                            img = tk.PhotoImage(data=bytes(data))
+                        else:
+                            img = tk.PhotoImage(file=full_path)
+                # The factor comes from the decoded size, not from the
+                # key, which may come from a (stale) sidecar row
+                scale = preview_subsample(img.width(), img.height())
+                if key is None:
+                    self.preview_scales[full_path] = scale
+                    key = (full_path, scale)
+                if scale > 1:
+                    with timer.stage("subsample"):
+                        img = img.subsample(scale, scale)
+            except Exception as exc:  # noqa: BLE001
+                with self._modal():
+                    messagebox.showerror(
+                        "Error",
+                        f"Failed to load image:\n{full_path}\n\n{exc}",
+                    )
+                self._show_missing_image(full_path, item_id)
+                return
+            self.preview_cache.put(key, img)
+
+        self.current_image = img
+        self.preview_label.configure(image=img, text="")
+        self._prefetch_neighbors(index)
 
         # Info text
         t = self.var_type.get() or "?"
-        if t == "Item" and self._category_visible():
+        if self._category_visible():
             cat = self.var_category.get() or "?"
             prefix = f"Type: {t}    Category: {cat}    ID: {item_id}"
         else:
             prefix = f"Type: {t}    ID: {item_id}"
 
-        self.var_info.set(f"{prefix}\nPath: {full_path}")
-        self.var_status.set("Image loaded")
+        info = f"{prefix}\nPath: {full_path}"
+        if meta:
+            info += f"\nImage: {format_png_meta(meta)}"
+        self.var_info.set(info)
+        self.var_status.set(f"Image loaded ({self.preview_cache.stats_text()})")
+
+    def _prefetch_neighbors(self, index):
+        """Queue the next/previous IDs in list order for background reading."""
+        ids = self.list_ids.items
+        paths = []
+        for step in range(1, PREFETCH_NEIGHBORS + 1):
+            for i in (index + step, index - step):
+                if not 0 <= i < len(ids):
+                    continue
+                rel_path = self.current_entries.get(ids[i])
+                if not rel_path:
+                    continue
+                full_path = os.path.normpath(os.path.join(self.png_root, rel_path))
+                if self._atlas_entry(full_path) is not None:
+                    continue
+                if self.png_files is not None and not self._png_present(rel_path):
+                    continue
+                key = self._preview_key(rel_path, full_path)
+                if key is None or key not in self.preview_cache:
+                    paths.append(full_path)
+        self.prefetcher.request(paths)
+
+    def _rel_key(self, full_path):
+        return os.path.relpath(full_path, self.png_root).replace(os.sep, "/")
+
+    def _atlas_entry(self, full_path):
+        if self.atlas is None:
+            return None
+        return self.atlas[1].get(self._rel_key(full_path))
+
+    def _atlas_image(self, full_path):
+        """Slice full_path's icon out of its atlas page, or None if not packed."""
+        entry = self._atlas_entry(full_path)
+        if entry is None:
+            return None
+        page_no, x, y, w, h = entry
+        page = self.atlas_pages.get(page_no)
+        if page is None:
+            page_path = os.path.join(
+                atlas_dir_for(self.png_root), self.atlas[0][page_no]
+            )
+            try:
+                page = tk.PhotoImage(file=page_path)
+            except tk.TclError:
+                return None
+            self.atlas_pages.put(page_no, page)
+        img = tk.PhotoImage(width=w, height=h)
+        img.tk.call(img, "copy", page, "-from", x, y, x + w, y + h, "-to", 0, 0)
+        return img
+
+    def _read_png(self, full_path):
+        """PngPrefetcher loader for previews: the PNG as is (pack or file)."""
+        png_root = self.png_root
+        if not png_root:
+            return b""
+        rel_path = os.path.relpath(full_path, png_root).replace(os.sep, "/")
+        with self.tracer.span("read png"):
+            try:
+                return bytes(read_png_source(png_root, rel_path, self.png_pack))
+            except OSError:
+                return b""
+
+    def _load_stored_png(self, full_path, box):
+        """PngPrefetcher loader: read through the thumbnail store and pack."""
+        png_root = self.png_root
+        if not png_root:
+            return b""
+        rel_path = os.path.relpath(full_path, png_root).replace(os.sep, "/")
+        with self.tracer.span("read png", box=box):
+            return bytes(
+                load_thumbnail(self.thumb_store, png_root, rel_path, box, self.png_pack)
+            )
+
+    def _preview_key(self, rel_path, full_path):
+        """
+        Cache key (full_path, subsample) for a preview, or None while the
+        image size is still unknown (no sidecar entry and never decoded).
+        """
+        meta = self.png_meta.get(rel_path)
+        if meta:
+            return (full_path, preview_subsample(meta[0], meta[1]))
+        scale = self.preview_scales.get(full_path)
+        if scale is None:
+            return None
+        return (full_path, scale)
+
+    # ------------------------------------------------------------------
+    #  Stage timings
+    # ------------------------------------------------------------------
+
+    def _on_toggle_timings(self):
+        enabled = self.timer.enabled = self.var_timings.get()
+        if enabled:
+            self.btn_export_timings.pack(side="right")
+            self.lbl_timing.pack(side="right", padx=(0, 6))
+        else:
+            self.lbl_timing.pack_forget()
+            self.btn_export_timings.pack_forget()
+            self.var_timing.set("")
+
+    def _show_timing(self, _last):
+        self.var_timing.set(self.timer.last_text())
+
+    def _export_timings(self):
+        with self._modal():
+            path = filedialog.asksaveasfilename(
+                title="Export stage timings",
+                defaultextension=".json",
+                initialfile="viewer_timings.json",
+                filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+            )
+        if not path:
+            return
+        try:
+            self.timer.export(path)
+        except OSError as exc:
+            with self._modal():
+                messagebox.showerror("Error", f"Failed to export timings:\n{exc}")
+            return
+        self.var_status.set(f"Timings exported to: {path}")
+
+    def _save_trace(self):
+        """Write the --trace file (once); returns the OSError if that failed."""
+        if self.trace_path and not self._trace_saved:
+            self._trace_saved = True
+            try:
+                self.tracer.save(self.trace_path)
+            except OSError as exc:
+                self._trace_error = exc
+        return self._trace_error
+
+    def _on_close(self):
+        if self.watchdog is not None:
+            self.watchdog.stop()
+        exc = self._save_trace()
+        if exc is not None:
+            messagebox.showerror("Error", f"Failed to save trace:\n{exc}")
+        if self.thumb_store is not None:
+            self.thumb_store.close()   # writes the batched LRU updates
+            self.thumb_store = None
+        self.destroy()
+
+    # ------------------------------------------------------------------
+    #  Memory diagnostics
+    # ------------------------------------------------------------------
+
+    def _show_memory_panel(self):
+        panel = self.memory_panel
+        if panel is not None and panel.winfo_exists():
+            panel.deiconify()
+            panel.lift()
+            panel.refresh()
+            return
+        self.memory_panel = MemoryPanel(self)
+
+    def memory_roots(self):
+        """(label, object, count_strings) for every structure worth sizing."""
+        roots = [
+            ("catalog (icon_db)", self.icon_db, True),
+            ("current list (current_entries)", self.current_entries, False),
+            ("sort orders (id_order)", self.id_order, False),
+            ("search indexes (id_filters)", self.id_filters, False),
+            ("PNG metadata (png_meta)", self.png_meta, True),
+            ("PNG root snapshot (png_files)", self.png_files, True),
+            ("atlas index", self.atlas, True),
+            ("preview sizes (preview_scales)", self.preview_scales, True),
+        ]
+        if self.tracer.enabled:
+            roots.append(("trace buffer", self.tracer, True))
+        return roots
+
+    def image_caches(self):
+        return [
+            ("previews", self.preview_cache),
+            ("thumbnails", self.thumb_cache),
+            ("atlas pages", self.atlas_pages),
+        ]
+
+    def trim_image_caches(self):
+        """Drop decoded images and read-ahead bytes; what is on screen reloads."""
+        self.prefetcher.cancel()
+        self.preview_cache.clear()
+        self.atlas_pages.clear()
+        self._reset_thumbnails()
+        if self.var_gallery.get():
+            sel = self.gallery.curselection()
+            self.gallery.selection_set(sel[0] if sel else None)
+        if self.list_ids.curselection():
+            # The shown preview was one of the deleted images
+            self._on_id_selected()
+
+    # ------------------------------------------------------------------
+    #  Stall watchdog
+    # ------------------------------------------------------------------
+
+    def _modal(self):
+        """Context for a modal dialog: the watchdog ignores the wait."""
+        if self.watchdog is None:
+            return contextlib.nullcontext()
+        return self.watchdog.paused()
+
+    def _heartbeat(self):
+        self.watchdog.beat()
+        self._watch_context = self._refresh_key()
+        self.after(HEARTBEAT_MS, self._heartbeat)
+
+    def _stall_context(self):
+        """Runs on the watchdog thread: plain attributes only, no Tk calls."""
+        t, cat, filter_text = self._watch_context
+        return (
+            f"type={t!r} category={cat!r} filter={filter_text!r} "
+            f"loading={self._load_queue is not None} png_root={self.png_root!r}"
+        )
+
+    # ------------------------------------------------------------------
+    #  Gallery
+    # ------------------------------------------------------------------
+
+    def _on_toggle_gallery(self):
+        if self.var_gallery.get():
+            self.preview_label.pack_forget()
+            self.gallery_frame.pack(fill="both", expand=True)
+            # Redraws (and so requests thumbnails) even without a <Configure>
+            sel = self.list_ids.curselection()
+            self.gallery.selection_set(sel[0] if sel else None)
+            if sel:
+                self.gallery.see(sel[0])
+            self.gallery.focus_set()
+        else:
+            self.gallery_frame.pack_forget()
+            self.preview_label.pack(fill="both", expand=True)
+            self._thumb_wanted = []
+            self.thumb_reader.cancel()
+
+    def _on_gallery_select(self, _event=None):
+        sel = self.gallery.curselection()
+        if not sel:
+            return
+        self.list_ids.selection_set(sel[0])
+        self.list_ids.see(sel[0])
+        self._on_id_selected()
+
+    def _on_gallery_activate(self, _event=None):
+        """Double-click / Return on a tile opens it in the preview."""
+        if self.gallery.curselection():
+            self.var_gallery.set(False)
+            self._on_toggle_gallery()
+
+    def _thumb_path(self, index):
+        ids = self.gallery.items
+        if not self.png_root or not 0 <= index < len(ids):
+            return None
+        rel_path = self.current_entries.get(ids[index])
+        if not rel_path:
+            return None
+        return os.path.normpath(os.path.join(self.png_root, rel_path))
+
+    def _gallery_image(self, index):
+        path = self._thumb_path(index)
+        if path is None:
+            return None
+        return self.thumb_cache.get(path)
+
+    def _on_gallery_view(self, indices):
+        """Ask for the thumbnails of the tiles on (or near) the screen."""
+        if not self.var_gallery.get():
+            return
+        wanted = []
+        for index in indices:
+            path = self._thumb_path(index)
+            if (
+                path is not None
+                and path not in self.thumb_cache
+                and path not in self.thumb_failed
+            ):
+                wanted.append(path)
+        self._thumb_wanted = wanted
+        self.thumb_reader.request(
+            [path for path in wanted if self._atlas_entry(path) is None]
+        )
+        if wanted and self._thumb_job is None:
+            self._thumb_job = self.after(LOAD_POLL_MS, self._pump_thumbnails)
+
+    def _pump_thumbnails(self):
+        """
+        Turn read PNG bytes into thumbnails for at most THUMB_BATCH_MS, then
+        yield back to the event loop so scrolling stays responsive.
+        """
+        self._thumb_job = None
+        deadline = time.perf_counter() + THUMB_BATCH_MS / 1000.0
+        pending = []
+        loaded = False
+        out_of_time = False
+        with self.tracer.span("thumbnail batch", "ui"):
+            for path in self._thumb_wanted:
+                if out_of_time or time.perf_counter() >= deadline:
+                    out_of_time = True
+                    pending.append(path)
+                    continue
+                img = self._atlas_image(path)
+                if img is not None:
+                    scale = preview_subsample(img.width(), img.height(), THUMB_SIZE)
+                    if scale > 1:
+                        img = img.subsample(scale, scale)
+                else:
+                    data = self.thumb_reader.take(path)
+                    if data is None:
+                        pending.append(path)
+                        continue
+                    img = self._make_thumbnail(data)
+                if img is None:
+                    self.thumb_failed.add(path)
+                else:
+                    self.thumb_cache.put(path, img)
+                    loaded = True
+
+            self._thumb_wanted = pending
+            if loaded:
+                self.gallery.refresh_images()
+        if pending:
+            delay = 1 if out_of_time else LOAD_POLL_MS
+            self._thumb_job = self.after(delay, self._pump_thumbnails)
+
+    @staticmethod
+    def _make_thumbnail(data):
+        if not data:
+            return None
+        try:
+            img = tk.PhotoImage(data=data)
+        except tk.TclError:
+            return None
+        scale = preview_subsample(img.width(), img.height(), THUMB_SIZE)
+        if scale > 1:
+            img = img.subsample(scale, scale)
+        return img
+
+    def _reset_thumbnails(self):
+        if self._thumb_job is not None:
+            self.after_cancel(self._thumb_job)
+            self._thumb_job = None
+        self._thumb_wanted = []
+        self.thumb_reader.cancel()
+        self.thumb_cache.clear()
+        self.thumb_failed.clear()
+        self.gallery.refresh_images()
 
     # ------------------------------------------------------------------
     #  Small helpers
     # ------------------------------------------------------------------
 
     def _clear_ids(self):
-        self.list_ids.delete(0, "end")
+        self.list_ids.set_items(())
+        self.gallery.set_items(())
         self.current_entries = {}
         self.current_image = None
         self.preview_label.configure(image="", text="")
         self.var_info.set("")
 
+    def _reset_catalog(self):
+        close_icon_db(self.icon_db)
+        self.icon_db = {}
+        self.id_order = {}
+        self.id_filters = {}
+        self.missing_counts = {}
+        self._missing_jobs = set()
+        self._last_refresh_key = None
+        self.combo_type["values"] = []
+        self.var_type.set("")
+        self._hide_category()
+        self._clear_ids()
+
     def _show_missing_image(self, full_path, item_id):
         self.preview_label.configure(
             image="",
@@ -561,7 +2648,7 @@ class IconViewerApp(tk.Tk):
             bg=BG_PREVIEW,
         )
         t = self.var_type.get() or "?"
-        if t == "Item" and self._category_visible():
+        if self._category_visible():
             cat = self.var_category.get() or "?"
             prefix = f"Type: {t}    Category: {cat}    ID: {item_id}"
         else:
@@ -594,10 +2681,71 @@ class IconViewerApp(tk.Tk):
         return self.category_frame.winfo_ismapped()
 
 
-def main():
-    app = IconViewerApp()
-    app.mainloop()
+def _env_ms(name):
+    """Non-negative integer from environment variable name; 0 if unset or bad."""
+    # A typo here must not stop the windowed (--noconsole) exe from starting
+    try:
+        return max(0, int(os.environ.get(name, "0")))
+    except ValueError:
+        return 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and not argv[0].startswith("-"):
+        # Subcommands (compile, query, ...) are headless; see wz_icon_catalog
+        return catalog_main(argv)
+
+    parser = argparse.ArgumentParser(
+        description="MapleStory WZ Icon Viewer",
+        epilog="Catalog tools: wz_icon_viewer_gui.py {compile,sqlite,meta,"
+               "thumbs,atlas,pack,query} ... (see wz_icon_catalog.py -h)",
+    )
+    parser.add_argument(
+        "--stall-ms", type=int, nargs="?", metavar="MS",
+        const=STALL_THRESHOLD_MS, default=_env_ms(STALL_ENV),
+        help=f"log main-loop stalls longer than MS ({STALL_THRESHOLD_MS} if "
+             f"omitted); off unless given here or in ${STALL_ENV}",
+    )
+    parser.add_argument(
+        "--stall-log", default=STALL_LOG,
+        help="file the stall reports are appended to (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--trace", metavar="FILE", default=os.environ.get(TRACE_ENV) or None,
+        help="record a Chrome trace of the session into FILE on exit "
+             f"(or ${TRACE_ENV})",
+    )
+    parser.add_argument(
+        "--tracemalloc", action="store_true",
+        help="trace allocations from startup (shown in the Memory window)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    app = IconViewerApp(
+        stall_ms=args.stall_ms, stall_log=args.stall_log, trace=args.trace
+    )
+    try:
+        app.mainloop()
+    finally:
+        # Normally saved by _on_close; this covers Ctrl+C and crashes
+        if app.watchdog is not None:
+            app.watchdog.stop()
+        exc = app._save_trace()
+        if args.trace and sys.stderr is not None:
+            if exc is not None:
+                print(f"Failed to save trace: {exc}", file=sys.stderr)
+            else:
+                print(f"Trace ({len(app.tracer)} events) written to: {args.trace}",
+                      file=sys.stderr)
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    import multiprocessing
+
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,377 @@
+"""
+wz_png.py
+
+Pure-Python PNG decoder/encoder (zlib + struct only)
+
+- Decodes the PNGs the flattener emits (RGBA8) plus palette, grayscale,
+  gray+alpha and RGB images at any standard bit depth
+- Always returns pixels as a flat RGBA8 bytearray, row-major
+- Works without Tk or a display, so it is safe in worker threads,
+  worker processes and headless tools
+- Interlaced (Adam7) images are not supported
+"""
+
+import struct
+import zlib
+
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+COLOR_GRAY = 0
+COLOR_RGB = 2
+COLOR_PALETTE = 3
+COLOR_GRAY_ALPHA = 4
+COLOR_RGBA = 6
+
+# Samples per pixel for each color type
+_CHANNELS = {
+    COLOR_GRAY: 1,
+    COLOR_RGB: 3,
+    COLOR_PALETTE: 1,
+    COLOR_GRAY_ALPHA: 2,
+    COLOR_RGBA: 4,
+}
+
+_VALID_DEPTHS = {
+    COLOR_GRAY: (1, 2, 4, 8, 16),
+    COLOR_RGB: (8, 16),
+    COLOR_PALETTE: (1, 2, 4, 8),
+    COLOR_GRAY_ALPHA: (8, 16),
+    COLOR_RGBA: (8, 16),
+}
+
+_CHUNK_HEAD = struct.Struct(">I4s")
+_IHDR = struct.Struct(">IIBBBBB")
+
+
+class PngHeader:
+    """The fields of an IHDR chunk."""
+
+    __slots__ = ("width", "height", "bit_depth", "color_type", "interlace")
+
+    def __init__(self, width, height, bit_depth, color_type, interlace):
+        self.width = width
+        self.height = height
+        self.bit_depth = bit_depth
+        self.color_type = color_type
+        self.interlace = interlace
+
+    def __repr__(self):
+        return (
+            f"PngHeader({self.width}x{self.height}, depth={self.bit_depth}, "
+            f"color_type={self.color_type}, interlace={self.interlace})"
+        )
+
+
+class PngImage:
+    """Decoded image: width, height and a flat RGBA8 pixel bytearray."""
+
+    __slots__ = ("width", "height", "pixels")
+
+    def __init__(self, width, height, pixels):
+        if len(pixels) != width * height * 4:
+            raise ValueError("pixel buffer does not match width * height * 4")
+        self.width = width
+        self.height = height
+        self.pixels = pixels
+
+    def row(self, y):
+        """Zero-copy view of one RGBA row."""
+        stride = self.width * 4
+        return memoryview(self.pixels)[y * stride:(y + 1) * stride]
+
+    def pixel(self, x, y):
+        """Return (r, g, b, a) at x, y."""
+        i = (y * self.width + x) * 4
+        return tuple(self.pixels[i:i + 4])
+
+
+# ---------------------------------------------------------------------------
+#  Decoding
+# ---------------------------------------------------------------------------
+
+def parse_header(data):
+    """
+    Parse the signature + IHDR at the start of data (needs 33 bytes).
+
+    Raises ValueError if data is not a PNG.
+    """
+    if data[:8] != PNG_SIGNATURE:
+        raise ValueError("not a PNG file")
+    length, ctype = _CHUNK_HEAD.unpack_from(data, 8)
+    if ctype != b"IHDR" or length != _IHDR.size:
+        raise ValueError("PNG does not start with an IHDR chunk")
+    width, height, depth, color, _comp, _filter, interlace = _IHDR.unpack_from(
+        data, 16
+    )
+    return PngHeader(width, height, depth, color, interlace)
+
+
+def read_header(path):
+    """Read just the IHDR of the PNG at path (33 bytes of I/O)."""
+    with open(path, "rb") as f:
+        return parse_header(f.read(8 + 8 + _IHDR.size + 4))
+
+
+def _iter_chunks(data):
+    pos = len(PNG_SIGNATURE)
+    end = len(data)
+    while pos + 8 <= end:
+        length, ctype = _CHUNK_HEAD.unpack_from(data, pos)
+        body_start = pos + 8
+        body_end = body_start + length
+        if body_end + 4 > end:
+            raise ValueError(f"truncated {ctype!r} chunk")
+        body = data[body_start:body_end]
+        (crc,) = struct.unpack_from(">I", data, body_end)
+        if zlib.crc32(body, zlib.crc32(ctype)) != crc:
+            raise ValueError(f"CRC mismatch in {ctype!r} chunk")
+        yield ctype, body
+        if ctype == b"IEND":
+            return
+        pos = body_end + 4
+    raise ValueError("missing IEND chunk")
+
+
+def _unfilter(raw, height, stride, bpp):
+    """Undo the per-scanline filters and return the raw image bytes."""
+    out = bytearray(height * stride)
+    prev = bytearray(stride)
+    pos = 0
+    for y in range(height):
+        ftype = raw[pos]
+        line = bytearray(raw[pos + 1:pos + 1 + stride])
+        pos += 1 + stride
+
+        if ftype == 0:
+            pass
+        elif ftype == 1:    # Sub
+            for i in range(bpp, stride):
+                line[i] = (line[i] + line[i - bpp]) & 0xFF
+        elif ftype == 2:    # Up
+            for i in range(stride):
+                line[i] = (line[i] + prev[i]) & 0xFF
+        elif ftype == 3:    # Average
+            for i in range(stride):
+                left = line[i - bpp] if i >= bpp else 0
+                line[i] = (line[i] + ((left + prev[i]) >> 1)) & 0xFF
+        elif ftype == 4:    # Paeth
+            for i in range(stride):
+                a = line[i - bpp] if i >= bpp else 0
+                b = prev[i]
+                c = prev[i - bpp] if i >= bpp else 0
+                p = a + b - c
+                pa = abs(p - a)
+                pb = abs(p - b)
+                pc = abs(p - c)
+                if pa <= pb and pa <= pc:
+                    pred = a
+                elif pb <= pc:
+                    pred = b
+                else:
+                    pred = c
+                line[i] = (line[i] + pred) & 0xFF
+        else:
+            raise ValueError(f"unknown PNG filter type {ftype}")
+
+        out[y * stride:(y + 1) * stride] = line
+        prev = line
+    return out
+
+
+def _unpack_samples(row, width, depth, channels):
+    """Expand one scanline to a list of integer samples (0..2**depth-1)."""
+    count = width * channels
+    if depth == 8:
+        return row[:count]
+    if depth == 16:
+        return [row[i] for i in range(0, count * 2, 2)]   # keep the high byte
+    mask = (1 << depth) - 1
+    samples = []
+    for byte in row:
+        for shift in range(8 - depth, -1, -depth):
+            samples.append((byte >> shift) & mask)
+    return samples[:count]
+
+
+def decode_png(data):
+    """
+    Decode PNG bytes to a PngImage with RGBA8 pixels.
+
+    16-bit images are reduced to 8 bits; tRNS transparency is honoured for
+    palette, gray and RGB images.
+    """
+    header = parse_header(data)
+    width, height = header.width, header.height
+    depth, color = header.bit_depth, header.color_type
+
+    if color not in _CHANNELS or depth not in _VALID_DEPTHS[color]:
+        raise ValueError(f"unsupported PNG color type {color} / depth {depth}")
+    if header.interlace:
+        raise ValueError("interlaced PNGs are not supported")
+
+    palette = None
+    trns = None
+    idat = []
+    for ctype, body in _iter_chunks(data):
+        if ctype == b"PLTE":
+            palette = body
+        elif ctype == b"tRNS":
+            trns = body
+        elif ctype == b"IDAT":
+            idat.append(body)
+
+    channels = _CHANNELS[color]
+    bits_per_pixel = channels * depth
+    bpp = max(1, bits_per_pixel // 8)
+    stride = (width * bits_per_pixel + 7) // 8
+
+    raw = zlib.decompress(b"".join(idat))
+    if len(raw) < height * (stride + 1):
+        raise ValueError("PNG image data is truncated")
+    image = _unfilter(raw, height, stride, bpp)
+
+    if color == COLOR_RGBA and depth == 8:
+        return PngImage(width, height, image)
+
+    pixels = bytearray(width * height * 4)
+    out = 0
+    scale = 255 // ((1 << depth) - 1) if depth < 8 else 1
+
+    if color == COLOR_PALETTE:
+        if palette is None:
+            raise ValueError("palette PNG without a PLTE chunk")
+        entries = len(palette) // 3
+        lut = []
+        for i in range(256):
+            if i < entries:
+                alpha = trns[i] if trns is not None and i < len(trns) else 255
+                lut.append(bytes(palette[i * 3:i * 3 + 3]) + bytes((alpha,)))
+            else:
+                lut.append(b"\x00\x00\x00\xff")
+        for y in range(height):
+            row = image[y * stride:(y + 1) * stride]
+            for index in _unpack_samples(row, width, depth, 1):
+                pixels[out:out + 4] = lut[index]
+                out += 4
+        return PngImage(width, height, pixels)
+
+    # Transparent key color for gray / RGB (compared at the source depth)
+    key = None
+    if trns is not None:
+        if color == COLOR_GRAY and len(trns) >= 2:
+            key = (struct.unpack(">H", trns[:2])[0],)
+        elif color == COLOR_RGB and len(trns) >= 6:
+            key = struct.unpack(">HHH", trns[:6])
+
+    for y in range(height):
+        row = image[y * stride:(y + 1) * stride]
+        if depth == 16 and key is not None:
+            # Key comparison needs the full 16-bit samples
+            full = [
+                (row[i] << 8) | row[i + 1]
+                for i in range(0, width * channels * 2, 2)
+            ]
+        else:
+            full = None
+        samples = _unpack_samples(row, width, depth, channels)
+
+        for x in range(width):
+            s = samples[x * channels:(x + 1) * channels]
+            if color == COLOR_GRAY:
+                v = s[0] * scale
+                r = g = b = v
+                a = 255
+                if key is not None:
+                    src = full[x] if full is not None else s[0]
+                    if (src,) == key:
+                        a = 0
+            elif color == COLOR_GRAY_ALPHA:
+                r = g = b = s[0]
+                a = s[1]
+            elif color == COLOR_RGB:
+                r, g, b = s
+                a = 255
+                if key is not None:
+                    src = tuple(full[x * 3:x * 3 + 3]) if full is not None else tuple(s)
+                    if src == key:
+                        a = 0
+            else:   # 16-bit RGBA
+                r, g, b, a = s
+            pixels[out] = r
+            pixels[out + 1] = g
+            pixels[out + 2] = b
+            pixels[out + 3] = a
+            out += 4
+
+    return PngImage(width, height, pixels)
+
+
+def load_png(path):
+    """Read and decode the PNG at path."""
+    with open(path, "rb") as f:
+        return decode_png(f.read())
+
+
+# ---------------------------------------------------------------------------
+#  Encoding
+# ---------------------------------------------------------------------------
+
+def _chunk(ctype, body):
+    return (
+        struct.pack(">I", len(body))
+        + ctype
+        + body
+        + struct.pack(">I", zlib.crc32(ctype + body))
+    )
+
+
+def encode_png(image, level=6):
+    """Encode a PngImage (RGBA8) to PNG bytes, unfiltered rows."""
+    width, height = image.width, image.height
+    stride = width * 4
+    pixels = image.pixels
+
+    raw = bytearray()
+    for y in range(height):
+        raw.append(0)
+        raw += pixels[y * stride:(y + 1) * stride]
+
+    return b"".join((
+        PNG_SIGNATURE,
+        _chunk(b"IHDR", _IHDR.pack(width, height, 8, COLOR_RGBA, 0, 0, 0)),
+        _chunk(b"IDAT", zlib.compress(bytes(raw), level)),
+        _chunk(b"IEND", b""),
+    ))
+
+
+def save_png(path, image, level=6):
+    """Encode image and write it to path."""
+    with open(path, "wb") as f:
+        f.write(encode_png(image, level))
+
+
+# ---------------------------------------------------------------------------
+#  Pixel helpers
+# ---------------------------------------------------------------------------
+
+def subsample(image, factor):
+    """
+    Keep every factor-th pixel in both directions, like
+    tk.PhotoImage.subsample.
+    """
+    if factor <= 1:
+        return image
+    width = (image.width + factor - 1) // factor
+    height = (image.height + factor - 1) // factor
+    src = image.pixels
+    src_stride = image.width * 4
+    pixels = bytearray(width * height * 4)
+    out = 0
+    for y in range(0, image.height, factor):
+        base = y * src_stride
+        for x in range(0, image.width, factor):
+            i = base + x * 4
+            pixels[out:out + 4] = src[i:i + 4]
+            out += 4
+    return PngImage(width, height, pixels)